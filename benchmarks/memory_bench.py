@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the per-row image entries
+
+Builds the probed entries of a run in memory - the former
+(filename, caption, image_path, image_info) tuples with an info dict, and
+ImageRecords - and measures the heap they occupy with tracemalloc.
+No files are read; sizes and orientations are synthetic.
+
+Usage:
+    python benchmarks/memory_bench.py
+    python benchmarks/memory_bench.py --rows 10000 100000 200000
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.core.image_handler import ImageOrientation  # noqa: E402
+from src.core.image_record import ImageRecord  # noqa: E402
+
+SIZES = [(4000, 3000), (3000, 4000), (1920, 1080), (1500, 1500), (2400, 800)]
+ORIENTATIONS = [ImageOrientation.LANDSCAPE, ImageOrientation.PORTRAIT, ImageOrientation.LANDSCAPE,
+                ImageOrientation.SQUARE, ImageOrientation.LANDSCAPE]
+
+
+def build_tuples(rows: int, seed: int) -> list:
+    """Entries as (filename, caption, image_path, image_info dict) tuples"""
+    rng = random.Random(seed)
+    entries = []
+    for index in range(rows):
+        choice = rng.randrange(len(SIZES))
+        width, height = SIZES[choice]
+        filename = f"IMG {index:06d}"
+        path = f"/data/fotos/{filename}.jpg"
+        info = {
+            'path': path,
+            'width': width + index % 7,
+            'height': height,
+            'orientation': ORIENTATIONS[choice],
+            'aspect_ratio': (width + index % 7) / height,
+        }
+        entries.append((filename, f"Raum {index % 97} - Wand {index % 13}", path, info))
+    return entries
+
+
+def build_records(rows: int, seed: int) -> list:
+    """Entries as ImageRecords"""
+    rng = random.Random(seed)
+    records = []
+    for index in range(rows):
+        choice = rng.randrange(len(SIZES))
+        width, height = SIZES[choice]
+        filename = f"IMG {index:06d}"
+        record = ImageRecord(filename, f"Raum {index % 97} - Wand {index % 13}", f"/data/fotos/{filename}.jpg")
+        record.set_size(width + index % 7, height, ORIENTATIONS[choice])
+        records.append(record)
+    return records
+
+
+def measure(build, rows: int, seed: int = 1) -> dict:
+    """
+    Measure the heap held by the built entries
+
+    Args:
+        build: Builder function
+        rows: Number of rows
+        seed: Random seed
+
+    Returns:
+        Dictionary with total bytes, bytes per row and build time
+    """
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    entries = build(rows, seed)
+    seconds = time.perf_counter() - started
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return {
+        'bytes': current,
+        'bytes_per_row': round(current / rows, 1),
+        'build_seconds': round(seconds, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pic2Doc entry memory benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help="Row counts")
+    parser.add_argument('--no-save', action='store_true', help="Do not write a result file")
+    args = parser.parse_args()
+
+    results = {
+        'benchmark': 'memory',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'rows': {},
+    }
+    for rows in args.rows:
+        tuples = measure(build_tuples, rows)
+        records = measure(build_records, rows)
+        saved = 100 - records['bytes'] / tuples['bytes'] * 100
+        results['rows'][str(rows)] = {'tuple_dict': tuples, 'image_record': records,
+                                      'saved_percent': round(saved, 1)}
+        print(f"{rows:>8} Zeilen: Tupel+Dict {tuples['bytes_per_row']:7.1f} B/Zeile, "
+              f"ImageRecord {records['bytes_per_row']:7.1f} B/Zeile ({saved:.0f}% weniger)")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out_file = RESULTS_DIR / f"memory-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        out_file.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Ergebnis gespeichert: {out_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
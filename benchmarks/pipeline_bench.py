@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark for Pic2Doc
+
+Generates synthetic datasets (see synthetic.py) and measures each stage
+separately - Excel read, image lookup, header probe, layout, document
+creation - and the full pipeline end to end. Every stage runs in a fresh
+interpreter, so its peak memory is not inflated by earlier stages.
+Records throughput, peak RSS and output size as JSON for comparison
+across commits.
+
+Usage:
+    python benchmarks/pipeline_bench.py
+    python benchmarks/pipeline_bench.py --rows 1000 10000 --captions 1 3
+    python benchmarks/pipeline_bench.py --rows 200000 --stages excel lookup probe layout
+    python benchmarks/pipeline_bench.py --compare benchmarks/results/pipeline-baseline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+STAGES = ('excel', 'lookup', 'probe', 'layout', 'document', 'end_to_end')
+
+
+# ----- Child process: one stage -----
+
+def _config(dataset: dict) -> dict:
+    from src.utils.constants import DEFAULT_CONFIG
+    config = dict(DEFAULT_CONFIG)
+    config.update(excel_file=dataset['excel_file'], image_folder=dataset['image_folder'],
+                  caption_columns=dataset['caption_columns'],
+                  # Every run starts cold, independent of earlier runs
+                  image_index_file=False)
+    return config
+
+
+def _read_rows(config: dict) -> list:
+    from src.core.excel_reader import ExcelReader
+    return ExcelReader().read_data(config['excel_file'], config['filename_column'],
+                                   config['caption_columns'], config['caption_separator'])
+
+
+def _io_bytes_read():
+    """Bytes this process has read through system calls so far (Linux only)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _records(config: dict, rows: list) -> list:
+    """Resolve and probe all rows (the document generator's input)"""
+    from src.core.image_handler import ImageHandler
+    from src.core.image_record import ImageRecord
+    handler = ImageHandler(config['image_folder'])
+    records = []
+    for filename, caption in rows:
+        try:
+            record = ImageRecord(filename, caption, handler.get_image_path(filename))
+            handler.probe_record(record)
+        except (FileNotFoundError, ValueError):
+            continue
+        records.append(record)
+    return records
+
+
+def run_stage(stage: str, dataset: dict) -> dict:
+    """
+    Measure one stage (called in a fresh interpreter)
+
+    Args:
+        stage: Stage name (see STAGES)
+        dataset: Dataset description from synthetic.generate_dataset
+
+    Returns:
+        Result dictionary: items, seconds, items_per_second and stage details
+    """
+    from src.core.run_report import peak_rss_bytes
+
+    config = _config(dataset)
+    result = {}
+    # The modules print per-row status lines; keep them out of the timing
+    with contextlib.redirect_stdout(io.StringIO()), tempfile.TemporaryDirectory() as tmp:
+        if stage == 'excel':
+            started = time.perf_counter()
+            items = len(_read_rows(config))
+            seconds = time.perf_counter() - started
+            result['bytes_read'] = dataset['excel_bytes']
+
+        elif stage == 'lookup':
+            from src.core.image_handler import ImageHandler
+            names = [filename for filename, _caption in _read_rows(config)]
+            handler = ImageHandler(config['image_folder'])
+            started = time.perf_counter()
+            result['indexed'] = handler.refresh_index()
+            result['index_seconds'] = round(time.perf_counter() - started, 6)
+            found = 0
+            for name in names:
+                if handler.find_image(name) is not None:
+                    found += 1
+            seconds = time.perf_counter() - started
+            items = len(names)
+            result['found'] = found
+
+        elif stage == 'probe':
+            from src.core.image_handler import ImageHandler
+            handler = ImageHandler(config['image_folder'])
+            paths = []
+            for filename, _caption in _read_rows(config):
+                try:
+                    paths.append(handler.get_image_path(filename))
+                except FileNotFoundError:
+                    pass
+            started = time.perf_counter()
+            for path in paths:
+                handler.probe_size(path)
+            seconds = time.perf_counter() - started
+            items = len(paths)
+
+        elif stage == 'layout':
+            from src.core.layout import iter_page_layouts
+            records = _records(config, _read_rows(config))
+            started = time.perf_counter()
+            result['pages'] = sum(1 for _page in iter_page_layouts(records, config))
+            seconds = time.perf_counter() - started
+            items = len(records)
+
+        elif stage == 'document':
+            from src.core.document_generator import DocumentGenerator
+            records = _records(config, _read_rows(config))
+            output = os.path.join(tmp, 'bench.docx')
+            file_bytes = sum(os.path.getsize(record.path) for record in records)
+            generator = DocumentGenerator(config)
+            read_before = _io_bytes_read()
+            started = time.perf_counter()
+            items, _failed = generator.create_document(records, output)
+            seconds = time.perf_counter() - started
+            read_after = _io_bytes_read()
+            result['output_bytes'] = os.path.getsize(output)
+            # Each image should be read exactly once: bytes read per image
+            # close to the average file size
+            result['image_bytes_per_image'] = round(file_bytes / items, 1) if items else None
+            result['embed_bytes_per_image'] = (round(generator.embed_stats['bytes_read'] / items, 1)
+                                               if items else None)
+            result['deduplicated'] = generator.embed_stats['deduplicated']
+            if read_before is not None and items:
+                result['io_bytes_per_image'] = round((read_after - read_before) / items, 1)
+
+        elif stage == 'end_to_end':
+            from src.core.pipeline import Pic2DocPipeline
+            output = os.path.join(tmp, 'bench.docx')
+            started = time.perf_counter()
+            run = Pic2DocPipeline(config).run(output_path=output)
+            seconds = time.perf_counter() - started
+            items = run.processed
+            result['output_bytes'] = os.path.getsize(output) if run.processed else 0
+            result['stages'] = run.report.to_dict()['stages']
+
+        else:
+            raise ValueError(f"Unknown stage: {stage}")
+
+    result.update(
+        items=items,
+        seconds=round(seconds, 6),
+        items_per_second=round(items / seconds, 2) if seconds > 0 else None,
+        peak_rss_bytes=peak_rss_bytes(),
+    )
+    return result
+
+
+# ----- Parent process -----
+
+def measure(stage: str, dataset: dict) -> dict:
+    """
+    Run one stage in a fresh interpreter
+
+    The interpreter runs in an empty temporary directory, so files the
+    application persists next to its working directory neither end up in
+    the repository nor carry state from one measurement to the next.
+
+    Args:
+        stage: Stage name
+        dataset: Dataset description
+
+    Returns:
+        Result dictionary, or {'error': ...}
+    """
+    with tempfile.TemporaryDirectory(prefix='pic2doc-bench-') as cwd:
+        proc = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), '--run-stage', stage, '--dataset', json.dumps(dataset)],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {'error': lines[-1] if lines else 'failed'}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit (empty outside a git checkout)"""
+    proc = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(REPO_ROOT),
+                          capture_output=True, text=True)
+    return proc.stdout.strip() if proc.returncode == 0 else ''
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> int:
+    """
+    Print throughput changes against a previous result
+
+    Args:
+        results: Current results
+        baseline: Previous results
+        max_regression: Allowed throughput loss in percent
+
+    Returns:
+        1 if a stage got slower than allowed, 0 otherwise
+    """
+    exit_code = 0
+    for name, dataset in results['datasets'].items():
+        before_stages = baseline.get('datasets', {}).get(name, {}).get('stages', {})
+        for stage, result in dataset['stages'].items():
+            before = before_stages.get(stage, {}).get('items_per_second')
+            after = result.get('items_per_second')
+            if not before or not after:
+                continue
+            change = (after - before) / before * 100
+            print(f"{name:32} {stage:11} {before:10.1f}/s -> {after:10.1f}/s ({change:+.1f}%)")
+            if change < -max_regression:
+                exit_code = 1
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pic2Doc pipeline benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000], help="Dataset sizes (rows)")
+    parser.add_argument('--captions', type=int, nargs='+', default=[1], help="Caption column counts")
+    parser.add_argument('--missing', type=float, default=0.01, help="Fraction of rows without image")
+    parser.add_argument('--repeat', type=float, default=0.0,
+                        help="Fraction of rows that reference an earlier row's image again")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help="Stages to measure")
+    parser.add_argument('--data-dir', help="Parent directory of the generated datasets")
+    parser.add_argument('--compare', help="Previous result JSON to compare against")
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help="Fail if a stage's throughput dropped by more than this percentage")
+    parser.add_argument('--no-save', action='store_true', help="Do not write a result file")
+    parser.add_argument('--run-stage', help=argparse.SUPPRESS)
+    parser.add_argument('--dataset', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        sys.path.insert(0, str(REPO_ROOT))
+        print(json.dumps(run_stage(args.run_stage, json.loads(args.dataset))))
+        return 0
+
+    from synthetic import DATA_DIR, dataset_name, generate_dataset
+
+    results = {
+        'benchmark': 'pipeline',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'datasets': {},
+    }
+    for rows in args.rows:
+        for captions in args.captions:
+            name = dataset_name(rows, captions, args.missing, 1, args.repeat)
+            print(f"Datensatz {name} ...")
+            dataset = generate_dataset(rows, captions, args.missing, out_dir=Path(args.data_dir or DATA_DIR),
+                                       repeat=args.repeat)
+            stages = {}
+            for stage in args.stages:
+                result = stages[stage] = measure(stage, dataset)
+                if 'error' in result:
+                    print(f"  {stage:11} Fehler: {result['error']}")
+                    continue
+                rate = result['items_per_second']
+                peak = result['peak_rss_bytes']
+                line = f"  {stage:11} {result['items']:>8} in {result['seconds']:8.2f} s"
+                if rate is not None:
+                    line += f" {rate:>10.1f}/s"
+                if peak is not None:
+                    line += f"   Peak RSS {peak / 1024 ** 2:7.1f} MB"
+                if result.get('deduplicated'):
+                    line += f"   wiederverwendet {result['deduplicated']}"
+                if result.get('output_bytes'):
+                    line += f"   Ausgabe {result['output_bytes'] / 1024 ** 2:7.1f} MB"
+                if result.get('io_bytes_per_image') and result.get('image_bytes_per_image'):
+                    ratio = result['io_bytes_per_image'] / result['image_bytes_per_image']
+                    line += f"   gelesen/Bild {ratio:.2f}x Dateigröße"
+                print(line)
+            results['datasets'][name] = {'dataset': dataset, 'stages': stages}
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            exit_code = compare(results, json.load(f), args.max_regression)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out_file = RESULTS_DIR / f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        out_file.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Ergebnis gespeichert: {out_file}")
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
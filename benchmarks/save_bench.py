@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Save benchmark for Pic2Doc
+
+Builds a document from a synthetic dataset (see synthetic.py) once, then
+measures packaging it with python-docx's Document.save() and with
+DocxWriter at several compression levels and thread counts. Records save
+time and file size as JSON.
+
+Usage:
+    python benchmarks/save_bench.py
+    python benchmarks/save_bench.py --rows 2000 --levels 1 6 9 --workers 1 4 8
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def build_document(dataset: dict, output: str):
+    """Create the dataset's document and open it again with python-docx"""
+    from docx import Document
+    from src.core.pipeline import Pic2DocPipeline
+    from src.utils.constants import DEFAULT_CONFIG
+
+    config = dict(DEFAULT_CONFIG)
+    config.update(excel_file=dataset['excel_file'], image_folder=dataset['image_folder'],
+                  caption_columns=dataset['caption_columns'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        Pic2DocPipeline(config).run(output_path=output)
+    return Document(output)
+
+
+def measure(save, output: str, repeat: int) -> dict:
+    """
+    Time a save function (best of several runs) and check the result
+
+    Args:
+        save: Function writing the document to a path
+        output: Output path
+        repeat: Number of runs
+
+    Returns:
+        Dictionary with seconds and output bytes
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        save(output)
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    with zipfile.ZipFile(output) as archive:
+        bad = archive.testzip()
+    if bad is not None:
+        raise RuntimeError(f"Fehlerhaftes Archivmitglied: {bad}")
+    return {'seconds': round(best, 4), 'output_bytes': os.path.getsize(output)}
+
+
+def main():
+    from synthetic import DATA_DIR, dataset_name, generate_dataset
+    from src.core.docx_writer import DocxWriter
+
+    parser = argparse.ArgumentParser(description="Pic2Doc save benchmark")
+    parser.add_argument('--rows', type=int, default=600, help="Dataset size (rows)")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9], help="Compression levels")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4], help="Compression thread counts")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per variant (best is reported)")
+    parser.add_argument('--data-dir', help="Parent directory of the generated datasets")
+    parser.add_argument('--no-save', action='store_true', help="Do not write a result file")
+    args = parser.parse_args()
+
+    name = dataset_name(args.rows, 1, 0.0, 1)
+    print(f"Datensatz {name} ...")
+    dataset = generate_dataset(args.rows, 1, 0.0, out_dir=Path(args.data_dir or DATA_DIR))
+
+    results = {
+        'benchmark': 'save',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'dataset': name,
+        'variants': {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'bench.docx')
+        doc = build_document(dataset, output)
+
+        def docx_save(path):
+            doc.save(path)
+
+        variants = [('python-docx', docx_save)]
+        for level in args.levels:
+            for workers in args.workers:
+                def writer_save(path, writer=DocxWriter(level, workers)):
+                    with open(path, 'wb') as f:
+                        writer.save(doc, f)
+                variants.append((f"level{level}-threads{workers}", writer_save))
+
+        baseline = None
+        for label, save in variants:
+            result = results['variants'][label] = measure(save, output, args.repeat)
+            baseline = baseline or result
+            line = (f"  {label:20} {result['seconds']:7.2f} s   {result['output_bytes'] / 1024 ** 2:7.1f} MB")
+            if result is not baseline:
+                speedup = baseline['seconds'] / result['seconds'] if result['seconds'] else 0
+                size = (result['output_bytes'] - baseline['output_bytes']) / baseline['output_bytes'] * 100
+                line += f"   {speedup:5.1f}x schneller, Größe {size:+.1f}%"
+            print(line)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out_file = RESULTS_DIR / f"save-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        out_file.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Ergebnis gespeichert: {out_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
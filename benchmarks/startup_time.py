@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the Pic2Doc entry points
+
+Imports each entry-point module in a fresh interpreter with
+`python -X importtime`, sums the import cost and records which heavy
+libraries (openpyxl, python-docx/lxml, Pillow) were loaded eagerly.
+
+Usage:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --runs 7 --compare benchmarks/results/startup-baseline.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+# Entry-point modules to measure
+ENTRY_POINTS = {
+    'cli': 'src.main',
+    'gui': 'src.gui.main_window',
+}
+
+# Libraries that must not be imported before the UI is shown
+HEAVY_PACKAGES = ('openpyxl', 'docx', 'lxml', 'PIL')
+
+
+def measure_import(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter and parse -X importtime output
+
+    Args:
+        module: Dotted module name to import
+
+    Returns:
+        Dictionary with total import time (us), slowest top-level imports
+        and heavy packages that were imported
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=str(REPO_ROOT),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import failed'}
+
+    total_us = 0
+    top_level = []
+    imported = set()
+
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # Format: "import time: <self us> | <cumulative us> | <indented name>"
+        _, cumulative_us, raw_name = line.split('|', 2)
+        name = raw_name.strip()
+        imported.add(name.split('.')[0])
+        # Nested imports are indented further than top-level ones
+        if not raw_name.startswith('  '):
+            cumulative = int(cumulative_us)
+            total_us += cumulative
+            top_level.append((name, cumulative))
+
+    top_level.sort(key=lambda item: item[1], reverse=True)
+    return {
+        'total_us': total_us,
+        'slowest': top_level[:10],
+        'heavy_imports': sorted(p for p in HEAVY_PACKAGES if p in imported),
+    }
+
+
+def run_benchmark(runs: int) -> dict:
+    """
+    Measure all entry points several times
+
+    Args:
+        runs: Number of fresh-interpreter runs per entry point
+
+    Returns:
+        Result dictionary (median import time per entry point)
+    """
+    results = {}
+    for label, module in ENTRY_POINTS.items():
+        samples = [measure_import(module) for _ in range(runs)]
+        failed = [s for s in samples if 'error' in s]
+        if failed:
+            results[label] = {'module': module, 'error': failed[0]['error']}
+            continue
+        median_us = statistics.median(s['total_us'] for s in samples)
+        results[label] = {
+            'module': module,
+            'median_ms': round(median_us / 1000, 2),
+            'runs': runs,
+            'slowest': samples[-1]['slowest'],
+            'heavy_imports': samples[-1]['heavy_imports'],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pic2Doc startup-time benchmark")
+    parser.add_argument('--runs', type=int, default=5, help="Runs per entry point (median is reported)")
+    parser.add_argument('--compare', help="Previous result JSON to compare against")
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help="Fail if an entry point got slower by more than this percentage")
+    parser.add_argument('--no-save', action='store_true', help="Do not write a result file")
+    args = parser.parse_args()
+
+    results = {
+        'benchmark': 'startup_time',
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'entry_points': run_benchmark(args.runs),
+    }
+
+    exit_code = 0
+    for label, result in results['entry_points'].items():
+        if 'error' in result:
+            print(f"{label:4} {result['module']:24} nicht messbar: {result['error']}")
+            continue
+        heavy = ', '.join(result['heavy_imports']) or '-'
+        print(f"{label:4} {result['module']:24} {result['median_ms']:8.1f} ms   schwere Module: {heavy}")
+        if result['heavy_imports']:
+            exit_code = 1
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['entry_points']
+        for label, result in results['entry_points'].items():
+            before = baseline.get(label, {}).get('median_ms')
+            if before is None or 'median_ms' not in result:
+                continue
+            change = (result['median_ms'] - before) / before * 100
+            print(f"{label:4} {before:8.1f} ms -> {result['median_ms']:8.1f} ms ({change:+.1f}%)")
+            if change > args.max_regression:
+                exit_code = 1
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out_file = RESULTS_DIR / f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        out_file.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Ergebnis gespeichert: {out_file}")
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for the Pic2Doc benchmarks
+
+Creates a workbook (filename column A, caption columns from I onwards)
+and a matching image folder offline and deterministically (seeded).
+Images come in mixed sizes, aspect ratios and formats; only a small pool
+of distinct images is rendered, every row gets its own file name as a
+hard link (or copy) of one of them, so 200k-row datasets stay cheap.
+
+Usage:
+    python benchmarks/synthetic.py --rows 10000 --captions 3
+    python benchmarks/synthetic.py --rows 200000 --missing 0.01 --out /tmp/pic2doc-data
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from PIL import Image
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+# (width, height) of the distinct images: landscape, portrait, square, panorama
+IMAGE_SIZES = [
+    (640, 480), (1024, 768), (1600, 1200), (2400, 1800),
+    (1920, 1080), (1280, 720),
+    (480, 640), (768, 1024), (1200, 1600),
+    (800, 800), (1500, 1500),
+    (2400, 800),
+]
+IMAGE_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp']
+# Relative frequency of the formats (mostly JPEG, like real photo folders)
+FORMAT_WEIGHTS = [6, 2, 2, 1]
+
+CAPTION_WORDS = ['Raum', 'Decke', 'Wand', 'Boden', 'Fenster', 'Tür', 'Riss', 'Feuchte',
+                 'Nord', 'Süd', 'Ost', 'West', 'EG', 'OG', 'Keller', 'Dach']
+
+
+def dataset_name(rows: int, captions: int, missing: float, seed: int, repeat: float = 0.0) -> str:
+    """Directory name identifying a dataset's parameters"""
+    name = f"rows{rows}-cap{captions}-miss{missing:g}-seed{seed}"
+    return f"{name}-rep{repeat:g}" if repeat else name
+
+
+def render_image(path: Path, size, rng: random.Random):
+    """
+    Render one image: a colour gradient with noise (compresses like a photo)
+
+    Args:
+        path: Target file (format from the extension)
+        size: (width, height)
+        rng: Random generator
+    """
+    noise = Image.effect_noise(size, rng.uniform(20, 60))
+    gradient = Image.linear_gradient('L').resize(size)
+    tint = Image.new('L', size, rng.randrange(256))
+    image = Image.merge('RGB', (gradient, noise, tint))
+    if path.suffix.lower() in ('.jpg', '.jpeg'):
+        image.save(path, quality=85)
+    else:
+        image.save(path)
+
+
+def generate_images(folder: Path, names: List[str], variants: int, rng: random.Random) -> Dict[str, int]:
+    """
+    Create one image file per name
+
+    Args:
+        folder: Image folder (created; the distinct images go next to it)
+        names: File names without extension
+        variants: Number of distinct images to render
+        rng: Random generator
+
+    Returns:
+        Count of files per extension
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    # Kept outside the image folder so it doesn't show up in lookups
+    pool_dir = folder.parent / 'pool'
+    pool_dir.mkdir(exist_ok=True)
+
+    pool = []
+    for index in range(max(1, variants)):
+        extension = rng.choices(IMAGE_FORMATS, FORMAT_WEIGHTS)[0]
+        path = pool_dir / f"variant{index:03d}{extension}"
+        render_image(path, IMAGE_SIZES[index % len(IMAGE_SIZES)], rng)
+        pool.append(path)
+
+    formats: Dict[str, int] = {}
+    for name in names:
+        source = rng.choice(pool)
+        target = folder / f"{name}{source.suffix}"
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+        formats[source.suffix] = formats.get(source.suffix, 0) + 1
+    return formats
+
+
+def generate_workbook(path: Path, names: List[str], captions: int, rng: random.Random) -> List[str]:
+    """
+    Write the workbook (header row, filenames in column A, captions from column I)
+
+    Args:
+        path: Target .xlsx file
+        names: File names without extension (one row each)
+        captions: Number of caption columns
+        rng: Random generator
+
+    Returns:
+        Caption column letters
+    """
+    caption_columns = [get_column_letter(9 + offset) for offset in range(captions)]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Fotos')
+    sheet.append(['Datei'] + [f"Feld {col}" for col in range(2, 9)]
+                 + [f"Beschreibung {index + 1}" for index in range(captions)])
+    for name in names:
+        row = [name] + [None] * 7
+        for _ in range(captions):
+            row.append(' '.join(rng.choices(CAPTION_WORDS, k=rng.randint(1, 6))))
+        sheet.append(row)
+    workbook.save(path)
+    return caption_columns
+
+
+def generate_dataset(rows: int, captions: int = 1, missing: float = 0.0, variants: int = 48,
+                     seed: int = 1, out_dir: Path = DATA_DIR, force: bool = False,
+                     repeat: float = 0.0) -> Dict[str, Any]:
+    """
+    Create (or reuse) a synthetic dataset
+
+    Args:
+        rows: Number of workbook rows
+        captions: Number of caption columns
+        missing: Fraction of rows without an image file
+        variants: Number of distinct images
+        seed: Random seed
+        out_dir: Parent directory of the datasets
+        force: Regenerate even if the dataset exists
+        repeat: Fraction of rows that reference an earlier row's image again
+
+    Returns:
+        Dataset description (also stored as dataset.json), including the
+        config keys excel_file, image_folder and caption_columns
+    """
+    root = Path(out_dir) / dataset_name(rows, captions, missing, seed, repeat)
+    info_file = root / 'dataset.json'
+    if info_file.exists() and not force:
+        return json.loads(info_file.read_text(encoding='utf-8'))
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    names = []
+    for index in range(1, rows + 1):
+        if names and rng.random() < repeat:
+            names.append(rng.choice(names))
+        else:
+            names.append(f"IMG {index:06d}")
+    unique = list(dict.fromkeys(names))
+    present = [name for name in unique if rng.random() >= missing]
+
+    excel_file = root / 'data.xlsx'
+    image_folder = root / 'images'
+    caption_columns = generate_workbook(excel_file, names, captions, rng)
+    formats = generate_images(image_folder, present, variants, rng)
+
+    info = {
+        'rows': rows,
+        'captions': captions,
+        'missing': len(unique) - len(present),
+        'repeated': rows - len(unique),
+        'variants': variants,
+        'seed': seed,
+        'repeat': repeat,
+        'formats': formats,
+        'excel_file': str(excel_file),
+        'image_folder': str(image_folder),
+        'caption_columns': caption_columns,
+        'excel_bytes': excel_file.stat().st_size,
+        'generated_seconds': round(time.perf_counter() - started, 2),
+    }
+    info_file.write_text(json.dumps(info, indent=2), encoding='utf-8')
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pic2Doc synthetic dataset generator")
+    parser.add_argument('--rows', type=int, default=1000, help="Number of workbook rows")
+    parser.add_argument('--captions', type=int, default=1, help="Number of caption columns")
+    parser.add_argument('--missing', type=float, default=0.0, help="Fraction of rows without image")
+    parser.add_argument('--variants', type=int, default=48, help="Number of distinct images")
+    parser.add_argument('--repeat', type=float, default=0.0,
+                        help="Fraction of rows that reference an earlier row's image again")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed")
+    parser.add_argument('--out', default=str(DATA_DIR), help="Parent directory of the datasets")
+    parser.add_argument('--force', action='store_true', help="Regenerate an existing dataset")
+    args = parser.parse_args()
+
+    info = generate_dataset(args.rows, args.captions, args.missing, args.variants,
+                            args.seed, Path(args.out), args.force, args.repeat)
+    print(json.dumps(info, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
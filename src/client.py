@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pic2Doc Client Entry Point
+Submits jobs to a running Pic2Doc server and prints its progress events
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.job_client import JobClient
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Pic2Doc Job-Client")
+    parser.add_argument('job', nargs='?', help="JSON-Datei mit der Job-Konfiguration")
+    parser.add_argument('--host', default='127.0.0.1', help="Server-Adresse (Standard: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Server-Port (Standard: 8765)")
+    parser.add_argument('--socket', help="Unix-Socket des Servers")
+    parser.add_argument('--status', action='store_true', help="Nur Server-Status anzeigen")
+    parser.add_argument('--cancel', metavar='JOB_ID', help="Laufenden Job abbrechen")
+    args = parser.parse_args()
+
+    client = JobClient(args.host, args.port, socket_path=args.socket)
+
+    if args.cancel:
+        if client.cancel(args.cancel):
+            print(f"⏹ Job {args.cancel} wird abgebrochen")
+            return 0
+        print(f"✗ Job {args.cancel} nicht gefunden")
+        return 1
+
+    if args.status or not args.job:
+        print(json.dumps(client.status(), indent=2, ensure_ascii=False))
+        return 0
+
+    with open(args.job, 'r', encoding='utf-8') as f:
+        job = json.load(f)
+
+    exit_code = 1
+    for event in client.submit(job):
+        kind = event['event']
+        if kind == 'queued':
+            print(f"⏳ Job {event['job_id']} in Warteschlange (Position {event['queue_depth']})")
+        elif kind == 'progress':
+            print(f"  {event['current']}/{event['total']}: {event['filename']}")
+        elif kind == 'stage':
+            print(f"→ {event['stage']}")
+        elif kind == 'error':
+            print(f"⚠ {event['filename']}: {event['error']}")
+        elif kind == 'done':
+            print(f"✓ Fertig! {event['processed']} Bilder verarbeitet, {len(event['errors'])} Fehler")
+            exit_code = 0
+        elif kind == 'cancelled':
+            print("⏹ Abgebrochen")
+        elif kind == 'failed':
+            print(f"✗ Fehler: {event['error']}")
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
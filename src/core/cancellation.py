@@ -0,0 +1,79 @@
+"""
+Cancellation for Pic2Doc
+Cooperative cancellation token checked by every processing stage
+"""
+
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised by a processing stage when its cancellation token was triggered"""
+
+    def __init__(self, message: str = "Vorgang abgebrochen"):
+        super().__init__(message)
+
+
+class CancellationToken:
+    """
+    Shared flag that signals processing stages to stop
+
+    Stages call raise_if_cancelled() at safe points (per row, per image,
+    per written block), so a cancelled run stops within one unit of work.
+    """
+
+    def __init__(self, event=None):
+        """
+        Initialize cancellation token
+
+        Args:
+            event: Optional event object with set()/is_set(), e.g. a
+                   multiprocessing.Event to cancel work in another process
+        """
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        """Request cancellation"""
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        """True once cancel() was called"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """
+        Raise OperationCancelled if cancellation was requested
+
+        Raises:
+            OperationCancelled: If cancel() was called
+        """
+        if self._event.is_set():
+            raise OperationCancelled()
+
+
+class CancellableWriter:
+    """
+    File wrapper that checks a cancellation token on every write
+
+    Used for the document save step so that packaging a large document
+    can be aborted as well.
+    """
+
+    def __init__(self, fileobj, cancel_token: CancellationToken):
+        """
+        Initialize writer
+
+        Args:
+            fileobj: Binary file object to write to
+            cancel_token: Token checked before each write
+        """
+        self._fileobj = fileobj
+        self._cancel_token = cancel_token
+
+    def write(self, data) -> int:
+        self._cancel_token.raise_if_cancelled()
+        return self._fileobj.write(data)
+
+    def __getattr__(self, name):
+        # seek/tell/flush etc. are passed through (zipfile needs them)
+        return getattr(self._fileobj, name)
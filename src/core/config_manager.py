@@ -6,34 +6,64 @@ Handles loading, saving, and migrating configuration files
 import json
 import os
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..utils.constants import CONFIG_FILE, DEFAULT_CONFIG
+from ..utils.file_utils import write_text_atomic
+from ..utils.log import get_logger
+
+log = get_logger('config')
+
+
+def app_data_path(filename: str):
+    """
+    Location for files the application persists between runs
+
+    Args:
+        filename: File name (e.g. CONFIG_FILE)
+
+    Returns:
+        Path in the user's home directory when running as PyInstaller
+        bundle, otherwise the file name relative to the current directory
+    """
+    if getattr(sys, 'frozen', False):
+        # Running as bundle - use home directory
+        return Path.home() / filename
+    # Running normally - use current directory
+    return filename
 
 
 class ConfigManager:
-    """Manages application configuration persistence"""
+    """
+    Manages application configuration persistence
+
+    save_config() writes synchronously; schedule_save() coalesces rapid
+    changes (e.g. from GUI widgets) and writes them once on a background
+    timer. Both write atomically and skip the write if the file content
+    would not change. The disk write happens outside the lock that
+    schedule_save() takes, so a slow disk never blocks the GUI thread.
+    """
 
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, save_delay: float = 0.5):
         """
         Initialize configuration manager
 
         Args:
             config_path: Optional custom path to config file
+            save_delay: Seconds schedule_save() waits for further changes
         """
-        if config_path:
-            self.config_path = config_path
-        else:
-            # When running as PyInstaller bundle, save config in user's home directory
-            if getattr(sys, 'frozen', False):
-                # Running as bundle - use home directory
-                home_dir = Path.home()
-                self.config_path = home_dir / CONFIG_FILE
-                print(f"DEBUG: Running as bundle, config path: {self.config_path}")
-            else:
-                # Running normally - use current directory
-                self.config_path = CONFIG_FILE
-                print(f"DEBUG: Running from source, config path: {self.config_path}")
+        self.save_delay = save_delay
+        self._lock = threading.Lock()  # Guards the pending save and its timer
+        self._timer: Optional[threading.Timer] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._generation = 0  # Increases with every save handed to _write()
+        # Serializes disk writes; guards the two fields below
+        self._write_lock = threading.Lock()
+        self._last_written: Optional[str] = None  # File content as last read or written
+        self._written_generation = 0
+
+        self.config_path = config_path or app_data_path(CONFIG_FILE)
 
     def load_config(self) -> Dict[str, Any]:
         """
@@ -45,16 +75,19 @@ class ConfigManager:
         if os.path.exists(self.config_path):
             try:
                 with open(self.config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                print(f"✓ Konfiguration geladen aus: {self.config_path}")
+                    content = f.read()
+                config = json.loads(content)
+                with self._write_lock:
+                    self._last_written = content
+                log.info("✓ Konfiguration geladen aus: %s", self.config_path)
 
                 # Migrate old config format if needed
                 config = self._migrate_config(config)
 
                 return config
             except Exception as e:
-                print(f"⚠ Fehler beim Laden der Konfiguration: {e}")
-                print("  Verwende Standard-Konfiguration")
+                log.warning("⚠ Fehler beim Laden der Konfiguration: %s", e)
+                log.warning("  Verwende Standard-Konfiguration")
                 return DEFAULT_CONFIG.copy()
         else:
             return DEFAULT_CONFIG.copy()
@@ -63,19 +96,89 @@ class ConfigManager:
         """
         Save configuration to file
 
+        Cancels a pending scheduled save, since this call supersedes it.
+
         Args:
             config: Dictionary with configuration values
 
         Returns:
-            True if successful, False otherwise
+            True if successful (or nothing changed), False otherwise
+        """
+        with self._lock:
+            self._cancel_timer()
+            self._pending = None
+            self._generation += 1
+            generation = self._generation
+        return self._write(config, generation)
+
+    def schedule_save(self, config: Dict[str, Any], delay: Optional[float] = None):
+        """
+        Save configuration after a short delay on a background thread
+
+        Further calls within the delay replace the pending configuration
+        and restart the timer, so a burst of changes results in one write.
+
+        Args:
+            config: Dictionary with configuration values (copied)
+            delay: Seconds to wait; defaults to save_delay
+        """
+        with self._lock:
+            self._pending = dict(config)
+            self._cancel_timer()
+            self._timer = threading.Timer(self.save_delay if delay is None else delay,
+                                          self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> bool:
+        """
+        Write a pending scheduled save immediately (e.g. before exit)
+
+        Returns:
+            True if nothing was pending or the write succeeded
+        """
+        with self._lock:
+            self._cancel_timer()
+            config, self._pending = self._pending, None
+            if config is None:
+                return True
+            self._generation += 1
+            generation = self._generation
+        return self._write(config, generation)
+
+    def _cancel_timer(self):
+        # Caller holds self._lock; a timer that already fired just finds nothing pending
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _write(self, config: Dict[str, Any], generation: int) -> bool:
+        """
+        Write configuration atomically (temp file + rename) if it changed
+
+        Caller must not hold self._lock. A save that was overtaken by a
+        newer one (higher generation) is skipped.
+
+        Args:
+            config: Configuration snapshot, not modified by other threads
+            generation: Value of self._generation when the save was taken
+
+        Returns:
+            True if successful, unchanged or superseded, False otherwise
         """
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
-            print(f"✓ Konfiguration gespeichert in: {self.config_path}")
+            content = json.dumps(config, indent=4, ensure_ascii=False)
+            with self._write_lock:
+                if generation < self._written_generation:
+                    return True
+                if content != self._last_written:
+                    write_text_atomic(self.config_path, content, prefix='.pic2doc_config.')
+                    self._last_written = content
+                    log.info("✓ Konfiguration gespeichert in: %s", self.config_path)
+                self._written_generation = generation
             return True
         except Exception as e:
-            print(f"⚠ Fehler beim Speichern der Konfiguration: {e}")
+            log.warning("⚠ Fehler beim Speichern der Konfiguration: %s", e)
             return False
 
     def _migrate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
@@ -108,6 +211,6 @@ class ConfigManager:
                 migrated = True
 
         if migrated:
-            print("  → Konfiguration wurde auf neues Format aktualisiert")
+            log.info("  → Konfiguration wurde auf neues Format aktualisiert")
 
         return config
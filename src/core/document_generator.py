@@ -8,9 +8,25 @@ from docx.shared import Pt, Inches, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
-from typing import List, Tuple, Dict, Any, Callable, Optional
+from typing import List, Tuple, Dict, Any, Callable, Iterable, Optional, Union
 from pathlib import Path
-import math
+from itertools import islice
+import logging
+import os
+import time
+
+from .cancellation import CancellationToken, OperationCancelled
+from .docx_writer import DocxWriter
+from .image_record import ImageRecord
+from .linked_images import PictureLinker
+from .picture_embedder import DigestCache, PictureEmbedder
+from .prefetch import ImagePrefetcher
+from .layout import calculate_image_size, calculate_layout, page_width_inches
+from .run_report import RunReport
+from .tracing import TraceRecorder
+from ..utils.log import get_logger
+
+log = get_logger('document')
 
 
 class DocumentGenerator:
@@ -24,6 +40,11 @@ class DocumentGenerator:
             config: Configuration dictionary with formatting settings
         """
         self.config = config
+        # Files and bytes read while embedding pictures in the last call, and
+        # pictures that reused the part of a file embedded before
+        self.embed_stats: Dict[str, int] = {'files_read': 0, 'bytes_read': 0, 'deduplicated': 0}
+        # Seconds spent in the last create_document() call ('render', 'save')
+        self.timings: Dict[str, float] = {}
 
     def _set_document_margins(self, doc: Document):
         """
@@ -40,153 +61,6 @@ class DocumentGenerator:
             section.left_margin = Cm(self.config.get('margin_left_cm', 1.27))
             section.right_margin = Cm(self.config.get('margin_right_cm', 1.27))
 
-    def _calculate_optimal_grid(self, images_per_page: int) -> Tuple[int, int]:
-        """
-        Calculate optimal grid layout (cols x rows) for given number of images
-
-        Args:
-            images_per_page: Number of images to fit on one page
-
-        Returns:
-            Tuple of (cols, rows) for optimal space utilization
-        """
-        if images_per_page == 1:
-            return (1, 1)
-        elif images_per_page == 2:
-            return (2, 1)  # 2 images side by side
-        elif images_per_page == 3:
-            return (2, 2)  # 2x2 grid, last cell empty
-        elif images_per_page == 4:
-            return (2, 2)  # Perfect 2x2 grid
-        elif images_per_page == 5:
-            return (3, 2)  # 3x2 grid, last cell empty
-        elif images_per_page == 6:
-            return (3, 2)  # Perfect 3x2 grid
-        elif images_per_page == 7:
-            return (3, 3)  # 3x3 grid, 2 cells empty
-        elif images_per_page == 8:
-            return (3, 3)  # 3x3 grid, 1 cell empty
-        elif images_per_page == 9:
-            return (3, 3)  # Perfect 3x3 grid
-        elif images_per_page == 10:
-            return (3, 4)  # 3x4 grid, 2 cells empty
-        else:
-            # For larger numbers, calculate optimal grid
-            # Try to get close to square aspect ratio
-            cols = math.ceil(math.sqrt(images_per_page))
-            rows = math.ceil(images_per_page / cols)
-            return (cols, rows)
-
-    def _calculate_layout(self, images_per_page: int, page_images: List[Tuple]) -> List[List[int]]:
-        """
-        Calculate intelligent layout for images on a page to maximize space utilization
-        Fills row by row in strict order from the image list
-
-        Args:
-            images_per_page: Target number of images per page
-            page_images: List of image data tuples for this page
-
-        Returns:
-            List of rows, where each row contains indices of images in that row
-            Example: [[0, 1], [2, 3]] = 2x2 grid layout (strict left-to-right, top-to-bottom order)
-        """
-        num_images = len(page_images)
-
-        # Get optimal grid dimensions
-        cols, rows = self._calculate_optimal_grid(images_per_page)
-
-        # Build layout row by row in strict order
-        layout = []
-        img_idx = 0
-
-        for row in range(rows):
-            if img_idx >= num_images:
-                break
-
-            row_images = []
-            for col in range(cols):
-                if img_idx < num_images:
-                    row_images.append(img_idx)
-                    img_idx += 1
-                else:
-                    break
-
-            if row_images:
-                layout.append(row_images)
-
-        return layout
-
-    def _calculate_image_size(self, image_info: Optional[Dict], available_width: float,
-                             num_in_row: int, images_per_page: int, total_rows: int,
-                             font_size: int) -> Tuple[float, float]:
-        """
-        Calculate appropriate image size based on available space and grid layout
-        Uses much more conservative estimates to prevent page breaks
-
-        Args:
-            image_info: Dict with image dimensions and orientation
-            available_width: Available width in inches for all images in row
-            num_in_row: Number of images in this row
-            images_per_page: Total images expected per page
-            total_rows: Total number of rows in grid
-            font_size: Font size for captions in points
-
-        Returns:
-            Tuple of (width, height) in inches
-        """
-        if not image_info:
-            # Fallback size
-            width = available_width / num_in_row * 0.85
-            return (width, width * 1.33)  # Assume portrait aspect ratio
-
-        aspect_ratio = image_info.get('aspect_ratio', 1.0)
-
-        # Calculate width per image with padding between images
-        padding_between = 0.05  # Reduced padding
-        total_padding = padding_between * (num_in_row - 1)
-        width_per_image = (available_width - total_padding) / num_in_row
-
-        # Calculate height based on aspect ratio
-        height = width_per_image / aspect_ratio
-
-        # VERY conservative height calculation to prevent ANY page breaks
-        # A4 page is 11.7 inches tall
-        usable_height = 8.5  # Very conservative estimate (was 9.0)
-
-        # Calculate caption height - be more generous
-        caption_height_per_row = (font_size / 72) * 2.5  # Increased from 2.0
-
-        # More spacing between rows
-        spacing_between_rows = 0.15  # Increased from 0.1
-
-        # More table overhead
-        table_overhead = 0.3  # Increased from 0.2
-
-        # Calculate total space needed
-        total_caption_space = caption_height_per_row * total_rows
-        total_row_spacing = spacing_between_rows * max(0, total_rows - 1)
-
-        # Available space for all images
-        available_for_images = usable_height - total_caption_space - total_row_spacing - table_overhead
-
-        # Max height per image
-        max_height_per_image = available_for_images / total_rows
-
-        # Reduce further for many columns
-        if num_in_row > 2:
-            max_height_per_image *= 0.90  # More conservative
-
-        # Apply maximum height constraint
-        if height > max_height_per_image:
-            height = max_height_per_image
-            width_per_image = height * aspect_ratio
-
-        # Final safety reduction - reduce everything by 10%
-        width_per_image *= 0.90
-        height *= 0.90
-
-        return (width_per_image, height)
-
     def _make_table_keep_together(self, table):
         """
         Apply keep-together properties to prevent table from breaking across pages
@@ -213,29 +87,34 @@ class DocumentGenerator:
             cantSplit.set(qn('w:val'), '1')
             trPr.append(cantSplit)
 
-    def create_document(
+    def _fill_document(
         self,
-        image_data: List[Tuple[str, str, str, Optional[Dict]]],
-        output_path: str,
-        progress_callback: Optional[Callable[[int, int, str], None]] = None
-    ) -> tuple[int, List[str]]:
+        doc: Document,
+        image_data: Iterable[ImageRecord],
+        progress_callback: Optional[Callable[[int, int, str], None]],
+        total: int,
+        cancel_token: CancellationToken,
+        report: RunReport,
+        embedder: Union[PictureEmbedder, PictureLinker]
+    ) -> Tuple[int, List[str], List[Tuple[str, str]], int]:
         """
-        Create Word document with images and captions using intelligent layout
-        Maintains strict Excel sheet order
+        Add all pages with images and captions to the document
 
         Args:
-            image_data: List of tuples (filename, caption, image_path, image_info_dict)
-                       image_info_dict contains: orientation, width, height, aspect_ratio
-                       Images are processed in the EXACT order they appear in this list
-            output_path: Path where to save the document
+            doc: New document to fill
+            image_data: Iterable of ImageRecords
             progress_callback: Optional callback function(current, total, filename)
+            total: Expected number of entries for progress reporting
+            cancel_token: Token checked before every image
+            report: Run report receiving the 'layout' and 'xml' stage timings
+            embedder: Adds the pictures (embedded or linked)
 
         Returns:
-            Tuple of (processed_count, error_list)
-        """
-        print("\nErstelle Word-Dokument...")
+            Tuple of (processed_count, missing_files, error_details, total_images)
 
-        doc = Document()
+        Raises:
+            OperationCancelled: If cancel_token was triggered
+        """
         self._set_document_margins(doc)
 
         # Set default font for document
@@ -245,43 +124,57 @@ class DocumentGenerator:
         processed_count = 0
         missing_files = []
         error_details = []  # Store (filename, error_message) tuples
-        total_images = len(image_data)
+        total_images = total
         images_per_page = self.config['images_per_page']
 
         # Calculate page width (A4 with margins)
-        page_width_inches = 8.27 - (self.config.get('margin_left_cm', 1.27) + self.config.get('margin_right_cm', 1.27)) / 2.54
+        page_width = page_width_inches(self.config)
+        # Checked once: the per-image line must cost nothing when disabled
+        debug = log.isEnabledFor(logging.DEBUG)
 
         # Process images in pages - STRICT ORDER from Excel
-        for page_start in range(0, total_images, images_per_page):
-            page_end = min(page_start + images_per_page, total_images)
-            page_images = image_data[page_start:page_end]
+        # Pages are pulled lazily so streamed input is consumed page by page
+        entries = iter(image_data)
+        consumed = 0
+        while True:
+            page_images = list(islice(entries, images_per_page))
+            if not page_images:
+                break
+
+            # Add page break between pages (i.e. after each page except last)
+            if consumed > 0:
+                doc.add_page_break()
+            consumed += len(page_images)
+            total_images = max(total_images, consumed)
 
             # Calculate layout for this page
-            layout = self._calculate_layout(images_per_page, page_images)
+            with report.stage('layout', items=len(page_images)):
+                layout = calculate_layout(images_per_page, len(page_images))
             total_rows = len(layout)
 
             # Get max columns to create table
             max_cols = max(len(row) for row in layout)
 
-            # Create one table for the entire page grid
-            # Table has 2 rows per image row (image row + caption row)
-            table = doc.add_table(rows=total_rows * 2, cols=max_cols)
-            table.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-            # Make table stay together on one page
-            self._make_table_keep_together(table)
-
-            # Remove table borders
-            for row in table.rows:
-                for cell in row.cells:
-                    cell_elem = cell._element
-                    tc_pr = cell_elem.get_or_add_tcPr()
-                    tc_borders = OxmlElement('w:tcBorders')
-                    for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-                        border = OxmlElement(f'w:{border_name}')
-                        border.set(qn('w:val'), 'none')
-                        tc_borders.append(border)
-                    tc_pr.append(tc_borders)
+            with report.stage('xml', items=0):
+                # Create one table for the entire page grid
+                # Table has 2 rows per image row (image row + caption row)
+                table = doc.add_table(rows=total_rows * 2, cols=max_cols)
+                table.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+                # Make table stay together on one page
+                self._make_table_keep_together(table)
+
+                # Remove table borders
+                for row in table.rows:
+                    for cell in row.cells:
+                        cell_elem = cell._element
+                        tc_pr = cell_elem.get_or_add_tcPr()
+                        tc_borders = OxmlElement('w:tcBorders')
+                        for border_name in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+                            border = OxmlElement(f'w:{border_name}')
+                            border.set(qn('w:val'), 'none')
+                            tc_borders.append(border)
+                        tc_pr.append(tc_borders)
 
             # Fill the table with images IN STRICT ORDER
             for layout_row_idx, row_indices in enumerate(layout):
@@ -289,85 +182,209 @@ class DocumentGenerator:
                 table_row_idx = layout_row_idx * 2  # Each layout row takes 2 table rows
 
                 for col_idx, img_idx in enumerate(row_indices):
-                    entry = page_images[img_idx]
-
-                    if len(entry) == 4:
-                        filename, caption, image_path, image_info = entry
-                    else:
-                        filename, caption, image_path = entry
-                        image_info = None
+                    cancel_token.raise_if_cancelled()
+                    record = page_images[img_idx]
+                    filename = record.filename
+                    caption = record.caption
+                    image_path = record.path
 
                     try:
                         # Calculate size
-                        img_width, img_height = self._calculate_image_size(
-                            image_info,
-                            page_width_inches,
-                            num_in_row,
-                            images_per_page,
-                            total_rows,
-                            self.config['font_size']
-                        )
-
-                        # Add image to table
-                        cell = table.rows[table_row_idx].cells[col_idx]
-                        paragraph = cell.paragraphs[0]
-                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        run = paragraph.add_run()
-                        run.add_picture(image_path, width=Inches(img_width))
-
-                        # Add caption to next row
-                        cell = table.rows[table_row_idx + 1].cells[col_idx]
-                        paragraph = cell.paragraphs[0]
-                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        caption_run = paragraph.add_run(caption)
-
-                        # Apply font formatting
-                        caption_font = caption_run.font
-                        caption_font.name = self.config['font_name']
-                        caption_font.size = Pt(self.config['font_size'])
-                        caption_font.bold = self.config['font_bold']
-                        caption_font.italic = self.config['font_italic']
-                        caption_font.underline = self.config['font_underline']
+                        with report.stage('layout', items=0, image=filename):
+                            img_width, img_height = calculate_image_size(
+                                record.aspect_ratio,
+                                page_width,
+                                num_in_row,
+                                images_per_page,
+                                total_rows,
+                                self.config['font_size']
+                            )
+
+                        with report.stage('xml', image=filename, span='embed') as section:
+                            # Add image to table
+                            cell = table.rows[table_row_idx].cells[col_idx]
+                            paragraph = cell.paragraphs[0]
+                            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                            run = paragraph.add_run()
+                            section['bytes_read'] = embedder.add_picture(run, image_path, Inches(img_width))
+
+                            # Add caption to next row
+                            cell = table.rows[table_row_idx + 1].cells[col_idx]
+                            paragraph = cell.paragraphs[0]
+                            paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                            caption_run = paragraph.add_run(caption)
+
+                            # Apply font formatting
+                            caption_font = caption_run.font
+                            caption_font.name = self.config['font_name']
+                            caption_font.size = Pt(self.config['font_size'])
+                            caption_font.bold = self.config['font_bold']
+                            caption_font.italic = self.config['font_italic']
+                            caption_font.underline = self.config['font_underline']
 
                         processed_count += 1
-                        print(f"✓ Bild {processed_count}: {filename}")
+                        if debug:
+                            log.debug("✓ Bild %d: %s", processed_count, filename)
 
                         if progress_callback:
                             progress_callback(processed_count, total_images, filename)
 
                     except FileNotFoundError as e:
                         error_msg = f"Datei nicht gefunden"
-                        print(f"✗ Fehler bei {filename}: {error_msg}")
+                        log.warning("✗ Fehler bei %s: %s", filename, error_msg, extra={'image': filename})
                         missing_files.append(filename)
                         error_details.append((filename, error_msg))
                     except Exception as e:
                         error_msg = str(e)
-                        print(f"✗ Fehler bei {filename}: {error_msg}")
+                        log.warning("✗ Fehler bei %s: %s", filename, error_msg, extra={'image': filename})
                         missing_files.append(filename)
                         error_details.append((filename, error_msg))
 
-            # Add page break after each page (except last)
-            if page_end < total_images:
-                doc.add_page_break()
+        self.embed_stats = {'files_read': embedder.files_read, 'bytes_read': embedder.bytes_read,
+                            'deduplicated': embedder.deduplicated}
+        report.set_count('deduplicated', embedder.deduplicated)
+        return processed_count, missing_files, error_details, consumed
+
+    def _picture_embedder(self, doc: Document, output_path: str,
+                          prefetcher: Optional[ImagePrefetcher] = None,
+                          digests: Optional[DigestCache] = None) -> Union[PictureEmbedder, PictureLinker]:
+        """
+        Embedder for the configured picture mode
+
+        With config['link_images'] pictures are linked to the image files
+        (relative to the output folder, or absolute file:// links with
+        config['link_paths'] = 'absolute') instead of embedded.
+
+        Args:
+            doc: Document to fill
+            output_path: Final output path
+            prefetcher: Optional read-ahead buffer (only used when embedding)
+            digests: Optional SHA1 cache shared between documents (only used when embedding)
+
+        Returns:
+            PictureEmbedder or PictureLinker
+        """
+        if not self.config.get('link_images', False):
+            return PictureEmbedder(doc, prefetcher, digests)
+        if self.config.get('link_paths', 'relative') == 'absolute':
+            return PictureLinker(doc)
+        return PictureLinker(doc, base_dir=os.path.dirname(os.path.abspath(output_path)))
+
+    def _save_document(self, doc: Document, output_path: str, cancel_token: CancellationToken,
+                       tracer: Optional[TraceRecorder] = None):
+        """
+        Save document atomically via a temporary file next to the output
+
+        The package is written by DocxWriter: JPEG/PNG media stored as-is,
+        XML parts deflated at config['docx_compress_level'] on
+        config['docx_compress_workers'] threads. An existing output file is
+        only replaced by a complete document.
+
+        Args:
+            doc: Document to save
+            output_path: Final output path
+            cancel_token: Token checked on every block written
+            tracer: Optional trace recorder for the compression threads
+
+        Raises:
+            OperationCancelled: If cancel_token was triggered
+        """
+        writer = DocxWriter(self.config.get('docx_compress_level', 6),
+                            self.config.get('docx_compress_workers', 4), tracer=tracer)
+        writer.save_file(doc, output_path, cancel_token)
+
+    def create_document(
+        self,
+        image_data: Iterable[Union[ImageRecord, Tuple]],
+        output_path: str,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        total: Optional[int] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        report: Optional[RunReport] = None,
+        prefetcher: Optional[ImagePrefetcher] = None,
+        digests: Optional[DigestCache] = None
+    ) -> tuple[int, List[str]]:
+        """
+        Create Word document with images and captions using intelligent layout
+        Maintains strict Excel sheet order
+
+        Args:
+            image_data: List (or any iterable, e.g. a streaming pipeline) of
+                       ImageRecords with path set (legacy tuples
+                       (filename, caption, image_path, image_info_dict) are converted)
+                       Images are processed in the EXACT order they appear in this list
+            output_path: Path where to save the document
+            progress_callback: Optional callback function(current, total, filename)
+            total: Expected number of entries for progress reporting; defaults to
+                   len(image_data) when image_data is a sequence
+            cancel_token: Optional token checked before every image and while saving
+            report: Optional run report receiving the 'layout', 'xml' and 'save'
+                    stage measurements
+            prefetcher: Optional read-ahead buffer filled with the images of
+                        image_data in order (see ImagePrefetcher)
+            digests: Optional SHA1 cache shared with other documents, so
+                     unchanged files are not hashed again (see DigestCache)
+
+        Returns:
+            Tuple of (processed_count, error_list)
+
+        Raises:
+            OperationCancelled: If cancel_token was triggered; the partially built
+                                document is discarded and no output file is left behind
+        """
+        log.info("Erstelle Word-Dokument...")
+
+        cancel_token = cancel_token or CancellationToken()
+        report = report or RunReport()
+        if total is None:
+            total = len(image_data) if hasattr(image_data, '__len__') else 0
+
+        doc = Document()
+        cancelled = False
+        try:
+            started = time.perf_counter()
+            processed_count, missing_files, error_details, total_images = self._fill_document(
+                doc, map(ImageRecord.from_entry, image_data), progress_callback, total, cancel_token, report,
+                self._picture_embedder(doc, output_path, prefetcher, digests)
+            )
+            report.mark_peak_rss('layout')
+            report.mark_peak_rss('xml')
+            if prefetcher is not None:
+                report.set_count('prefetch_hits', prefetcher.hits)
+                report.set_count('prefetch_misses', prefetcher.misses)
+            rendered = time.perf_counter()
+            with report.stage('save') as section:
+                self._save_document(doc, output_path, cancel_token, report.tracer)
+                section['bytes_written'] = os.path.getsize(output_path)
+            report.mark_peak_rss('save')
+            self.timings = {'render': rendered - started, 'save': time.perf_counter() - rendered}
+        except OperationCancelled:
+            cancelled = True
+
+        if cancelled:
+            # Raised outside the except block so no traceback keeps the
+            # partially built document (and its XML tree) alive
+            doc = None
+            log.info("⏹ Dokumenterstellung abgebrochen")
+            raise OperationCancelled()
 
-        # Save document
         output_path = Path(output_path)
-        doc.save(str(output_path))
 
         # Print summary
-        print(f"\n{'='*70}")
-        print(f"✓ Word-Dokument erfolgreich erstellt!")
-        print(f"  Gespeichert unter: {output_path}")
-        print(f"  Bilder verarbeitet: {processed_count}/{total_images}")
+        log.info("=" * 70)
+        log.info("✓ Word-Dokument erfolgreich erstellt!")
+        log.info("  Gespeichert unter: %s", output_path)
+        log.info("  Bilder verarbeitet: %d/%d", processed_count, total_images,
+                 extra={'processed': processed_count, 'total': total_images})
 
         if error_details:
-            print(f"\n⚠ {len(error_details)} Datei(en) mit Fehlern:")
+            log.warning("⚠ %d Datei(en) mit Fehlern:", len(error_details))
             for fname, error_msg in error_details[:10]:
-                print(f"  - {fname}")
-                print(f"    Grund: {error_msg}")
+                log.warning("  - %s", fname)
+                log.warning("    Grund: %s", error_msg)
             if len(error_details) > 10:
-                print(f"  ... und {len(error_details) - 10} weitere")
+                log.warning("  ... und %d weitere", len(error_details) - 10)
 
-        print(f"{'='*70}")
+        log.info("=" * 70)
 
         return processed_count, missing_files
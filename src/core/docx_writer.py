@@ -0,0 +1,305 @@
+"""
+DOCX Writer for Pic2Doc
+Packages a python-docx document with a per-part compression policy and
+parallel compression
+"""
+
+import os
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+
+from .cancellation import CancellableWriter, CancellationToken
+from .tracing import TraceRecorder
+from ..utils.file_utils import partial_output_path
+
+# Formats that are compressed already; deflating them again costs time
+# and saves next to nothing. BMP, TIFF, EMF/WMF etc. are still deflated.
+STORED_EXTENSIONS = frozenset({'jpg', 'jpeg', 'jpe', 'png', 'gif', 'webp', 'jfif'})
+
+# Parts larger than this are deflated in chunks on several threads
+CHUNK_SIZE = 1024 * 1024
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+_LIMIT_32 = 0xFFFFFFFF
+_LIMIT_16 = 0xFFFF
+
+
+def _deflate_chunk(data: memoryview, level: int, last: bool) -> bytes:
+    """
+    Raw-deflate one chunk so that chunks can be concatenated
+
+    Non-final chunks end with a sync flush (byte aligned, stream still
+    open); only the last one finishes the stream.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def _deflate_chunk_traced(tracer: TraceRecorder, name: str, index: int,
+                          data: memoryview, level: int, last: bool) -> bytes:
+    """_deflate_chunk() recorded as a 'deflate' span of the compressing thread"""
+    start = time.perf_counter()
+    try:
+        return _deflate_chunk(data, level, last)
+    finally:
+        tracer.complete('deflate', start, time.perf_counter(),
+                        {'part': name, 'chunk': index, 'bytes': len(data),
+                         'worker': threading.current_thread().name})
+
+
+class _Entry:
+    """One archive member: name, data and its (pending) compressed chunks"""
+
+    __slots__ = ('name', 'data', 'method', 'chunks', 'crc')
+
+    def __init__(self, name: str, data: bytes, method: int, chunks: list):
+        self.name = name
+        self.data = data
+        self.method = method
+        self.chunks = chunks  # Futures (deflated) or the data itself (stored)
+        self.crc = 0
+
+
+class DocxWriter:
+    """
+    Writes a python-docx document as a ZIP package
+
+    Replaces Document.save(), which deflates every part - including JPEG
+    and PNG images that cannot shrink - one after another on a single
+    thread. Here media in already-compressed formats is stored as-is,
+    XML parts are deflated at a configurable level, and deflating runs on
+    a thread pool (zlib releases the GIL), large parts split into chunks.
+    Members are written in python-docx's order while later ones are still
+    being compressed, so the package contents are the same as with
+    Document.save(); only the compression of the members differs.
+    """
+
+    def __init__(self, compress_level: int = 6, workers: int = 4, executor: Optional[Executor] = None,
+                 tracer: Optional[TraceRecorder] = None):
+        """
+        Initialize writer
+
+        Args:
+            compress_level: zlib level for deflated parts (1 fastest .. 9 smallest)
+            workers: Number of compression threads if no executor is given
+            executor: Optional executor to compress on (not shut down)
+            tracer: Optional trace recorder; every deflated chunk is recorded
+                    as a 'deflate' span tagged with the compressing thread
+        """
+        if not 0 <= compress_level <= 9:
+            raise ValueError(f"Ungültige Kompressionsstufe: {compress_level} (erlaubt: 0-9)")
+        self.compress_level = compress_level
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.tracer = tracer
+        self.bytes_stored = 0    # Uncompressed size of stored members
+        self.bytes_deflated = 0  # Uncompressed size of deflated members
+
+    @staticmethod
+    def iter_members(document) -> Iterator[Tuple[str, bytes]]:
+        """
+        Serialize the package members in the order Document.save() writes them
+
+        Args:
+            document: python-docx Document
+
+        Yields:
+            (member name, data)
+        """
+        package = document.part.package
+        parts = package.parts
+        for part in parts:
+            part.before_marshal()
+        yield CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob
+        yield PACKAGE_URI.rels_uri.membername, package.rels.xml
+        for part in parts:
+            yield part.partname.membername, part.blob
+            if len(part.rels):
+                yield part.partname.rels_uri.membername, part.rels.xml
+
+    def compression_for(self, name: str) -> int:
+        """
+        Compression method of a member
+
+        Args:
+            name: Member name
+
+        Returns:
+            ZIP_STORED for already-compressed media (and level 0), ZIP_DEFLATED otherwise
+        """
+        extension = name.rpartition('.')[2].lower()
+        if self.compress_level == 0 or extension in STORED_EXTENSIONS:
+            return ZIP_STORED
+        return ZIP_DEFLATED
+
+    def save(self, document, stream: BinaryIO) -> int:
+        """
+        Write the document to a binary stream
+
+        Args:
+            document: python-docx Document
+            stream: Writable binary stream (needs only write(), e.g. a
+                    CancellableWriter around a file)
+
+        Returns:
+            Number of bytes written
+        """
+        executor = self.executor or ThreadPoolExecutor(max_workers=self.workers,
+                                                       thread_name_prefix='pic2doc-zip')
+        try:
+            entries = [self._submit(executor, name, data) for name, data in self.iter_members(document)]
+            return self._write_archive(stream, entries)
+        finally:
+            if self.executor is None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def save_file(self, document, output_path: Union[str, Path],
+                  cancel_token: Optional[CancellationToken] = None) -> int:
+        """
+        Save atomically via a temporary file next to the output
+
+        The temporary file is removed if saving fails or is cancelled, so an
+        existing output file is only replaced by a complete document.
+
+        Args:
+            document: python-docx Document
+            output_path: Final output path
+            cancel_token: Token checked on every block written
+
+        Returns:
+            Number of bytes written
+
+        Raises:
+            OperationCancelled: If cancel_token was triggered
+        """
+        cancel_token = cancel_token or CancellationToken()
+        cancel_token.raise_if_cancelled()
+        output_path = Path(output_path)
+        temp_path = partial_output_path(output_path)
+
+        try:
+            with open(temp_path, 'wb') as f:
+                written = self.save(document, CancellableWriter(f, cancel_token))
+            cancel_token.raise_if_cancelled()
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+        return written
+
+    def _submit(self, executor: Executor, name: str, data: bytes) -> _Entry:
+        """Create an entry and queue the deflating of its chunks"""
+        method = self.compression_for(name)
+        if method == ZIP_STORED:
+            self.bytes_stored += len(data)
+            return _Entry(name, data, method, [data])
+        self.bytes_deflated += len(data)
+        view = memoryview(data)
+        size = len(data)
+        chunks = []
+        for index, offset in enumerate(range(0, max(size, 1), CHUNK_SIZE)):
+            last = offset + CHUNK_SIZE >= size
+            chunk = view[offset:offset + CHUNK_SIZE]
+            if self.tracer is None:
+                chunks.append(executor.submit(_deflate_chunk, chunk, self.compress_level, last))
+            else:
+                chunks.append(executor.submit(_deflate_chunk_traced, self.tracer, name, index,
+                                              chunk, self.compress_level, last))
+        return _Entry(name, data, method, chunks)
+
+    def _write_archive(self, stream: BinaryIO, entries: List[_Entry]) -> int:
+        """Write local headers and data in order, then the central directory"""
+        dos_time, dos_date = _dos_datetime(time.localtime())
+        central = []
+        offset = 0
+        for entry in entries:
+            if entry.method == ZIP_STORED:
+                payload = entry.chunks
+            else:
+                payload = [future.result() for future in entry.chunks]
+            entry.chunks = None
+            entry.crc = zlib.crc32(entry.data)
+            compressed_size = sum(len(chunk) for chunk in payload)
+            size = len(entry.data)
+            entry.data = None
+
+            header = _local_header(entry, dos_time, dos_date, compressed_size, size)
+            stream.write(header)
+            for chunk in payload:
+                stream.write(chunk)
+            central.append(_central_header(entry, dos_time, dos_date, compressed_size, size, offset))
+            offset += len(header) + compressed_size
+
+        directory = b''.join(central)
+        stream.write(directory)
+        end = _end_records(len(central), len(directory), offset)
+        stream.write(end)
+        return offset + len(directory) + len(end)
+
+
+def _dos_datetime(now: time.struct_time) -> Tuple[int, int]:
+    """MS-DOS time and date fields (as zipfile writes them for writestr())"""
+    dos_time = now.tm_hour << 11 | now.tm_min << 5 | now.tm_sec // 2
+    dos_date = (max(now.tm_year, 1980) - 1980) << 9 | now.tm_mon << 5 | now.tm_mday
+    return dos_time, dos_date
+
+
+def _local_header(entry: _Entry, dos_time: int, dos_date: int, compressed_size: int, size: int) -> bytes:
+    """Local file header, with a ZIP64 extra field for members of 4 GiB or more"""
+    name = entry.name.encode('ascii')
+    extra = b''
+    version = 20
+    if size >= _LIMIT_32 or compressed_size >= _LIMIT_32:
+        extra = struct.pack('<HHQQ', 0x0001, 16, size, compressed_size)
+        size = compressed_size = _LIMIT_32
+        version = 45
+    return struct.pack('<IHHHHHIIIHH', 0x04034b50, version, 0, entry.method, dos_time, dos_date,
+                       entry.crc, compressed_size, size, len(name), len(extra)) + name + extra
+
+
+def _central_header(entry: _Entry, dos_time: int, dos_date: int, compressed_size: int, size: int,
+                    offset: int) -> bytes:
+    """Central directory header; values that do not fit 32 bits go to a ZIP64 extra field"""
+    name = entry.name.encode('ascii')
+    large = []
+    if size >= _LIMIT_32:
+        large.append(size)
+        size = _LIMIT_32
+    if compressed_size >= _LIMIT_32:
+        large.append(compressed_size)
+        compressed_size = _LIMIT_32
+    if offset >= _LIMIT_32:
+        large.append(offset)
+        offset = _LIMIT_32
+    extra = struct.pack(f'<HH{len(large)}Q', 0x0001, 8 * len(large), *large) if large else b''
+    version = 45 if large else 20
+    # Made by: Unix (3), so the permission bits in the external attributes apply
+    return struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, 3 << 8 | version, version, 0, entry.method,
+                       dos_time, dos_date, entry.crc, compressed_size, size, len(name), len(extra),
+                       0, 0, 0, 0o600 << 16, offset) + name + extra
+
+
+def _end_records(count: int, directory_size: int, directory_offset: int) -> bytes:
+    """End of central directory, preceded by the ZIP64 records when needed"""
+    records = b''
+    if count >= _LIMIT_16 or directory_size >= _LIMIT_32 or directory_offset >= _LIMIT_32:
+        zip64_offset = directory_offset + directory_size
+        records += struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0,
+                               count, count, directory_size, directory_offset)
+        records += struct.pack('<IIQI', 0x07064b50, 0, zip64_offset, 1)
+        count = min(count, _LIMIT_16)
+        directory_size = min(directory_size, _LIMIT_32)
+        directory_offset = min(directory_offset, _LIMIT_32)
+    return records + struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count,
+                                 directory_size, directory_offset, 0)
@@ -0,0 +1,157 @@
+"""
+Error Log for Pic2Doc
+Collects per-image errors grouped by category and exports them as CSV
+"""
+
+import csv
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ImageRejectedError(ValueError):
+    """Image skipped because it exceeds a limit (pixel count, probe time or memory)"""
+
+
+class ProbeWorkerError(OSError):
+    """A probe worker process could not be started or crashed (not attributed to a limit)"""
+
+
+class ErrorCategory:
+    """Error categories"""
+    MISSING = "missing"   # Image file not found
+    CORRUPT = "corrupt"   # Image file unreadable or damaged
+    REJECTED = "rejected"  # Image exceeds a limit (see ImageRejectedError)
+    OTHER = "other"
+
+    ALL = (MISSING, CORRUPT, REJECTED, OTHER)
+
+
+# Category labels for display and export
+CATEGORY_LABELS = {
+    ErrorCategory.MISSING: "Datei fehlt",
+    ErrorCategory.CORRUPT: "Bild beschädigt",
+    ErrorCategory.REJECTED: "Grenze überschritten",
+    ErrorCategory.OTHER: "Sonstiger Fehler",
+}
+
+
+def categorize_exception(error: BaseException) -> str:
+    """
+    Classify an exception raised while locating or probing an image
+
+    Args:
+        error: Exception from ImageHandler (FileNotFoundError for missing
+               files, ImageRejectedError for images over a limit,
+               ValueError for damaged images, ProbeWorkerError and other
+               OSErrors for everything else)
+
+    Returns:
+        ErrorCategory value
+    """
+    if isinstance(error, FileNotFoundError):
+        return ErrorCategory.MISSING
+    if isinstance(error, ImageRejectedError):
+        return ErrorCategory.REJECTED
+    if isinstance(error, ValueError):
+        return ErrorCategory.CORRUPT
+    return ErrorCategory.OTHER
+
+
+class ErrorLog:
+    """
+    Append-only list of (filename, error, category) entries
+
+    Entries are also indexed per category, so a view can show the n-th
+    entry of one category and the counts without scanning the whole log.
+    """
+
+    def __init__(self):
+        """Initialize empty error log"""
+        self._entries: List[Tuple[str, str, str]] = []
+        self._by_category: Dict[str, List[int]] = {category: [] for category in ErrorCategory.ALL}
+
+    def add(self, filename: str, error: str, category: Optional[str] = None):
+        """
+        Append one error
+
+        Args:
+            filename: Filename (without extension) the error belongs to
+            error: Error message
+            category: ErrorCategory value (OTHER if missing or unknown)
+        """
+        if category not in self._by_category:
+            category = ErrorCategory.OTHER
+        self._by_category[category].append(len(self._entries))
+        self._entries.append((filename, error, category))
+
+    def extend(self, items: Iterable[Tuple]):
+        """
+        Append several errors
+
+        Args:
+            items: (filename, error) or (filename, error, category) tuples
+        """
+        for item in items:
+            self.add(*item)
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+        for indices in self._by_category.values():
+            indices.clear()
+
+    def count(self, category: Optional[str] = None) -> int:
+        """
+        Number of entries
+
+        Args:
+            category: Count only this category (all if None)
+
+        Returns:
+            Number of entries
+        """
+        if category is None:
+            return len(self._entries)
+        return len(self._by_category[category])
+
+    def counts(self) -> Dict[str, int]:
+        """Number of entries per category"""
+        return {category: len(indices) for category, indices in self._by_category.items()}
+
+    def window(self, start: int, stop: int, category: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        """
+        Get a slice of the entries (e.g. the visible rows of a view)
+
+        Args:
+            start: First position (within the category, if given)
+            stop: Position after the last entry
+            category: Restrict to this category (all if None)
+
+        Returns:
+            List of (filename, error, category) tuples
+        """
+        if category is None:
+            return self._entries[start:stop]
+        return [self._entries[i] for i in self._by_category[category][start:stop]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def export_csv(self, path: str) -> int:
+        """
+        Write all entries to a CSV file
+
+        Uses UTF-8 with BOM and ';' as delimiter, so Excel opens umlauts
+        and columns correctly.
+
+        Args:
+            path: Target file
+
+        Returns:
+            Number of exported entries
+        """
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(['Dateiname', 'Kategorie', 'Fehler'])
+            for filename, error, category in self._entries:
+                writer.writerow([filename, CATEGORY_LABELS[category], error])
+        return len(self._entries)
@@ -5,16 +5,23 @@ Reads image filenames and captions from Excel files
 
 import openpyxl
 from openpyxl.utils import column_index_from_string
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
 
+from .cancellation import CancellationToken
+from .image_record import ImageRecord
+from ..utils.log import get_logger
+
+log = get_logger('excel')
+
 
 class ExcelReader:
     """Reads image data from Excel files"""
 
     def __init__(self):
         """Initialize Excel reader"""
-        pass
+        # Number of data rows announced by the sheet (set by iter_data, may be None)
+        self.row_count_hint = None
 
     def read_data(
         self,
@@ -43,6 +50,40 @@ class ExcelReader:
             FileNotFoundError: If Excel file doesn't exist
             ValueError: If column structure is invalid
         """
+        data = list(self.iter_data(excel_path, filename_column, caption_columns, caption_separator))
+        log.info("✓ %d Einträge gefunden", len(data))
+        return data
+
+    def iter_data(
+        self,
+        excel_path: str,
+        filename_column: str = 'A',
+        caption_columns: List[str] = None,
+        caption_separator: str = ' - ',
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Stream image filenames and captions from Excel file row by row
+
+        The workbook is opened in read-only mode, so memory use does not grow
+        with the number of rows. Arguments are validated before the first row
+        is yielded.
+
+        Args:
+            excel_path: Path to Excel file
+            filename_column: Column letter for filenames (default 'A')
+            caption_columns: List of column letters for captions (default ['I'])
+            caption_separator: Separator for multi-column captions (default ' - ')
+            cancel_token: Optional token checked before every row
+
+        Yields:
+            Tuples: (filename_without_ext, combined_caption)
+
+        Raises:
+            FileNotFoundError: If Excel file doesn't exist
+            ValueError: If column structure is invalid
+            OperationCancelled: If cancel_token was triggered
+        """
         if caption_columns is None:
             caption_columns = ['I']
 
@@ -50,55 +91,99 @@ class ExcelReader:
         if not excel_path.exists():
             raise FileNotFoundError(f"Excel-Datei nicht gefunden: {excel_path}")
 
-        print(f"Lese Excel-Datei: {excel_path}")
+        log.info("Lese Excel-Datei: %s", excel_path)
         if len(caption_columns) > 1:
-            print(f"  Bildunterschrift-Spalten: {', '.join(caption_columns)} (Trenner: '{caption_separator}')")
-
-        # Load workbook
-        wb = openpyxl.load_workbook(excel_path)
-        ws = wb.active
-
-        # Convert column letters to indices
-        filename_col_idx = column_index_from_string(filename_column)
-        caption_col_indices = [column_index_from_string(col) for col in caption_columns]
+            log.info("  Bildunterschrift-Spalten: %s (Trenner: '%s')", ', '.join(caption_columns), caption_separator)
 
-        # Validate columns exist
-        if filename_col_idx > ws.max_column:
-            raise ValueError(f"Spalte {filename_column} nicht in Excel-Datei gefunden")
-        for col, col_idx in zip(caption_columns, caption_col_indices):
-            if col_idx > ws.max_column:
-                raise ValueError(f"Spalte {col} nicht in Excel-Datei gefunden")
-
-        data = []
-
-        # Read from row 2 (skip header)
-        start_row = 2
-        max_col_idx = max([filename_col_idx] + caption_col_indices)
-
-        for row in ws.iter_rows(min_row=start_row, values_only=True):
-            if len(row) < max_col_idx:
-                continue
-
-            # Get filename
-            filename = row[filename_col_idx - 1]  # Convert to 0-based index
+        # Load workbook (read-only mode streams rows instead of loading all cells)
+        wb = openpyxl.load_workbook(excel_path, read_only=True)
+        try:
+            ws = wb.active
 
-            # Get caption from multiple columns and combine
-            caption_parts = []
-            for col_idx in caption_col_indices:
-                cell_value = row[col_idx - 1]  # Convert to 0-based index
-                if cell_value:
-                    caption_parts.append(str(cell_value).strip())
+            # Convert column letters to indices
+            filename_col_idx = column_index_from_string(filename_column)
+            caption_col_indices = [column_index_from_string(col) for col in caption_columns]
+
+            # Read-only sheets trust the <dimension> the file declares, and
+            # other tools often write a stale one (e.g. just "A1"): openpyxl
+            # would then cut every row off at it. Read the cells the sheet
+            # really has and check the columns against the header row.
+            declared_rows, declared_columns = ws.max_row, ws.max_column
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, ())
+            header_width = len(header)
+            while header_width and header[header_width - 1] is None:
+                header_width -= 1
+
+            # Validate columns exist (no check without a header row or dimension)
+            max_column = max(header_width, declared_columns or 0)
+            if max_column:
+                if filename_col_idx > max_column:
+                    raise ValueError(f"Spalte {filename_column} nicht in Excel-Datei gefunden")
+                for col, col_idx in zip(caption_columns, caption_col_indices):
+                    if col_idx > max_column:
+                        raise ValueError(f"Spalte {col} nicht in Excel-Datei gefunden")
+
+            # Row count for progress; a dimension narrower than the header is stale
+            if declared_rows is not None and (declared_columns or 0) >= header_width:
+                self.row_count_hint = max(0, declared_rows - 1)
+            else:
+                self.row_count_hint = None
+
+            # Data rows follow the header row
+            for row in rows:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                row_len = len(row)
+
+                # Get filename
+                filename = row[filename_col_idx - 1] if filename_col_idx <= row_len else None  # 0-based index
+                if not filename:
+                    continue
+
+                # Get caption from multiple columns and combine
+                caption_parts = []
+                for col_idx in caption_col_indices:
+                    cell_value = row[col_idx - 1] if col_idx <= row_len else None
+                    if cell_value:
+                        caption_parts.append(str(cell_value).strip())
+
+                caption = caption_separator.join(caption_parts) if caption_parts else ""
+
+                yield (str(filename).strip(), caption)
+        finally:
+            wb.close()
 
-            caption = caption_separator.join(caption_parts) if caption_parts else ""
+    def iter_records(
+        self,
+        excel_path: str,
+        filename_column: str = 'A',
+        caption_columns: List[str] = None,
+        caption_separator: str = ' - ',
+        cancel_token: Optional[CancellationToken] = None
+    ) -> Iterator[ImageRecord]:
+        """
+        Stream rows as ImageRecords (see iter_data)
 
-            if filename:
-                filename_str = str(filename).strip()
-                data.append((filename_str, caption))
+        Args:
+            excel_path: Path to Excel file
+            filename_column: Column letter for filenames (default 'A')
+            caption_columns: List of column letters for captions (default ['I'])
+            caption_separator: Separator for multi-column captions (default ' - ')
+            cancel_token: Optional token checked before every row
 
-        print(f"✓ {len(data)} Einträge gefunden")
-        wb.close()
+        Yields:
+            ImageRecord with filename and caption set
 
-        return data
+        Raises:
+            FileNotFoundError: If Excel file doesn't exist
+            ValueError: If column structure is invalid
+            OperationCancelled: If cancel_token was triggered
+        """
+        for filename, caption in self.iter_data(excel_path, filename_column, caption_columns,
+                                                caption_separator, cancel_token):
+            yield ImageRecord(filename, caption)
 
     def validate_structure(
         self,
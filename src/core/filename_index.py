@@ -0,0 +1,182 @@
+"""
+Filename Index for Pic2Doc
+Matches Excel filenames to image files despite case, whitespace, zero
+padding and extension case differences
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils.constants import SUPPORTED_IMAGE_EXTENSIONS
+
+_WHITESPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'\d+')
+# Characters that end a word for prefix matching ("IMG 1" matches "IMG 1 Nord", not "IMG 12")
+_WORD_BREAK = re.compile(r'[\s_\-.,;()]+')
+
+
+class MatchOptions:
+    """Normalization applied to filenames before matching"""
+
+    __slots__ = ('ignore_case', 'collapse_whitespace', 'ignore_leading_zeros', 'prefix')
+
+    def __init__(self, ignore_case: bool = True, collapse_whitespace: bool = True,
+                 ignore_leading_zeros: bool = True, prefix: bool = False):
+        """
+        Initialize match options
+
+        Args:
+            ignore_case: "img 1" matches "IMG 1"
+            collapse_whitespace: Leading/trailing whitespace is ignored and
+                                 whitespace runs count as one space
+            ignore_leading_zeros: Numbers match regardless of zero padding
+                                  ("FIAS 21B 1" matches "FIAS 21B 000001")
+            prefix: A name also matches files that start with it followed by
+                    a word break ("IMG 1" matches "IMG 1 Nordwand")
+        """
+        self.ignore_case = ignore_case
+        self.collapse_whitespace = collapse_whitespace
+        self.ignore_leading_zeros = ignore_leading_zeros
+        self.prefix = prefix
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'MatchOptions':
+        """
+        Read the options from a configuration (see DEFAULT_CONFIG 'match_*')
+
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            MatchOptions
+        """
+        return cls(
+            ignore_case=config.get('match_ignore_case', True),
+            collapse_whitespace=config.get('match_collapse_whitespace', True),
+            ignore_leading_zeros=config.get('match_ignore_leading_zeros', True),
+            prefix=config.get('match_prefix', False),
+        )
+
+    @property
+    def normalizes(self) -> bool:
+        """Whether any normalization is enabled"""
+        return self.ignore_case or self.collapse_whitespace or self.ignore_leading_zeros or self.prefix
+
+    def key(self) -> Tuple[bool, bool, bool, bool]:
+        """Comparable form (for cache keys)"""
+        return (self.ignore_case, self.collapse_whitespace, self.ignore_leading_zeros, self.prefix)
+
+    def normalize(self, name: str) -> str:
+        """
+        Normalized form of a filename without extension
+
+        Args:
+            name: Filename without extension
+
+        Returns:
+            Key under which the name is matched
+        """
+        if self.collapse_whitespace:
+            name = _WHITESPACE.sub(' ', name).strip()
+        if self.ignore_leading_zeros:
+            name = _NUMBER.sub(lambda match: match.group().lstrip('0') or '0', name)
+        if self.ignore_case:
+            name = name.casefold()
+        return name
+
+
+class FilenameIndex:
+    """
+    Precomputed lookup from Excel filenames to image file names
+
+    Built once per folder listing; every lookup is a few dictionary
+    accesses. A name is tried, in this order:
+      1. exactly, with each supported extension in any letter case
+      2. normalized (see MatchOptions)
+      3. as a prefix of normalized file names (if enabled)
+    If several different files match in step 2 or 3, the lookup is
+    ambiguous: the first by extension precedence and name is used and
+    all candidates are returned so the caller can report them. The same
+    name with several extensions is not ambiguous (the extension order
+    decides, as for exact matches).
+    """
+
+    def __init__(self, names: Iterable[str], options: Optional[MatchOptions] = None):
+        """
+        Build index
+
+        Args:
+            names: Image file names (with extension) as listed in the folder
+            options: Normalization (defaults to MatchOptions())
+        """
+        self.options = options or MatchOptions()
+        extensions = {ext: rank for rank, ext in enumerate(SUPPORTED_IMAGE_EXTENSIONS)}
+        # "<stem><lowercase ext>" -> actual name
+        self._exact: Dict[str, str] = {}
+        # normalized stem -> names, and word-boundary prefix -> names
+        self._normalized: Dict[str, List[str]] = {}
+        self._prefixes: Dict[str, List[str]] = {}
+
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            rank = extensions.get(ext.lower())
+            if rank is None:
+                continue
+            self._exact.setdefault(stem + ext.lower(), name)
+            if not self.options.normalizes:
+                continue
+            key = self.options.normalize(stem)
+            self._normalized.setdefault(key, []).append(name)
+            if self.options.prefix:
+                for match in _WORD_BREAK.finditer(key):
+                    if match.start() > 0:
+                        self._prefixes.setdefault(key[:match.start()], []).append(name)
+
+        def order(name: str):
+            stem, ext = os.path.splitext(name)
+            return extensions[ext.lower()], name
+
+        for groups in (self._normalized, self._prefixes):
+            for candidates in groups.values():
+                if len(candidates) > 1:
+                    candidates.sort(key=order)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def __contains__(self, name: str) -> bool:
+        """Whether a file name (with extension, any extension case) is indexed"""
+        stem, ext = os.path.splitext(name)
+        return stem + ext.lower() in self._exact
+
+    def lookup(self, filename: str) -> Tuple[Optional[str], List[str]]:
+        """
+        Find the image file for a filename without extension
+
+        Args:
+            filename: Filename from the Excel row
+
+        Returns:
+            Tuple of (matching file name or None, all candidates if the match
+            was ambiguous, else an empty list)
+        """
+        for ext in SUPPORTED_IMAGE_EXTENSIONS:
+            name = self._exact.get(filename + ext)
+            if name is not None:
+                return name, []
+
+        if not self.options.normalizes:
+            return None, []
+        key = self.options.normalize(filename)
+        candidates = self._normalized.get(key)
+        if candidates is None and self.options.prefix and key:
+            candidates = self._prefixes.get(key)
+        if not candidates:
+            return None, []
+        chosen = candidates[0]
+        if len(candidates) > 1:
+            stems = {os.path.splitext(name)[0] for name in candidates}
+            if len(stems) > 1:
+                return chosen, list(candidates)
+        return chosen, []
@@ -0,0 +1,302 @@
+"""
+Folder Index for Pic2Doc
+Lists image files across several root folders (optionally with their
+subfolders) and keeps the listing on disk between runs
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .filename_index import FilenameIndex, MatchOptions
+from ..utils.constants import DUPLICATE_POLICIES, SUPPORTED_IMAGE_EXTENSIONS
+from ..utils.file_utils import write_text_atomic
+from ..utils.log import get_logger
+
+log = get_logger('images')
+
+# Listing of one directory: [mtime_ns, image file names, subdirectory names]
+Listing = List
+# Relative directory ('' for the root) -> listing
+RootListing = Dict[str, Listing]
+
+# Format version of the index file; other versions are ignored
+INDEX_FILE_VERSION = 1
+# Roots kept in the index file (the least recently used are dropped)
+MAX_CACHED_ROOTS = 32
+
+
+def scan_root(root: str, recursive: bool = False,
+              previous: Optional[RootListing] = None) -> Tuple[RootListing, bool]:
+    """
+    List the image files of a root folder, reusing an earlier listing
+
+    A directory's modification time changes whenever entries are added,
+    removed or renamed in it, so a directory whose mtime matches the
+    earlier listing is not listed again - revalidating a tree costs one
+    stat per directory instead of one per file. Hidden directories
+    (starting with '.') and symlinked directories are skipped.
+
+    Args:
+        root: Root folder
+        recursive: Also list all subfolders
+        previous: Earlier result of scan_root for the same root and mode
+
+    Returns:
+        Tuple of (listing per relative directory, whether it differs from previous)
+
+    Raises:
+        OSError: If the root folder cannot be listed
+    """
+    extensions = set(SUPPORTED_IMAGE_EXTENSIONS)
+    previous = previous or {}
+    listings: RootListing = {}
+    changed = False
+    pending = ['']
+    while pending:
+        relative = pending.pop()
+        path = os.path.join(root, relative) if relative else root
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            if not relative:
+                raise
+            changed = True  # Subfolder removed since its parent was listed
+            continue
+
+        listing = previous.get(relative)
+        if listing is None or listing[0] != mtime_ns:
+            files, subdirs = [], []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                            files.append(entry.name)
+                        elif recursive and not entry.name.startswith('.') and entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+            except OSError:
+                if not relative:
+                    raise
+                log.warning("⚠ Unterordner nicht lesbar: %s", path)
+            listing = [mtime_ns, sorted(files), sorted(subdirs)]
+            changed = True
+        listings[relative] = listing
+
+        if recursive:
+            pending.extend(os.path.join(relative, name) if relative else name for name in listing[2])
+
+    if len(listings) != len(previous):
+        changed = True
+    return listings, changed
+
+
+class FolderIndexFile:
+    """
+    Folder listings persisted between runs
+
+    One JSON file holds the listings of all roots indexed recently, keyed
+    by absolute path and scan mode, so the next run only revalidates
+    directory mtimes instead of listing every file again.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize index file (loads it if it exists)
+
+        Args:
+            path: Index file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._roots: Dict[str, RootListing] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_FILE_VERSION:
+                self._roots = data['roots']
+        except (OSError, ValueError, AttributeError, KeyError):
+            pass
+
+    @staticmethod
+    def _key(root: str, recursive: bool) -> str:
+        return f"{'recursive' if recursive else 'flat'}:{os.path.abspath(root)}"
+
+    def get(self, root: str, recursive: bool) -> Optional[RootListing]:
+        """
+        Get the stored listing of a root
+
+        Args:
+            root: Root folder
+            recursive: Scan mode
+
+        Returns:
+            Listing as returned by scan_root, or None
+        """
+        with self._lock:
+            return self._roots.get(self._key(root, recursive))
+
+    def put(self, root: str, recursive: bool, listing: RootListing):
+        """
+        Store the listing of a root (written by save())
+
+        Args:
+            root: Root folder
+            recursive: Scan mode
+            listing: Listing as returned by scan_root
+        """
+        key = self._key(root, recursive)
+        with self._lock:
+            self._roots.pop(key, None)  # Re-insert as most recently used
+            self._roots[key] = listing
+            while len(self._roots) > MAX_CACHED_ROOTS:
+                del self._roots[next(iter(self._roots))]
+
+    def save(self) -> bool:
+        """
+        Write the index file atomically (temp file + rename)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        with self._lock:
+            content = json.dumps({'version': INDEX_FILE_VERSION, 'roots': self._roots},
+                                 ensure_ascii=False, separators=(',', ':'))
+        try:
+            write_text_atomic(self.path, content, prefix='.pic2doc_index.')
+            return True
+        except OSError as e:
+            log.warning("⚠ Bilderindex konnte nicht gespeichert werden: %s", e)
+            return False
+
+
+class FolderIndex:
+    """
+    Matching index over the image files of one or more root folders
+
+    Each root is scanned on its own thread (see scan_root). A file name
+    found more than once - in several roots or, when scanning
+    recursively, in several subfolders - is a duplicate; the duplicate
+    policy picks the file that is used:
+      'first':  the first root in the given order, then the shallowest
+                subfolder, then the subfolder name
+      'newest': the file modified last
+    Lookups then work on the file names exactly as FilenameIndex does.
+    """
+
+    def __init__(self, roots: Sequence[str], recursive: bool = False, duplicates: str = 'first',
+                 match_options: Optional[MatchOptions] = None, index_file: Optional[FolderIndexFile] = None):
+        """
+        Initialize folder index (scans on the first refresh())
+
+        Args:
+            roots: Root folders in order of precedence
+            recursive: Also index subfolders
+            duplicates: Duplicate policy (see DUPLICATE_POLICIES)
+            match_options: Filename normalization for lookups
+            index_file: Optional persisted listings to start from and update
+
+        Raises:
+            ValueError: If the duplicate policy is unknown
+        """
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f"Unbekannte Regel für doppelte Dateinamen: {duplicates} "
+                             f"(erlaubt: {', '.join(DUPLICATE_POLICIES)})")
+        self.roots = [str(root) for root in roots]
+        self.recursive = recursive
+        self.duplicates_policy = duplicates
+        self.match_options = match_options or MatchOptions()
+        self.index_file = index_file
+
+        self._listings: Optional[List[RootListing]] = None
+        self._paths: Dict[str, str] = {}  # File name -> path of the file used
+        self._index = FilenameIndex((), self.match_options)
+        self._lock = threading.Lock()
+        # File name -> all paths, for names found more than once
+        self.duplicates: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def refresh(self) -> int:
+        """
+        Rescan the roots and rebuild the index if anything changed
+
+        Returns:
+            Number of distinct image file names
+
+        Raises:
+            OSError: If a root folder cannot be listed
+        """
+        with self._lock:
+            previous = self._listings
+            if previous is None:
+                previous = [self.index_file.get(root, self.recursive) if self.index_file else None
+                            for root in self.roots]
+
+            if len(self.roots) == 1:
+                results = [scan_root(self.roots[0], self.recursive, previous[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=len(self.roots), thread_name_prefix='pic2doc-index') as executor:
+                    results = list(executor.map(
+                        lambda args: scan_root(args[0], self.recursive, args[1]),
+                        zip(self.roots, previous)
+                    ))
+
+            changed = [changed for _listing, changed in results]
+            if self._listings is None or any(changed):
+                self._listings = [listing for listing, _changed in results]
+                self._build()
+                if self.index_file is not None and any(changed):
+                    for root, listing, root_changed in zip(self.roots, self._listings, changed):
+                        if root_changed:
+                            self.index_file.put(root, self.recursive, listing)
+                    self.index_file.save()
+            return len(self._paths)
+
+    def lookup(self, filename: str) -> Tuple[Optional[str], List[str]]:
+        """
+        Find the image file for a filename without extension
+
+        Args:
+            filename: Filename from the Excel row
+
+        Returns:
+            Tuple of (path of the matching file or None, candidate file
+            names if the match was ambiguous, else an empty list)
+        """
+        if self._listings is None:
+            self.refresh()
+        name, candidates = self._index.lookup(filename)
+        return (self._paths[name] if name is not None else None), candidates
+
+    def _build(self):
+        """Collect all paths per file name, resolve duplicates and index the names (lock held)"""
+        found: Dict[str, List[str]] = {}
+        for root, listings in zip(self.roots, self._listings):
+            ordered = sorted(listings, key=lambda relative: (relative.count(os.sep) + bool(relative), relative))
+            for relative in ordered:
+                directory = os.path.join(root, relative) if relative else root
+                for name in listings[relative][1]:
+                    found.setdefault(name, []).append(os.path.join(directory, name))
+
+        self.duplicates = {name: paths for name, paths in found.items() if len(paths) > 1}
+        self._paths = {name: paths[0] for name, paths in found.items()}
+        if self.duplicates_policy == 'newest':
+            for name, paths in self.duplicates.items():
+                self._paths[name] = max(paths, key=_mtime_ns)
+        self._index = FilenameIndex(self._paths, self.match_options)
+
+        if self.duplicates:
+            log.warning("⚠ %d Dateinamen kommen mehrfach vor (Regel '%s'), z.B. %s",
+                        len(self.duplicates), self.duplicates_policy, next(iter(self.duplicates)),
+                        extra={'duplicates': len(self.duplicates)})
+
+
+def _mtime_ns(path: str) -> int:
+    """Modification time of a file (0 if it vanished)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
@@ -4,10 +4,22 @@ Handles image file operations and validation
 """
 
 import os
+import threading
+import weakref
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from PIL import Image
-from ..utils.constants import SUPPORTED_IMAGE_EXTENSIONS, LANDSCAPE_RATIO, PORTRAIT_RATIO
+from .config_manager import app_data_path
+from .error_log import ImageRejectedError
+from .filename_index import MatchOptions
+from .folder_index import FolderIndex, FolderIndexFile
+from .image_record import ImageRecord
+from .probe_workers import ProbeWorkerPool, acquire_probe_pool, release_probe_pool
+from .tracing import TraceRecorder
+from ..utils.constants import SUPPORTED_IMAGE_EXTENSIONS, LANDSCAPE_RATIO, PORTRAIT_RATIO, INDEX_FILE, DEFAULT_CONFIG
+from ..utils.log import get_logger
+
+log = get_logger('images')
 
 
 class ImageOrientation:
@@ -17,26 +29,271 @@ class ImageOrientation:
     SQUARE = "square"
 
 
+def read_image_size(image_path: str, max_pixels: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Read the pixel size of an image and verify the file
+
+    The size comes from the header, so an image over the pixel limit is
+    rejected before Pillow touches its data.
+
+    Args:
+        image_path: Path to image file
+        max_pixels: Reject images with more pixels (None = Pillow's own
+                    decompression bomb limit only)
+
+    Returns:
+        Tuple of (width, height) in pixels
+
+    Raises:
+        ImageRejectedError: If the image has more than max_pixels pixels
+        ValueError: If image cannot be read or is corrupted
+        MemoryError: If verifying the image ran out of memory
+    """
+    try:
+        with Image.open(image_path) as img:
+            width, height = img.size
+            if max_pixels and width * height > max_pixels:
+                raise ImageRejectedError(
+                    f"Bild zu groß: {width}×{height} Pixel (Grenze: {max_pixels / 1e6:g} Megapixel)"
+                )
+            img.verify()  # Verify it's a valid image
+        return width, height
+    except (ImageRejectedError, MemoryError):
+        raise
+    except Image.DecompressionBombError:
+        # Raised by Image.open() itself, before the size is available
+        raise ImageRejectedError(f"Bild zu groß: mehr als {2 * Image.MAX_IMAGE_PIXELS / 1e6:.0f} Megapixel")
+    except Exception as e:
+        raise ValueError(f"Bilddatei beschädigt oder ungültig: {e}")
+
+
+class ImageInfoCache:
+    """Thread-safe in-memory cache for probed image metadata
+
+    Entries are keyed by image path and invalidated as soon as the file's
+    modification time or size changes, so a long-running process can keep
+    one cache across many jobs.
+    """
+
+    def __init__(self, max_entries: int = 200000):
+        """
+        Initialize image info cache
+
+        Args:
+            max_entries: Maximum number of cached images (oldest are dropped first)
+        """
+        self.max_entries = max_entries
+        # path -> (mtime_ns, size, width, height, orientation)
+        self._entries: Dict[str, Tuple[int, int, int, int, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_path: str) -> Optional[Tuple[int, int, str]]:
+        """
+        Get cached image size if the file is unchanged
+
+        Args:
+            image_path: Path to image file
+
+        Returns:
+            Tuple of (width, height, orientation), or None on a miss
+        """
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(image_path)
+            if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[2:]
+
+    def put(self, image_path: str, width: int, height: int, orientation: str):
+        """
+        Store the size of an image file
+
+        Args:
+            image_path: Path to image file
+            width: Image width in pixels
+            height: Image height in pixels
+            orientation: Orientation (see ImageOrientation)
+        """
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return
+
+        with self._lock:
+            if image_path not in self._entries and len(self._entries) >= self.max_entries:
+                # Dicts keep insertion order - drop the oldest entry
+                del self._entries[next(iter(self._entries))]
+            self._entries[image_path] = (stat.st_mtime_ns, stat.st_size, width, height, orientation)
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
 class ImageHandler:
     """Handles image file operations"""
 
-    def __init__(self, image_folder: str):
+    def __init__(self, image_folder: str, info_cache: Optional[ImageInfoCache] = None,
+                 match_options: Optional[MatchOptions] = None, extra_folders: Sequence[str] = (),
+                 recursive: bool = False, duplicates: str = 'first',
+                 index_file: Optional[FolderIndexFile] = None, max_pixels: Optional[int] = None,
+                 prober: Optional[ProbeWorkerPool] = None):
         """
         Initialize image handler
 
         Args:
             image_folder: Path to folder containing images
+            info_cache: Optional shared cache for probed image metadata
+            match_options: Filename normalization for lookups (defaults to MatchOptions())
+            extra_folders: Further image folders, searched after image_folder
+            recursive: Also search the subfolders of all image folders
+            duplicates: Which file to use for a name found more than once
+                        (see FolderIndex)
+            index_file: Optional folder listings persisted between runs
+            max_pixels: Reject images with more pixels (None = no own limit)
+            prober: Optional pool probing images in supervised child
+                    processes (see ProbeWorkerPool); in-process otherwise
         """
         self.image_folder = Path(image_folder)
+        self.image_folders = [self.image_folder] + [Path(folder) for folder in extra_folders]
+        self.info_cache = info_cache
+        self.match_options = match_options or MatchOptions()
+        self.max_pixels = max_pixels
+        self.prober = prober
+        self._release_prober = None  # Set by from_config() for a shared pool
+
+        for folder in self.image_folders:
+            if not folder.exists():
+                raise FileNotFoundError(f"Bilder-Ordner nicht gefunden: {folder}")
+
+        # Matching index of the image files in the folders, listed with os.scandir
+        self._index = FolderIndex(self.image_folders, recursive, duplicates, self.match_options, index_file)
+        self._indexed = False
+        # Excel filename -> candidate file names, for lookups with several matches
+        self.ambiguous_matches: Dict[str, List[str]] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict, info_cache: Optional[ImageInfoCache] = None) -> 'ImageHandler':
+        """
+        Create a handler for a job configuration
+
+        Args:
+            config: Configuration dictionary (image folders, image_*, match_*
+                    and probe limit options)
+            info_cache: Optional shared cache for probed image metadata
+
+        Returns:
+            ImageHandler
+        """
+        # CLI and GUI configurations only carry the options they ask for:
+        # everything else comes from DEFAULT_CONFIG
+        def option(key):
+            return config.get(key, DEFAULT_CONFIG[key])
+
+        index_file = FolderIndexFile(app_data_path(INDEX_FILE)) if option('image_index_file') else None
+        max_pixels = int(option('max_image_megapixels') * 1e6) or None
+        prober = None
+        if option('isolate_probes'):
+            prober = acquire_probe_pool(option('probe_processes'), option('probe_timeout_seconds'),
+                                        option('probe_memory_mb'), max_pixels)
+        try:
+            handler = cls(
+                config['image_folder'],
+                info_cache=info_cache,
+                match_options=MatchOptions.from_config(config),
+                extra_folders=option('extra_image_folders') or (),
+                recursive=option('image_recursive'),
+                duplicates=option('image_duplicates'),
+                index_file=index_file,
+                max_pixels=max_pixels,
+                prober=prober,
+            )
+        except BaseException:
+            if prober is not None:
+                release_probe_pool(prober)
+            raise
+        if prober is not None:
+            # Handed back by close(), or once the handler is garbage collected
+            handler._release_prober = weakref.finalize(handler, release_probe_pool, prober)
+        return handler
+
+    @staticmethod
+    def config_key(config: Dict) -> Tuple:
+        """
+        Identify the handler a configuration needs (for reusing an indexed one)
 
-        if not self.image_folder.exists():
-            raise FileNotFoundError(f"Bilder-Ordner nicht gefunden: {self.image_folder}")
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            Tuple of image folders, scan options, matching options and probe limits
+        """
+        def option(key):
+            return config.get(key, DEFAULT_CONFIG[key])
+
+        return (
+            config.get('image_folder'),
+            tuple(option('extra_image_folders') or ()),
+            option('image_recursive'),
+            option('image_duplicates'),
+            MatchOptions.from_config(config).key(),
+            option('max_image_megapixels'),
+            option('isolate_probes'),
+            option('probe_processes'),
+            option('probe_timeout_seconds'),
+            option('probe_memory_mb'),
+        )
+
+    def close(self):
+        """Hand back the probe worker pool taken by from_config() (later probes run in-process)"""
+        if self._release_prober is not None:
+            self.prober = None
+            self._release_prober()
+            self._release_prober = None
+
+    @property
+    def duplicates(self) -> Dict[str, List[str]]:
+        """File name -> all paths, for names found in several folders"""
+        return self._index.duplicates
+
+    def refresh_index(self) -> int:
+        """
+        (Re)build the folder index if a folder changed since it was built
+
+        A folder's modification time changes whenever files are added,
+        removed or renamed in it, so unchanged folders are not listed
+        again (see scan_root).
+
+        Returns:
+            Number of distinct image file names in the folders
+        """
+        count = self._index.refresh()
+        self._indexed = True
+        return count
 
     def find_image(self, filename_without_ext: str) -> Optional[Path]:
         """
         Find image file by filename (without extension)
 
-        Tries common image extensions (.jpg, .jpeg, .png, .bmp)
+        Looks the name up in the folder index: common image extensions
+        (.jpg, .jpeg, .png, .bmp) in any letter case, then the normalized
+        name (see MatchOptions). A name the index does not contain costs
+        no file system access; files added later are found once the index
+        is refreshed (every run does this). Names matching several files
+        are recorded in ambiguous_matches.
 
         Args:
             filename_without_ext: Filename without extension (e.g., "FIAS 21B 000001")
@@ -44,12 +301,17 @@ class ImageHandler:
         Returns:
             Path to image file if found, None otherwise
         """
-        # Try each supported extension
-        for ext in SUPPORTED_IMAGE_EXTENSIONS:
-            image_path = self.image_folder / f"{filename_without_ext}{ext}"
-            if image_path.exists():
-                return image_path
-
+        if not self._indexed:
+            self.refresh_index()
+
+        path, candidates = self._index.lookup(filename_without_ext)
+        if path is not None:
+            if candidates and filename_without_ext not in self.ambiguous_matches:
+                self.ambiguous_matches[filename_without_ext] = candidates
+                log.warning("⚠ Mehrdeutig: '%s' passt zu %s - verwende %s", filename_without_ext,
+                            ", ".join(candidates), os.path.basename(path),
+                            extra={'image': filename_without_ext, 'candidates': candidates})
+            return Path(path)
         return None
 
     def validate_images(self, filenames: List[str]) -> tuple[List[str], List[str]]:
@@ -97,27 +359,30 @@ class ImageHandler:
 
         return str(image_path)
 
-    def get_image_dimensions(self, image_path: str) -> Tuple[int, int]:
+    def get_image_dimensions(self, image_path: str, tracer: Optional[TraceRecorder] = None) -> Tuple[int, int]:
         """
         Get image dimensions
 
+        Runs in a supervised child process if a prober is set.
+
         Args:
             image_path: Path to image file
+            tracer: Optional trace recorder for the prober's round trip
 
         Returns:
             Tuple of (width, height) in pixels
 
         Raises:
+            ImageRejectedError: If the image exceeds the pixel limit, or its
+                                probe exceeded the prober's time or memory limit
             ValueError: If image cannot be read or is corrupted
         """
+        if self.prober is not None:
+            return self.prober.probe(image_path, tracer)
         try:
-            with Image.open(image_path) as img:
-                img.verify()  # Verify it's a valid image
-            # Reopen after verify (verify closes the file)
-            with Image.open(image_path) as img:
-                return img.size
-        except Exception as e:
-            raise ValueError(f"Bilddatei beschädigt oder ungültig: {e}")
+            return read_image_size(image_path, self.max_pixels)
+        except MemoryError:
+            raise ImageRejectedError("Nicht genug Speicher zum Prüfen des Bildes")
 
     def get_image_orientation(self, image_path: str) -> str:
         """
@@ -130,6 +395,19 @@ class ImageHandler:
             Orientation: "landscape", "portrait", or "square"
         """
         width, height = self.get_image_dimensions(image_path)
+        return self._orientation_from_size(width, height)
+
+    def _orientation_from_size(self, width: int, height: int) -> str:
+        """
+        Classify orientation from pixel dimensions
+
+        Args:
+            width: Image width in pixels
+            height: Image height in pixels
+
+        Returns:
+            Orientation: "landscape", "portrait", or "square"
+        """
         aspect_ratio = width / height
 
         if aspect_ratio > LANDSCAPE_RATIO:
@@ -149,10 +427,22 @@ class ImageHandler:
         Returns:
             Dictionary with image info (path, dimensions, orientation)
         """
-        image_path = self.get_image_path(filename_without_ext)
-        width, height = self.get_image_dimensions(image_path)
-        orientation = self.get_image_orientation(image_path)
+        return self.probe_image(self.get_image_path(filename_without_ext))
+
+    def probe_image(self, image_path: str) -> dict:
+        """
+        Get image information for a resolved image path
 
+        Args:
+            image_path: Path to image file (see get_image_path)
+
+        Returns:
+            Dictionary with image info (path, dimensions, orientation)
+
+        Raises:
+            ValueError: If image cannot be read or is corrupted
+        """
+        width, height, orientation = self.probe_size(image_path)
         return {
             'path': image_path,
             'width': width,
@@ -160,3 +450,47 @@ class ImageHandler:
             'orientation': orientation,
             'aspect_ratio': width / height
         }
+
+    def probe_record(self, record: ImageRecord, tracer: Optional[TraceRecorder] = None) -> ImageRecord:
+        """
+        Store the size of a resolved record's image in the record
+
+        Args:
+            record: Record with path set (see get_image_path)
+            tracer: Optional trace recorder for the prober's round trip
+
+        Returns:
+            The same record
+
+        Raises:
+            ValueError: If image cannot be read or is corrupted
+        """
+        record.set_size(*self.probe_size(record.path, tracer))
+        return record
+
+    def probe_size(self, image_path: str, tracer: Optional[TraceRecorder] = None) -> Tuple[int, int, str]:
+        """
+        Get size and orientation of an image (cached if a cache is set)
+
+        Args:
+            image_path: Path to image file
+            tracer: Optional trace recorder for the prober's round trip
+
+        Returns:
+            Tuple of (width, height, orientation)
+
+        Raises:
+            ValueError: If image cannot be read or is corrupted
+        """
+        if self.info_cache is not None:
+            cached = self.info_cache.get(image_path)
+            if cached is not None:
+                return cached
+
+        width, height = self.get_image_dimensions(image_path, tracer)
+        orientation = self._orientation_from_size(width, height)
+
+        if self.info_cache is not None:
+            self.info_cache.put(image_path, width, height, orientation)
+
+        return width, height, orientation
@@ -0,0 +1,87 @@
+"""
+Image Record for Pic2Doc
+Compact per-row record passed from the Excel reader through the image
+handler to the document generator
+"""
+
+import sys
+from typing import Optional, Sequence, Union
+
+
+class ImageRecord:
+    """
+    One row: filename, caption, resolved image path and probed size
+
+    Uses __slots__ (no per-instance dict) and keeps the orientation as an
+    interned string, so large runs hold one small object per row instead
+    of a tuple plus an info dict. The path is filled in when the image is
+    resolved, the size when it is probed; width, height and orientation
+    stay None for images that were not probed (smart layout disabled).
+    """
+
+    __slots__ = ('filename', 'caption', 'path', 'width', 'height', 'orientation')
+
+    def __init__(self, filename: str, caption: str = "", path: Optional[str] = None,
+                 width: Optional[int] = None, height: Optional[int] = None,
+                 orientation: Optional[str] = None):
+        """
+        Initialize record
+
+        Args:
+            filename: Filename without extension (from the Excel row)
+            caption: Combined caption text
+            path: Resolved image path
+            width: Image width in pixels
+            height: Image height in pixels
+            orientation: "landscape", "portrait" or "square" (see ImageOrientation)
+        """
+        self.filename = filename
+        self.caption = caption
+        self.path = path
+        self.width = width
+        self.height = height
+        self.orientation = sys.intern(orientation) if orientation is not None else None
+
+    def set_size(self, width: int, height: int, orientation: str):
+        """
+        Store the probed size
+
+        Args:
+            width: Image width in pixels
+            height: Image height in pixels
+            orientation: Orientation (interned, so all records share three strings)
+        """
+        self.width = width
+        self.height = height
+        self.orientation = sys.intern(orientation)
+
+    @property
+    def aspect_ratio(self) -> Optional[float]:
+        """Width / height, or None if the image was not probed"""
+        if self.width is None:
+            return None
+        return self.width / self.height
+
+    @classmethod
+    def from_entry(cls, entry: Union['ImageRecord', Sequence]) -> 'ImageRecord':
+        """
+        Convert a (filename, caption, image_path[, image_info]) tuple
+
+        Args:
+            entry: Entry tuple (image_info is a dict with width, height and
+                   orientation, or None) or an ImageRecord (returned as-is)
+
+        Returns:
+            ImageRecord
+        """
+        if isinstance(entry, cls):
+            return entry
+        record = cls(entry[0], entry[1], entry[2])
+        info = entry[3] if len(entry) > 3 else None
+        if info:
+            record.set_size(info['width'], info['height'], info['orientation'])
+        return record
+
+    def __repr__(self) -> str:
+        return (f"ImageRecord({self.filename!r}, {self.caption!r}, {self.path!r}, "
+                f"{self.width!r}, {self.height!r}, {self.orientation!r})")
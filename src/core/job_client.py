@@ -0,0 +1,92 @@
+"""
+Job Client for Pic2Doc
+Minimal client for the local job server
+"""
+
+import json
+import socket
+from typing import Any, Dict, Iterator, Optional
+
+
+class JobClient:
+    """Talks to a running JobServer over TCP or a Unix socket"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765,
+                 socket_path: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Initialize job client
+
+        Args:
+            host: Server host (TCP)
+            port: Server port (TCP)
+            socket_path: Unix socket path; takes precedence over host/port
+            timeout: Optional socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connect(self) -> socket.socket:
+        if self.socket_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+        else:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        return sock
+
+    def _request(self, request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Send one request and yield the response event lines
+
+        Args:
+            request: Request dictionary
+
+        Yields:
+            Event dictionaries sent by the server
+        """
+        with self._connect() as sock:
+            sock.sendall((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+            with sock.makefile('rb') as stream:
+                for line in stream:
+                    if line.strip():
+                        yield json.loads(line.decode('utf-8'))
+
+    def submit(self, job: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Submit a job and stream its events
+
+        Args:
+            job: Job specification (configuration values)
+
+        Yields:
+            Event dictionaries ('queued', 'started', 'stage', 'progress', 'error',
+            and finally 'done', 'cancelled' or 'failed')
+        """
+        return self._request({'action': 'submit', 'job': job})
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+
+        Args:
+            job_id: Job identifier (from the 'queued' event)
+
+        Returns:
+            True if the server knew the job
+        """
+        for event in self._request({'action': 'cancel', 'job_id': job_id}):
+            return bool(event.get('ok'))
+        return False
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Query server status
+
+        Returns:
+            Status dictionary (queue_depth, running, completed, ...)
+        """
+        for event in self._request({'action': 'status'}):
+            return event
+        return {}
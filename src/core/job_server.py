@@ -0,0 +1,278 @@
+"""
+Job Server for Pic2Doc
+Long-running local server that keeps libraries and image metadata warm
+and runs generation jobs on a worker pool
+"""
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .cancellation import CancellationToken
+from .image_handler import ImageInfoCache
+from .picture_embedder import DigestCache
+from .pipeline import Pic2DocPipeline, TERMINAL_EVENTS
+from ..utils.constants import DEFAULT_CONFIG
+
+
+class Job:
+    """A single generation job submitted to the server"""
+
+    def __init__(self, job_id: str, spec: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]):
+        """
+        Initialize job
+
+        Args:
+            job_id: Unique job identifier
+            spec: Job specification (configuration values, see DEFAULT_CONFIG)
+            emit: Callback receiving progress/result event dicts
+        """
+        self.job_id = job_id
+        self.spec = spec
+        self.emit = emit
+        self.state = 'queued'
+        self.cancel_token = CancellationToken()
+
+
+class JobServer:
+    """Runs Pic2Doc jobs on a worker pool with warm in-memory caches"""
+
+    def __init__(self, workers: int = 2, info_cache: Optional[ImageInfoCache] = None):
+        """
+        Initialize job server
+
+        Args:
+            workers: Number of jobs processed concurrently
+            info_cache: Optional image metadata cache shared by all jobs
+        """
+        self.workers = max(1, workers)
+        self.info_cache = info_cache if info_cache is not None else ImageInfoCache()
+        # SHA1 of embedded files, so re-running a job only hashes changed images
+        self.digest_cache = DigestCache()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pic2doc-job')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._jobs: Dict[str, Job] = {}
+        self._server = None
+
+    def submit(self, spec: Dict[str, Any], emit: Callable[[Dict[str, Any]], None]) -> Job:
+        """
+        Queue a job for processing
+
+        Args:
+            spec: Job specification (configuration values)
+            emit: Callback receiving event dicts; called from worker threads
+
+        Returns:
+            The queued Job
+        """
+        job = Job(uuid.uuid4().hex[:12], spec, emit)
+
+        with self._lock:
+            self._queued += 1
+            depth = self._queued
+            self._jobs[job.job_id] = job
+
+        emit({'event': 'queued', 'job_id': job.job_id, 'queue_depth': depth})
+        self._executor.submit(self._run_job, job)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True if the job was found and is being cancelled
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.cancel_token.cancel()
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get current server status
+
+        Returns:
+            Dictionary with queue depth, running/completed counts and cache size
+        """
+        with self._lock:
+            return {
+                'queue_depth': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'failed': self._failed,
+                'workers': self.workers,
+                'cached_images': len(self.info_cache),
+                'cache_hits': self.info_cache.hits,
+                'cache_misses': self.info_cache.misses,
+            }
+
+    def _run_job(self, job: Job):
+        """
+        Execute a job (runs in worker thread)
+
+        Args:
+            job: Job to execute
+        """
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        job.state = 'running'
+        job.emit({'event': 'started', 'job_id': job.job_id})
+
+        def emit(event: Dict[str, Any]):
+            # Book the job as finished before its final event goes out, so a
+            # client that queries the status right after sees it counted
+            if event['event'] in TERMINAL_EVENTS:
+                self._finish_job(job, event['event'])
+            job.emit(dict(event, job_id=job.job_id))
+
+        try:
+            config = DEFAULT_CONFIG.copy()
+            config.update(job.spec)
+            for key in ('excel_file', 'image_folder', 'output_file'):
+                if not config.get(key):
+                    raise ValueError(f"Job-Parameter fehlt: {key}")
+
+            pipeline = Pic2DocPipeline(config, info_cache=self.info_cache, cancel_token=job.cancel_token,
+                                       digest_cache=self.digest_cache)
+            try:
+                pipeline.run(on_event=emit)
+            finally:
+                pipeline.close()
+        except Exception as e:
+            if job.state == 'running':
+                emit({'event': 'failed', 'error': str(e)})
+
+    def _finish_job(self, job: Job, state: str):
+        """
+        Record a job's final state and drop it from the job table
+
+        Args:
+            job: Finished job
+            state: 'done', 'cancelled' or 'failed'
+        """
+        job.state = state
+        with self._lock:
+            self._running -= 1
+            if state == 'failed':
+                self._failed += 1
+            else:
+                self._completed += 1
+            self._jobs.pop(job.job_id, None)
+
+    def serve_tcp(self, host: str = '127.0.0.1', port: int = 8765):
+        """
+        Serve requests on a localhost TCP port (blocks until shutdown)
+
+        Args:
+            host: Interface to bind (keep on localhost - there is no authentication)
+            port: TCP port
+        """
+        self._server = _ThreadingTCPServer((host, port), _JobRequestHandler)
+        self._server.job_server = self
+        self._server.serve_forever()
+
+    def serve_unix(self, socket_path: str):
+        """
+        Serve requests on a Unix domain socket (blocks until shutdown)
+
+        Args:
+            socket_path: Filesystem path of the socket
+        """
+        if _ThreadingUnixServer is None:
+            raise OSError("Unix-Sockets werden auf diesem System nicht unterstützt")
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self._server = _ThreadingUnixServer(socket_path, _JobRequestHandler)
+        self._server.job_server = self
+        try:
+            self._server.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    def shutdown(self):
+        """Stop accepting requests and wait for running jobs"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._executor.shutdown(wait=True)
+
+
+class _JobRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles one client connection
+
+    Protocol: JSON lines. The client sends one request line, e.g.
+        {"action": "submit", "job": {...}}
+        {"action": "cancel", "job_id": "..."}
+        {"action": "status"}
+    For "submit" the server streams the pipeline's event lines until a
+    "done", "cancelled" or "failed" event; for "status" and "cancel" it
+    answers with a single line.
+    """
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        try:
+            request = json.loads(line.decode('utf-8'))
+        except ValueError as e:
+            self._send({'event': 'failed', 'error': f"Ungültige Anfrage: {e}"})
+            return
+
+        job_server = self.server.job_server
+        action = request.get('action')
+
+        if action == 'status':
+            self._send(dict(job_server.status(), event='status'))
+        elif action == 'cancel':
+            job_id = request.get('job_id')
+            self._send({'event': 'cancel', 'job_id': job_id, 'ok': job_server.cancel(job_id)})
+        elif action == 'submit':
+            events = queue.Queue()
+            job_server.submit(request.get('job') or {}, events.put)
+            while True:
+                event = events.get()
+                try:
+                    self._send(event)
+                except OSError:
+                    # Client went away - the job keeps running
+                    break
+                if event['event'] in TERMINAL_EVENTS:
+                    break
+        else:
+            self._send({'event': 'failed', 'error': f"Unbekannte Aktion: {action}"})
+
+    def _send(self, event: Dict[str, Any]):
+        self.wfile.write((json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8'))
+        self.wfile.flush()
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _ThreadingUnixServer = None
@@ -0,0 +1,209 @@
+"""
+Page Layout for Pic2Doc
+Grid and image size calculations shared by the document generator and
+the planner (no python-docx dependency)
+"""
+
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .image_record import ImageRecord
+
+# A4 page width in inches
+A4_WIDTH_INCHES = 8.27
+
+
+def page_width_inches(config: Dict) -> float:
+    """
+    Usable page width (A4 minus left and right margins)
+
+    Args:
+        config: Configuration dictionary with margin settings
+
+    Returns:
+        Width in inches
+    """
+    return A4_WIDTH_INCHES - (config.get('margin_left_cm', 1.27) + config.get('margin_right_cm', 1.27)) / 2.54
+
+
+def calculate_optimal_grid(images_per_page: int) -> Tuple[int, int]:
+    """
+    Calculate optimal grid layout (cols x rows) for given number of images
+
+    Args:
+        images_per_page: Number of images to fit on one page
+
+    Returns:
+        Tuple of (cols, rows) for optimal space utilization
+    """
+    if images_per_page == 1:
+        return (1, 1)
+    elif images_per_page == 2:
+        return (2, 1)  # 2 images side by side
+    elif images_per_page == 3:
+        return (2, 2)  # 2x2 grid, last cell empty
+    elif images_per_page == 4:
+        return (2, 2)  # Perfect 2x2 grid
+    elif images_per_page == 5:
+        return (3, 2)  # 3x2 grid, last cell empty
+    elif images_per_page == 6:
+        return (3, 2)  # Perfect 3x2 grid
+    elif images_per_page == 7:
+        return (3, 3)  # 3x3 grid, 2 cells empty
+    elif images_per_page == 8:
+        return (3, 3)  # 3x3 grid, 1 cell empty
+    elif images_per_page == 9:
+        return (3, 3)  # Perfect 3x3 grid
+    elif images_per_page == 10:
+        return (3, 4)  # 3x4 grid, 2 cells empty
+    else:
+        # For larger numbers, calculate optimal grid
+        # Try to get close to square aspect ratio
+        cols = math.ceil(math.sqrt(images_per_page))
+        rows = math.ceil(images_per_page / cols)
+        return (cols, rows)
+
+def calculate_layout(images_per_page: int, num_images: int) -> List[List[int]]:
+    """
+    Calculate intelligent layout for images on a page to maximize space utilization
+    Fills row by row in strict order from the image list
+
+    Args:
+        images_per_page: Target number of images per page
+        num_images: Number of images on this page
+
+    Returns:
+        List of rows, where each row contains indices of images in that row
+        Example: [[0, 1], [2, 3]] = 2x2 grid layout (strict left-to-right, top-to-bottom order)
+    """
+    # Get optimal grid dimensions
+    cols, rows = calculate_optimal_grid(images_per_page)
+
+    # Build layout row by row in strict order
+    layout = []
+    img_idx = 0
+
+    for row in range(rows):
+        if img_idx >= num_images:
+            break
+
+        row_images = []
+        for col in range(cols):
+            if img_idx < num_images:
+                row_images.append(img_idx)
+                img_idx += 1
+            else:
+                break
+
+        if row_images:
+            layout.append(row_images)
+
+    return layout
+
+def calculate_image_size(aspect_ratio: Optional[float], available_width: float,
+                         num_in_row: int, images_per_page: int, total_rows: int,
+                         font_size: int) -> Tuple[float, float]:
+    """
+    Calculate appropriate image size based on available space and grid layout
+    Uses much more conservative estimates to prevent page breaks
+
+    Args:
+        aspect_ratio: Image width / height (None if the image was not probed)
+        available_width: Available width in inches for all images in row
+        num_in_row: Number of images in this row
+        images_per_page: Total images expected per page
+        total_rows: Total number of rows in grid
+        font_size: Font size for captions in points
+
+    Returns:
+        Tuple of (width, height) in inches
+    """
+    if aspect_ratio is None:
+        # Fallback size
+        width = available_width / num_in_row * 0.85
+        return (width, width * 1.33)  # Assume portrait aspect ratio
+
+    # Calculate width per image with padding between images
+    padding_between = 0.05  # Reduced padding
+    total_padding = padding_between * (num_in_row - 1)
+    width_per_image = (available_width - total_padding) / num_in_row
+
+    # Calculate height based on aspect ratio
+    height = width_per_image / aspect_ratio
+
+    # VERY conservative height calculation to prevent ANY page breaks
+    # A4 page is 11.7 inches tall
+    usable_height = 8.5  # Very conservative estimate (was 9.0)
+
+    # Calculate caption height - be more generous
+    caption_height_per_row = (font_size / 72) * 2.5  # Increased from 2.0
+
+    # More spacing between rows
+    spacing_between_rows = 0.15  # Increased from 0.1
+
+    # More table overhead
+    table_overhead = 0.3  # Increased from 0.2
+
+    # Calculate total space needed
+    total_caption_space = caption_height_per_row * total_rows
+    total_row_spacing = spacing_between_rows * max(0, total_rows - 1)
+
+    # Available space for all images
+    available_for_images = usable_height - total_caption_space - total_row_spacing - table_overhead
+
+    # Max height per image
+    max_height_per_image = available_for_images / total_rows
+
+    # Reduce further for many columns
+    if num_in_row > 2:
+        max_height_per_image *= 0.90  # More conservative
+
+    # Apply maximum height constraint
+    if height > max_height_per_image:
+        height = max_height_per_image
+        width_per_image = height * aspect_ratio
+
+    # Final safety reduction - reduce everything by 10%
+    width_per_image *= 0.90
+    height *= 0.90
+
+    return (width_per_image, height)
+
+
+def iter_page_layouts(records: Iterable[ImageRecord],
+                      config: Dict) -> Iterator[List[Tuple[ImageRecord, float, float]]]:
+    """
+    Lay out records page by page exactly like the document generator
+
+    Args:
+        records: Iterable of ImageRecords
+        config: Configuration dictionary (images_per_page, font_size, margins)
+
+    Yields:
+        One list per page of (record, width_inches, height_inches) in row order
+    """
+    images_per_page = config['images_per_page']
+    page_width = page_width_inches(config)
+
+    page = []
+    for record in records:
+        page.append(record)
+        if len(page) == images_per_page:
+            yield _place_page(page, images_per_page, page_width, config['font_size'])
+            page = []
+    if page:
+        yield _place_page(page, images_per_page, page_width, config['font_size'])
+
+
+def _place_page(page: List[ImageRecord], images_per_page: int, page_width: float,
+                font_size: int) -> List[Tuple[ImageRecord, float, float]]:
+    layout = calculate_layout(images_per_page, len(page))
+    placements = []
+    for row_indices in layout:
+        for img_idx in row_indices:
+            record = page[img_idx]
+            width, height = calculate_image_size(
+                record.aspect_ratio, page_width, len(row_indices), images_per_page, len(layout), font_size
+            )
+            placements.append((record, width, height))
+    return placements
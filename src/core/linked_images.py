@@ -0,0 +1,251 @@
+"""
+Linked Images for Pic2Doc
+Inserts pictures as links to the image files instead of embedding them,
+and converts such documents into self-contained ones
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import quote, urlparse
+from urllib.request import url2pathname
+
+from docx import Document
+from docx.image.image import Image, _ImageHeaderFactory
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from docx.oxml.shape import CT_Inline
+from docx.shared import Length
+
+from .cancellation import CancellationToken
+from .docx_writer import DocxWriter
+from .picture_embedder import PictureEmbedder
+from ..utils.log import get_logger
+
+log = get_logger('linked')
+
+
+class _CountingReader:
+    """File wrapper counting the bytes actually read (header parsers seek around)"""
+
+    def __init__(self, f):
+        self._f = f
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._f.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+
+def link_target(image_path: str, base_dir: Optional[str] = None) -> str:
+    """
+    Relationship target of a linked image
+
+    Args:
+        image_path: Image file
+        base_dir: Directory of the document for a relative link; None for
+                  an absolute file:// URI
+
+    Returns:
+        Relative URI reference (e.g. "../pics/IMG%201.jpg") or file URI
+    """
+    image_path = os.path.abspath(image_path)
+    if base_dir is not None:
+        try:
+            relative = os.path.relpath(image_path, os.path.abspath(base_dir))
+        except ValueError:
+            pass  # Different drive (Windows): only an absolute link works
+        else:
+            return quote(relative.replace(os.sep, '/'))
+    return Path(image_path).as_uri()
+
+
+def resolve_link(target: str, base_dir: str) -> str:
+    """
+    File path of a linked image's relationship target
+
+    Args:
+        target: Relationship target (file URI, relative URI or plain path)
+        base_dir: Directory of the document
+
+    Returns:
+        Absolute file path
+    """
+    if target.lower().startswith('file:'):
+        parsed = urlparse(target)
+        path = url2pathname(parsed.path)
+        if parsed.netloc and parsed.netloc.lower() != 'localhost':
+            path = f"//{parsed.netloc}{path}"  # UNC share
+        return os.path.normpath(path)
+    return os.path.normpath(os.path.join(base_dir, url2pathname(target)))
+
+
+class PictureLinker:
+    """
+    Counterpart of PictureEmbedder that links pictures instead of embedding them
+
+    Each picture gets an external image relationship to its file and a
+    blip with r:link instead of r:embed, so the document stays small and
+    builds without reading the images - only their headers are parsed,
+    to size the pictures exactly like embedded ones. Word shows the
+    files when the document is opened; they have to stay at the linked
+    location. Several pictures of the same file share one relationship.
+    """
+
+    def __init__(self, document, base_dir: Optional[str] = None):
+        """
+        Initialize linker for a document
+
+        Args:
+            document: python-docx Document
+            base_dir: Directory the document will be saved in, for relative
+                      links; None for absolute file:// links
+        """
+        self._part = document.part
+        self._rels = self._part.rels
+        self._base_dir = base_dir
+        self._rids: Dict[str, str] = {
+            rel.target_ref: rId for rId, rel in self._rels.items()
+            if rel.is_external and rel.reltype == RT.IMAGE
+        }
+        # (path, mtime_ns, size) -> parsed header, for files linked before
+        self._images: Dict[Tuple[str, int, int], Image] = {}
+        self._next_rid_number = 1
+        ids = [int(value) for value in self._part.element.xpath('//@id') if value.isdigit()]
+        self._next_shape_id = max(ids) + 1 if ids else 1
+
+        self.files_read = 0     # Headers parsed
+        self.bytes_read = 0
+        self.deduplicated = 0   # Pictures that reused an earlier file's link
+
+    def add_picture(self, run, image_path: str, width: Length) -> int:
+        """
+        Add a linked picture at the end of a run, scaled to a width
+
+        Args:
+            run: python-docx Run
+            image_path: Image file
+            width: Picture width (the height keeps the aspect ratio)
+
+        Returns:
+            Number of header bytes read (0 if the file was linked before)
+
+        Raises:
+            OSError: If the file cannot be read
+            UnrecognizedImageError: If python-docx does not support the format
+        """
+        stat = os.stat(image_path)
+        file_key = (image_path, stat.st_mtime_ns, stat.st_size)
+        image = self._images.get(file_key)
+        bytes_read = 0
+        if image is not None:
+            self.deduplicated += 1
+        else:
+            image, bytes_read = self._read_header(image_path)
+            self._images[file_key] = image
+
+        target = link_target(image_path, self._base_dir)
+        rId = self._rids.get(target)
+        if rId is None:
+            rId = self._next_rid()
+            self._rels.add_relationship(RT.IMAGE, target, rId, is_external=True)
+            self._rids[target] = rId
+
+        cx, cy = image.scaled_dimensions(width, None)
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        inline = CT_Inline.new_pic_inline(shape_id, rId, image.filename, cx, cy)
+        blip = inline.graphic.graphicData.pic.blipFill.blip
+        blip.embed = None
+        blip.link = rId
+        run._r.add_drawing(inline)
+        return bytes_read
+
+    def _read_header(self, image_path: str) -> Tuple[Image, int]:
+        """Parse only the image header; returns (image without content, bytes read)"""
+        with open(image_path, 'rb') as f:
+            stream = _CountingReader(f)
+            header = _ImageHeaderFactory(stream)
+            bytes_read = stream.bytes_read
+        self.files_read += 1
+        self.bytes_read += bytes_read
+        return Image(b'', os.path.basename(image_path), header), bytes_read
+
+    def _next_rid(self) -> str:
+        """Lowest unused rId of the document part"""
+        while f"rId{self._next_rid_number}" in self._rels:
+            self._next_rid_number += 1
+        return f"rId{self._next_rid_number}"
+
+
+def embed_linked_images(
+    document_path: Union[str, Path],
+    output_path: Optional[Union[str, Path]] = None,
+    compress_level: int = 6,
+    cancel_token: Optional[CancellationToken] = None
+) -> Tuple[int, List[str]]:
+    """
+    Convert a document with linked pictures into one with embedded pictures
+
+    Every picture linked to an image file gets the file embedded (files
+    linked several times are embedded once); links are resolved relative
+    to the document's directory. Pictures whose file is missing or
+    unreadable stay linked.
+
+    Args:
+        document_path: Document with linked pictures
+        output_path: Output path (default: replace the document)
+        compress_level: zlib level for the XML parts
+        cancel_token: Token checked before every picture and while saving
+
+    Returns:
+        Tuple of (embedded picture count, paths of files that could not be embedded)
+
+    Raises:
+        OperationCancelled: If cancel_token was triggered
+    """
+    cancel_token = cancel_token or CancellationToken()
+    document_path = Path(document_path)
+    base_dir = str(document_path.resolve().parent)
+    doc = Document(str(document_path))
+    part = doc.part
+    rels = part.rels
+    embedder = PictureEmbedder(doc)
+
+    embedded = 0
+    failed: Dict[str, str] = {}  # path -> error message
+    for blip in part.element.iter(qn('a:blip')):
+        cancel_token.raise_if_cancelled()
+        rel = rels.get(blip.link) if blip.link else None
+        if blip.embed is not None or rel is None or not rel.is_external or rel.reltype != RT.IMAGE:
+            continue
+        image_path = resolve_link(rel.target_ref, base_dir)
+        if image_path in failed:
+            continue
+        try:
+            rId, _image, _bytes_read = embedder.relate_file(image_path)
+        except Exception as e:
+            failed[image_path] = str(e)
+            log.warning("⚠ Verknüpftes Bild nicht eingebettet: %s (%s)", image_path, e,
+                        extra={'image': image_path})
+            continue
+        blip.embed = rId
+        blip.link = None
+        embedded += 1
+
+    # Drop the links no picture uses anymore
+    linked = {blip.link for blip in part.element.iter(qn('a:blip')) if blip.link}
+    for rId, rel in list(rels.items()):
+        if rel.is_external and rel.reltype == RT.IMAGE and rId not in linked:
+            del rels[rId]
+
+    DocxWriter(compress_level).save_file(doc, output_path or document_path, cancel_token)
+    log.info("✓ %d verknüpfte Bilder eingebettet", embedded, extra={'embedded': embedded})
+    return embedded, list(failed)
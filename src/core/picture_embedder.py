@@ -0,0 +1,224 @@
+"""
+Picture Embedder for Pic2Doc
+Adds pictures to a python-docx document with constant work per picture
+"""
+
+import hashlib
+import io
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from docx.image.image import Image, _ImageHeaderFactory
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.oxml.shape import CT_Inline
+from docx.parts.image import ImagePart
+from docx.shared import Length
+
+from .prefetch import ImagePrefetcher
+
+
+class DigestCache:
+    """
+    SHA1 of image files, shared by the documents one process builds
+
+    Keyed like the embedder's own file map by (path, mtime_ns, size), so a
+    changed file is hashed again. Rebuilding a document (e.g. in watch
+    mode) then only hashes the files that are new or changed.
+    """
+
+    def __init__(self, max_entries: int = 200000):
+        """
+        Initialize digest cache
+
+        Args:
+            max_entries: Maximum number of cached files (oldest are dropped first)
+        """
+        self.max_entries = max_entries
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, file_key: Tuple[str, int, int]) -> Optional[str]:
+        """SHA1 hex digest of a file version, or None"""
+        with self._lock:
+            return self._digests.get(file_key)
+
+    def put(self, file_key: Tuple[str, int, int], sha1: str):
+        """Store the SHA1 hex digest of a file version"""
+        with self._lock:
+            if file_key not in self._digests and len(self._digests) >= self.max_entries:
+                # Dicts keep insertion order - drop the oldest entry
+                del self._digests[next(iter(self._digests))]
+            self._digests[file_key] = sha1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._digests)
+
+
+class PictureEmbedder:
+    """
+    Replacement for run.add_picture() when adding many pictures to one document
+
+    python-docx's add_picture() does work proportional to the document for
+    every picture: it re-hashes the blob of every image part already in the
+    package to find duplicates, scans all relationships for an existing one
+    and its next free rId, lists all image part names for the next number,
+    and runs an XPath query over the whole document for the next shape id.
+    With thousands of pictures this dominates document creation.
+
+    The embedder keeps these as dictionaries and counters instead. Each
+    file is read once, its SHA1 computed once, and its header parsed from
+    the bytes already in memory with python-docx's own parser, so sizes,
+    DPI handling, part names, rIds, shape ids and duplicate handling stay
+    exactly as with add_picture().
+
+    A file referenced again (same path, modification time and size) reuses
+    its image part after a single stat, without being opened or read
+    again; other files with identical content are still found by their
+    SHA1.
+
+    With a prefetcher, files read ahead are taken from its buffer instead
+    of being opened here. With a digest cache, files hashed for an earlier
+    document are not hashed again.
+    """
+
+    def __init__(self, document, prefetcher: Optional[ImagePrefetcher] = None,
+                 digests: Optional[DigestCache] = None):
+        """
+        Initialize embedder for a document
+
+        Args:
+            document: python-docx Document; pictures should only be added
+                      through this embedder from now on
+            prefetcher: Optional read-ahead buffer to take file contents from
+            digests: Optional SHA1 cache shared with other documents
+        """
+        self._prefetcher = prefetcher
+        self._digests = digests
+        self._part = document.part
+        self._rels = self._part.rels
+        self._image_parts = self._part.package.image_parts
+
+        self._parts_by_sha1: Dict[str, ImagePart] = {part.sha1: part for part in self._image_parts}
+        # (path, mtime_ns, size) -> part, for files embedded before
+        self._parts_by_file: Dict[Tuple[str, int, int], ImagePart] = {}
+        self._rids: Dict[ImagePart, str] = {
+            rel.target_part: rId for rId, rel in self._rels.items()
+            if not rel.is_external and rel.reltype == RT.IMAGE
+        }
+        self._used_image_numbers = {part.partname.idx for part in self._image_parts}
+        self._next_image_number = 1
+        self._next_rid_number = 1
+        ids = [int(value) for value in self._part.element.xpath('//@id') if value.isdigit()]
+        self._next_shape_id = max(ids) + 1 if ids else 1
+
+        self.files_read = 0
+        self.bytes_read = 0
+        self.deduplicated = 0  # Pictures that reused an earlier file's part
+
+    def add_picture(self, run, image_path: str, width: Length) -> int:
+        """
+        Add a picture at the end of a run, scaled to a width
+
+        Args:
+            run: python-docx Run
+            image_path: Image file
+            width: Picture width (the height keeps the aspect ratio)
+
+        Returns:
+            Number of bytes read from the file (0 if it was embedded before or prefetched)
+
+        Raises:
+            OSError: If the file cannot be read
+            UnrecognizedImageError: If python-docx does not support the format
+        """
+        rId, image, bytes_read = self.relate_file(image_path)
+        # Identical content shares the part; like add_picture() the
+        # picture is then named after the file that created the part
+        cx, cy = image.scaled_dimensions(width, None)
+        shape_id = self._next_shape_id
+        self._next_shape_id += 1
+        run._r.add_drawing(CT_Inline.new_pic_inline(shape_id, rId, image.filename, cx, cy))
+        return bytes_read
+
+    def relate_file(self, image_path: str) -> Tuple[str, Image, int]:
+        """
+        Get the document's image relationship for a file, adding it if needed
+
+        Args:
+            image_path: Image file
+
+        Returns:
+            (rId, image of the part, bytes read from the file here)
+
+        Raises:
+            OSError: If the file cannot be read
+            UnrecognizedImageError: If python-docx does not support the format
+        """
+        prefetched = self._prefetcher.take(image_path) if self._prefetcher is not None else None
+        bytes_read = 0
+        if prefetched is not None:
+            stat, blob = prefetched  # Stat and read through the same descriptor
+            file_key = (image_path, stat.st_mtime_ns, stat.st_size)
+            image_part = self._parts_by_file.get(file_key)
+        else:
+            # A file referenced again costs one stat, not an open
+            stat = os.stat(image_path)
+            file_key = (image_path, stat.st_mtime_ns, stat.st_size)
+            image_part = self._parts_by_file.get(file_key)
+            if image_part is None:
+                # Stat the open file again and read through it, so the cache key
+                # describes the bytes read even if the file was replaced meanwhile
+                with open(image_path, 'rb') as f:
+                    stat = os.fstat(f.fileno())
+                    file_key = (image_path, stat.st_mtime_ns, stat.st_size)
+                    image_part = self._parts_by_file.get(file_key)
+                    blob = f.read() if image_part is None else None
+                bytes_read = len(blob) if blob is not None else 0
+        if image_part is not None:
+            self.deduplicated += 1
+        else:
+            image_part = self._get_or_add_part(image_path, blob, file_key)
+            self._parts_by_file[file_key] = image_part
+
+        rId = self._rids.get(image_part)
+        if rId is None:
+            rId = self._next_rid()
+            self._rels.add_relationship(RT.IMAGE, image_part, rId)
+            self._rids[image_part] = rId
+        return rId, image_part.image, bytes_read
+
+    def _get_or_add_part(self, image_path: str, blob: bytes,
+                         file_key: Optional[Tuple[str, int, int]] = None) -> ImagePart:
+        """Return the image part holding a file's content, adding it if new"""
+        self.files_read += 1
+        self.bytes_read += len(blob)
+
+        sha1 = self._digests.get(file_key) if self._digests is not None and file_key else None
+        if sha1 is None:
+            sha1 = hashlib.sha1(blob).hexdigest()
+            if self._digests is not None and file_key:
+                self._digests.put(file_key, sha1)
+        image_part = self._parts_by_sha1.get(sha1)
+        if image_part is None:
+            image = Image(blob, os.path.basename(image_path), _ImageHeaderFactory(io.BytesIO(blob)))
+            image_part = ImagePart.from_image(image, self._next_partname(image.ext))
+            self._image_parts.append(image_part)
+            self._parts_by_sha1[sha1] = image_part
+        return image_part
+
+    def _next_partname(self, ext: str) -> PackURI:
+        """Lowest unused /word/media/imageN.<ext> name (numbers are never reused)"""
+        while self._next_image_number in self._used_image_numbers:
+            self._next_image_number += 1
+        number = self._next_image_number
+        self._used_image_numbers.add(number)
+        return PackURI(f"/word/media/image{number}.{ext}")
+
+    def _next_rid(self) -> str:
+        """Lowest unused rId of the document part"""
+        while f"rId{self._next_rid_number}" in self._rels:
+            self._next_rid_number += 1
+        return f"rId{self._next_rid_number}"
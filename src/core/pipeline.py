@@ -0,0 +1,592 @@
+"""
+Pic2Doc Pipeline
+Single read -> locate -> probe -> generate implementation shared by the
+CLI, the GUI and the job server
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .cancellation import CancellationToken, OperationCancelled
+from .excel_reader import ExcelReader
+from .image_handler import ImageHandler, ImageInfoCache
+from .image_record import ImageRecord
+from .document_generator import DocumentGenerator
+from .error_log import ErrorCategory, categorize_exception
+from .planner import ThroughputStats
+from .picture_embedder import DigestCache
+from .prefetch import ImagePrefetcher
+from .run_report import RunReport, report_path
+from .tracing import TraceRecorder, trace_path
+from ..utils.constants import DEFAULT_CONFIG, TERMINAL_EVENTS
+from ..utils.log import get_logger
+
+log = get_logger('pipeline')
+
+# Marks the end of the row stream in the pending queue
+_END_OF_ROWS = object()
+
+
+class PipelineResult:
+    """Summary of a pipeline run"""
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.rows_read = 0
+        self.found_count = 0
+        self.processed = 0
+        self.errors: List[Tuple[str, str]] = []
+        self.orientation_counts: Dict[str, int] = {}
+        # Excel filename -> candidate files, for names that matched several files
+        self.ambiguous: Dict[str, List[str]] = {}
+        self.cancelled = False
+        self.report: Optional[RunReport] = None
+
+    def to_event(self) -> Dict[str, Any]:
+        """Convert to a 'done' (or 'cancelled') event dictionary"""
+        return {
+            'event': 'cancelled' if self.cancelled else 'done',
+            'output_file': self.output_path,
+            'rows': self.rows_read,
+            'found': self.found_count,
+            'processed': self.processed,
+            'errors': [{'filename': filename, 'error': error} for filename, error in self.errors],
+            'ambiguous': self.ambiguous,
+            'report': self.report.to_dict() if self.report is not None else None,
+        }
+
+
+class Pic2DocPipeline:
+    """
+    Streams rows reader -> resolver/probe -> (optional transform) -> renderer
+
+    The reader runs in its own thread and submits one probe task per row to
+    an executor. Futures are queued in row order, so the renderer consumes
+    results in EXACT Excel order while later rows are still being probed.
+    The bounded queue limits how far the reader may run ahead.
+
+    Progress, errors and completion are reported as event dictionaries,
+    either through the `on_event` callback of run() or by iterating events().
+    Every event has an 'event' key:
+        stage     {'stage': 'excel' | 'images' | 'document'}
+        progress  {'current', 'total', 'filename'}
+        error     {'filename', 'error', 'category'}  (see ErrorCategory)
+        done / cancelled  (see PipelineResult.to_event)
+        failed    {'error'}  (events() only - run() raises instead)
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        image_handler: Optional[ImageHandler] = None,
+        info_cache: Optional[ImageInfoCache] = None,
+        executor: Optional[Executor] = None,
+        probe_workers: int = 4,
+        queue_size: int = 64,
+        transform: Optional[Callable[[ImageRecord], ImageRecord]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        rows: Optional[List[Tuple[str, str]]] = None,
+        throughput: Optional[ThroughputStats] = None,
+        digest_cache: Optional[DigestCache] = None
+    ):
+        """
+        Initialize pipeline
+
+        Args:
+            config: Configuration dictionary (see DEFAULT_CONFIG)
+            image_handler: Optional preconfigured ImageHandler
+            info_cache: Optional image metadata cache (used if image_handler is None)
+            executor: Optional executor for probe tasks; it is not shut down by the
+                      pipeline, so it can be shared between runs
+            probe_workers: Number of probe threads if no executor is given
+            queue_size: Maximum number of rows in flight between reader and renderer
+            transform: Optional callable applied to each resolved ImageRecord in the
+                       probe workers, e.g. for resampling
+            cancel_token: Optional cancellation token (one is created if omitted);
+                          it is checked by the reader, every probe and the renderer
+            rows: Optional pre-read (filename, caption) rows, e.g. from a
+                  PreScanner; config['excel_file'] is not read then
+            throughput: Optional stats that record the render/save throughput
+                        of completed runs (used by the planner's estimates)
+            digest_cache: Optional SHA1 cache of embedded image files (one is
+                          created if omitted, so repeated runs of this
+                          pipeline hash only new or changed files)
+        """
+        self.config = config
+        self.image_handler = image_handler
+        self._owns_image_handler = image_handler is None
+        self.info_cache = info_cache
+        self.executor = executor
+        self.probe_workers = max(1, probe_workers)
+        self.queue_size = max(1, queue_size)
+        self.transform = transform
+        self.cancel_token = cancel_token or CancellationToken()
+        self.rows = rows
+        self.throughput = throughput
+        self.digest_cache = digest_cache or DigestCache()
+        # Stage measurements of the current (or last) run
+        self.report = RunReport()
+
+    # ----- Stages -----
+
+    def get_image_handler(self) -> ImageHandler:
+        """
+        Get (and create on first use) the image handler
+
+        Returns:
+            ImageHandler for config['image_folder']
+        """
+        if self.image_handler is None:
+            self.image_handler = ImageHandler.from_config(self.config, info_cache=self.info_cache)
+        return self.image_handler
+
+    def read_rows(self, reader: Optional[ExcelReader] = None) -> Iterator[ImageRecord]:
+        """
+        Excel stage: stream rows, honouring test mode
+
+        Args:
+            reader: Optional ExcelReader (to access its row_count_hint)
+
+        Yields:
+            ImageRecord per row (filename and caption set)
+        """
+        reader = reader or ExcelReader()
+        if self.rows is not None:
+            reader.row_count_hint = len(self.rows)
+            rows = (ImageRecord(filename, caption) for filename, caption in self.rows)
+        else:
+            rows = reader.iter_records(
+                self.config['excel_file'],
+                self.config.get('filename_column', 'A'),
+                self.config.get('caption_columns', ['I']),
+                self.config.get('caption_separator', ' - '),
+                cancel_token=self.cancel_token
+            )
+        limit = self._row_limit()
+        if limit is not None:
+            rows = islice(rows, limit)
+        return rows
+
+    def probe(self, record: ImageRecord) -> ImageRecord:
+        """
+        Resolve/probe stage for one row (thread-safe)
+
+        Args:
+            record: Row record (filename and caption set)
+
+        Returns:
+            The record with path set, and its size when smart_layout is
+            enabled (or whatever the transform returned)
+
+        Raises:
+            FileNotFoundError: If the image file doesn't exist
+            ValueError: If the image is corrupted
+            OperationCancelled: If the run was cancelled before this task started
+        """
+        self.cancel_token.raise_if_cancelled()
+        image_handler = self.get_image_handler()
+        filename = record.filename
+        with self.report.stage('resolve', image=filename):
+            record.path = image_handler.get_image_path(filename)
+
+        if self.config.get('smart_layout', False):
+            with self.report.stage('probe', image=filename):
+                image_handler.probe_record(record, self.report.tracer)
+
+        if self.transform is not None:
+            with self.report.stage('resample', image=filename):
+                record = self.transform(record)
+        return record
+
+    def generate(
+        self,
+        entries,
+        output_path: str,
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+        total: Optional[int] = None,
+        prefetcher: Optional[ImagePrefetcher] = None
+    ) -> Tuple[int, List[str]]:
+        """
+        Document stage: render entries and save the document
+
+        Args:
+            entries: Iterable of ImageRecords (see probe)
+            output_path: Where to save the document
+            progress_callback: Optional callback function(current, total, filename)
+            total: Expected number of entries for progress reporting
+            prefetcher: Optional read-ahead buffer filled with the entries' images
+
+        Returns:
+            Tuple of (processed_count, failed_filenames)
+        """
+        doc_generator = DocumentGenerator(self.config)
+        processed, failed = doc_generator.create_document(
+            entries, output_path, progress_callback, total=total, cancel_token=self.cancel_token,
+            report=self.report, prefetcher=prefetcher, digests=self.digest_cache
+        )
+
+        if self.throughput is not None:
+            self.throughput.record('render_images_per_second', processed, doc_generator.timings['render'])
+            self.throughput.record('save_bytes_per_second', os.path.getsize(output_path),
+                                   doc_generator.timings['save'])
+            self.throughput.save()
+
+        return processed, failed
+
+    # ----- Driving -----
+
+    def cancel(self):
+        """Request cancellation; the run stops before the next image"""
+        self.cancel_token.cancel()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.cancel_token.is_cancelled
+
+    def close(self):
+        """Release what the pipeline keeps between runs (the probe workers of its own image handler)"""
+        if self.image_handler is not None and self._owns_image_handler:
+            self.image_handler.close()
+
+    def run(self, on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+            output_path: Optional[str] = None) -> PipelineResult:
+        """
+        Run the full pipeline in the calling thread
+
+        Args:
+            on_event: Optional callback receiving event dictionaries
+            output_path: Output file (defaults to config['output_file'])
+
+        Returns:
+            PipelineResult. No document is written when no image could be
+            found or the run was cancelled.
+
+        Raises:
+            FileNotFoundError, ValueError: Invalid Excel file or image folder
+        """
+        emit = on_event or (lambda event: None)
+        result = PipelineResult(output_path or self.config['output_file'])
+        tracer = TraceRecorder() if self.config.get('write_trace', False) else None
+        self.report = result.report = RunReport(tracer=tracer)
+
+        emit({'event': 'stage', 'stage': 'excel'})
+        # A reused handler may have been indexed before files were added
+        image_handler = self.get_image_handler()
+        image_handler.refresh_index()
+        image_handler.ambiguous_matches.clear()
+        reader = ExcelReader()
+        pending = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        executor = self.executor
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=self.probe_workers, thread_name_prefix='pic2doc-probe')
+
+        reader_thread = threading.Thread(
+            target=self._read_stage,
+            args=(reader, executor, pending, stop, result),
+            name='pic2doc-reader',
+            daemon=True
+        )
+        reader_thread.start()
+
+        # Optional read-ahead stage between the probes and the renderer
+        prefetcher = self._create_prefetcher()
+        prefetch_thread = None
+        if prefetcher is not None:
+            ready = queue.Queue(maxsize=self.queue_size)
+            prefetch_thread = threading.Thread(
+                target=self._prefetch_stage,
+                args=(pending, ready, stop, prefetcher),
+                name='pic2doc-prefetch-order',
+                daemon=True
+            )
+            prefetch_thread.start()
+        else:
+            ready = pending
+
+        try:
+            emit({'event': 'stage', 'stage': 'images'})
+            records = self._iter_records(ready, result, emit, prefetcher)
+
+            # Don't create an empty document if not a single image was found
+            try:
+                first = next(records, None)
+            except OperationCancelled:
+                first = None
+                result.cancelled = True
+            if first is None:
+                return self._finish(result, emit)
+
+            def expected_total() -> int:
+                hint = reader.row_count_hint
+                rows = result.rows_read if hint is None else max(hint, result.rows_read)
+                limit = self._row_limit()
+                if limit is not None:
+                    rows = min(rows, limit)
+                return max(rows - len(result.errors), result.found_count)
+
+            def on_progress(current: int, total: int, filename: str):
+                emit({'event': 'progress', 'current': current, 'total': expected_total(), 'filename': filename})
+
+            emit({'event': 'stage', 'stage': 'document'})
+            try:
+                processed, failed = self.generate(
+                    self._chain(first, records),
+                    result.output_path,
+                    progress_callback=on_progress,
+                    total=expected_total(),
+                    prefetcher=prefetcher
+                )
+            except OperationCancelled:
+                # Partial output was already removed by the generator
+                result.cancelled = True
+                return self._finish(result, emit)
+
+            result.processed = processed
+            for filename in failed:
+                result.errors.append((filename, "Fehler beim Einfügen"))
+                emit({'event': 'error', 'filename': filename, 'error': "Fehler beim Einfügen",
+                      'category': ErrorCategory.OTHER})
+            return self._finish(result, emit)
+        finally:
+            stop.set()
+            reader_thread.join()
+            if prefetch_thread is not None:
+                prefetch_thread.join()
+                self._drain(ready)
+                prefetcher.close()
+            self._drain(pending)
+            if own_executor:
+                executor.shutdown(wait=True)
+
+    def events(self, output_path: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Run the pipeline in a background thread and iterate over its events
+
+        Closing the iterator early cancels the run. Exceptions are reported
+        as a final 'failed' event instead of being raised.
+
+        Args:
+            output_path: Output file (defaults to config['output_file'])
+
+        Yields:
+            Event dictionaries, ending with 'done', 'cancelled' or 'failed'
+        """
+        events = queue.Queue()
+
+        def worker():
+            try:
+                self.run(on_event=events.put, output_path=output_path)
+            except Exception as e:
+                events.put({'event': 'failed', 'error': str(e)})
+
+        thread = threading.Thread(target=worker, name='pic2doc-pipeline', daemon=True)
+        thread.start()
+        try:
+            while True:
+                event = events.get()
+                yield event
+                if event['event'] in TERMINAL_EVENTS:
+                    return
+        finally:
+            if thread.is_alive():
+                self.cancel()
+            thread.join()
+
+    # ----- Internals -----
+
+    def _finish(self, result: PipelineResult, emit: Callable[[Dict[str, Any]], None]) -> PipelineResult:
+        """Complete the run report (and write it and the trace if configured), emit the final event"""
+        if self.image_handler is not None:
+            result.ambiguous = dict(self.image_handler.ambiguous_matches)
+        result.report.finish(rows=result.rows_read, found=result.found_count,
+                             processed=result.processed, errors=len(result.errors),
+                             ambiguous=len(result.ambiguous))
+        if self.config.get('write_report', False) and result.processed and not result.cancelled:
+            path = report_path(result.output_path)
+            try:
+                result.report.write_json(path)
+                log.info("✓ Laufzeitbericht gespeichert: %s", path)
+            except OSError as e:
+                log.warning("⚠ Laufzeitbericht konnte nicht gespeichert werden: %s", e)
+        if result.report.tracer is not None and result.processed and not result.cancelled:
+            path = trace_path(result.output_path)
+            try:
+                result.report.tracer.write(path)
+                log.info("✓ Trace gespeichert: %s (in Perfetto oder chrome://tracing öffnen)", path)
+            except OSError as e:
+                log.warning("⚠ Trace konnte nicht gespeichert werden: %s", e)
+        emit(result.to_event())
+        return result
+
+    def _row_limit(self) -> Optional[int]:
+        """Maximum number of rows to process (test mode), or None"""
+        if self.config.get('test_mode', False):
+            return self.config.get('test_image_limit', 10)
+        return None
+
+    def _create_prefetcher(self) -> Optional[ImagePrefetcher]:
+        """Read-ahead buffer per config['prefetch_images'], or None (disabled or linked images)"""
+        # CLI and GUI configurations do not carry these keys: use the defaults then
+        window = self.config.get('prefetch_images', DEFAULT_CONFIG['prefetch_images'])
+        if window <= 0 or self.config.get('link_images', False):
+            return None
+        megabytes = self.config.get('prefetch_mb', DEFAULT_CONFIG['prefetch_mb'])
+        return ImagePrefetcher(window, int(megabytes * 1024 * 1024),
+                               self.config.get('prefetch_workers', DEFAULT_CONFIG['prefetch_workers']), self.report)
+
+    def _read_stage(self, reader: ExcelReader, executor: Executor, pending: queue.Queue,
+                    stop: threading.Event, result: PipelineResult):
+        """
+        Reader stage: stream rows and submit probe tasks (runs in thread)
+
+        Args:
+            reader: Excel reader
+            executor: Probe executor
+            pending: Bounded queue receiving (filename, future) in row order
+            stop: Set when the consumer stops early
+            result: Result object (rows_read is updated)
+        """
+        try:
+            for record in self.report.iter_stage('excel', self.read_rows(reader)):
+                if stop.is_set():
+                    return
+                result.rows_read += 1
+                future = executor.submit(self.probe, record)
+                if not self._put(pending, (record.filename, future), stop):
+                    future.cancel()
+                    return
+        except OperationCancelled:
+            return
+        except Exception as e:
+            # Hand reader errors to the consumer, which re-raises them
+            failed = Future()
+            failed.set_exception(e)
+            self._put(pending, (None, failed), stop)
+            return
+
+        if self.rows is None:
+            now = time.perf_counter()
+            self.report.add('excel', now, now, items=0, bytes_read=os.path.getsize(self.config['excel_file']))
+        self.report.mark_peak_rss('excel')
+        self._put(pending, _END_OF_ROWS, stop)
+
+    def _prefetch_stage(self, pending: queue.Queue, ready: queue.Queue, stop: threading.Event,
+                        prefetcher: ImagePrefetcher):
+        """
+        Read-ahead stage: request each probed image in row order (runs in thread)
+
+        Passes the items on unchanged; failed probes are passed on as well,
+        the renderer reports them.
+
+        Args:
+            pending: Queue filled by the reader stage
+            ready: Bounded queue for the renderer, same items and order
+            stop: Set when the consumer stops early
+            prefetcher: Read-ahead buffer
+        """
+        position = 0
+        while not stop.is_set():
+            try:
+                item = pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is not _END_OF_ROWS:
+                future = item[1]
+                try:
+                    record = future.result()
+                except Exception:
+                    pass
+                else:
+                    if not prefetcher.request(record.path, position, stop, record.filename):
+                        future.cancel()
+                        return
+            if not self._put(ready, item, stop):
+                return
+            if item is _END_OF_ROWS:
+                return
+            position += 1
+
+    def _iter_records(self, pending: queue.Queue, result: PipelineResult,
+                      emit: Callable[[Dict[str, Any]], None],
+                      prefetcher: Optional[ImagePrefetcher] = None) -> Iterator[ImageRecord]:
+        """
+        Consume probe results in row order, skipping rows whose image failed
+
+        Args:
+            pending: Queue filled by the reader (or read-ahead) stage
+            result: Result object (errors and counts are updated)
+            emit: Event callback
+            prefetcher: Read-ahead buffer to tell about every item taken
+
+        Yields:
+            ImageRecords for the renderer
+
+        Raises:
+            OperationCancelled: If cancel() was called
+        """
+        while True:
+            self.cancel_token.raise_if_cancelled()
+            try:
+                item = pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _END_OF_ROWS:
+                for stage in ('resolve', 'probe', 'resample'):
+                    self.report.mark_peak_rss(stage)
+                return
+
+            filename, future = item
+            if prefetcher is not None:
+                prefetcher.advance()
+            try:
+                # Time the renderer spends waiting for this image's probe
+                with self.report.span('wait', image=filename):
+                    record = future.result()
+            except (FileNotFoundError, ValueError, OSError) as e:
+                if filename is None:
+                    raise
+                log.warning("⚠ %s", e, extra={'image': filename})
+                result.errors.append((filename, str(e)))
+                emit({'event': 'error', 'filename': filename, 'error': str(e),
+                      'category': categorize_exception(e)})
+                continue
+
+            result.found_count += 1
+            orientation = record.orientation
+            if orientation is not None:
+                result.orientation_counts[orientation] = result.orientation_counts.get(orientation, 0) + 1
+            yield record
+
+    @staticmethod
+    def _chain(first: ImageRecord, rest: Iterator[ImageRecord]) -> Iterator[ImageRecord]:
+        yield first
+        yield from rest
+
+    @staticmethod
+    def _put(pending: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """Put into bounded queue, giving up once stop is set"""
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _drain(pending: queue.Queue):
+        """Cancel and discard all queued probe tasks"""
+        while True:
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _END_OF_ROWS:
+                item[1].cancel()
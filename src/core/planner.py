@@ -0,0 +1,294 @@
+"""
+Document Planner for Pic2Doc
+Dry run: reads rows, probes images and lays out all pages without
+python-docx, then estimates page count, document size and runtime
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cancellation import CancellationToken
+from .config_manager import app_data_path
+from .error_log import categorize_exception
+from .excel_reader import ExcelReader
+from .image_handler import ImageHandler, ImageInfoCache
+from .image_record import ImageRecord
+from .layout import iter_page_layouts
+from ..utils.constants import THROUGHPUT_FILE
+from ..utils.file_utils import write_text_atomic
+
+# Size of a document without images (styles, theme, settings, ...)
+EMPTY_DOCUMENT_BYTES = 36600
+# Compressed XML, relationship and ZIP directory entries per image
+PER_IMAGE_OVERHEAD_BYTES = 250
+
+# Used until a real run has measured the stage on this machine
+DEFAULT_THROUGHPUT = {
+    'render_images_per_second': 50.0,
+    'save_bytes_per_second': 40e6,
+}
+
+
+class ThroughputStats:
+    """
+    Stage throughput measured by previous runs, persisted between runs
+
+    Rates are smoothed (exponential moving average), so one unusually
+    slow or fast run only shifts the estimate part of the way.
+    """
+
+    def __init__(self, path: Optional[str] = None, smoothing: float = 0.5):
+        """
+        Initialize throughput stats (loads the stats file if it exists)
+
+        Args:
+            path: Stats file (defaults to THROUGHPUT_FILE next to the config)
+            smoothing: Weight of a new measurement (0..1)
+        """
+        self.path = path or app_data_path(THROUGHPUT_FILE)
+        self.smoothing = smoothing
+        self.rates: Dict[str, float] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.rates = {key: float(value) for key, value in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def rate(self, name: str) -> Tuple[float, bool]:
+        """
+        Get a stage rate
+
+        Args:
+            name: Rate name (see DEFAULT_THROUGHPUT)
+
+        Returns:
+            Tuple of (rate, measured); measured is False for the default value
+        """
+        if name in self.rates:
+            return self.rates[name], True
+        return DEFAULT_THROUGHPUT[name], False
+
+    def record(self, name: str, amount: float, seconds: float):
+        """
+        Add a measurement
+
+        Args:
+            name: Rate name
+            amount: Processed units (images, bytes, ...)
+            seconds: Time it took
+        """
+        if amount <= 0 or seconds <= 0:
+            return
+        measured = amount / seconds
+        previous = self.rates.get(name)
+        if previous is None:
+            self.rates[name] = measured
+        else:
+            self.rates[name] = previous + self.smoothing * (measured - previous)
+
+    def save(self) -> bool:
+        """
+        Write the stats file atomically (temp file + rename)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            write_text_atomic(self.path, json.dumps(self.rates, indent=4), prefix='.pic2doc_throughput.')
+            return True
+        except OSError:
+            return False
+
+
+class DocumentPlan:
+    """Result of a dry run"""
+
+    def __init__(self, resample_dpi: int):
+        self.rows = 0
+        self.found = 0
+        self.missing: List[str] = []
+        self.ambiguous: Dict[str, List[str]] = {}  # Excel filename -> candidate files
+        self.invalid: List[Tuple[str, str]] = []
+        self.pages = 0
+        self.image_bytes = 0
+        self.estimated_bytes = 0
+        self.resample_dpi = resample_dpi
+        self.estimated_bytes_resampled = 0
+        # stage -> (seconds, measured in this dry run or by earlier runs)
+        self.stage_seconds: Dict[str, Tuple[float, bool]] = {}
+
+    @property
+    def estimated_seconds(self) -> float:
+        """
+        Estimated runtime of the real run
+
+        Probing and rendering overlap in the streaming pipeline, so only
+        the slower of the two counts.
+        """
+        seconds = {stage: value for stage, (value, _measured) in self.stage_seconds.items()}
+        return (seconds.get('excel', 0.0)
+                + max(seconds.get('probe', 0.0), seconds.get('render', 0.0))
+                + seconds.get('save', 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary"""
+        return {
+            'rows': self.rows,
+            'found': self.found,
+            'missing': self.missing,
+            'ambiguous': self.ambiguous,
+            'invalid': [{'filename': filename, 'error': error} for filename, error in self.invalid],
+            'pages': self.pages,
+            'image_bytes': self.image_bytes,
+            'estimated_bytes': self.estimated_bytes,
+            'resample_dpi': self.resample_dpi,
+            'estimated_bytes_resampled': self.estimated_bytes_resampled,
+            'stage_seconds': {stage: {'seconds': seconds, 'measured': measured}
+                              for stage, (seconds, measured) in self.stage_seconds.items()},
+            'estimated_seconds': self.estimated_seconds,
+        }
+
+
+class DocumentPlanner:
+    """
+    Plans a document without creating it
+
+    Reads the Excel rows and probes the images like a real run (using the
+    folder index and image info cache), lays out every page with the same
+    calculations as the document generator, and estimates:
+      - the DOCX size as-is and with images resampled to the target DPI
+        at their placed size
+      - the runtime from the measured Excel and probe stages of this dry
+        run plus the render/save throughput recorded by earlier runs
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        info_cache: Optional[ImageInfoCache] = None,
+        throughput: Optional[ThroughputStats] = None,
+        resample_dpi: int = 150,
+        probe_workers: int = 4,
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        """
+        Initialize planner
+
+        Args:
+            config: Configuration dictionary (see DEFAULT_CONFIG)
+            info_cache: Optional image metadata cache
+            throughput: Render/save throughput of earlier runs (loaded if omitted)
+            resample_dpi: Target resolution for the resampled size estimate
+            probe_workers: Number of threads probing image headers
+            cancel_token: Optional cancellation token
+        """
+        self.config = config
+        self.info_cache = info_cache
+        self.throughput = throughput or ThroughputStats()
+        self.resample_dpi = resample_dpi
+        self.probe_workers = max(1, probe_workers)
+        self.cancel_token = cancel_token or CancellationToken()
+
+    def plan(self, on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> DocumentPlan:
+        """
+        Run the dry run in the calling thread
+
+        Args:
+            on_event: Optional callback receiving 'stage', 'progress' and
+                      'error' events (same format as Pic2DocPipeline)
+
+        Returns:
+            DocumentPlan
+
+        Raises:
+            FileNotFoundError, ValueError: Invalid Excel file or image folder
+            OperationCancelled: If the cancellation token was triggered
+        """
+        emit = on_event or (lambda event: None)
+        plan = DocumentPlan(self.resample_dpi)
+
+        # Excel stage
+        emit({'event': 'stage', 'stage': 'excel'})
+        started = time.perf_counter()
+        rows = ExcelReader().iter_data(
+            self.config['excel_file'],
+            self.config.get('filename_column', 'A'),
+            self.config.get('caption_columns', ['I']),
+            self.config.get('caption_separator', ' - '),
+            cancel_token=self.cancel_token
+        )
+        if self.config.get('test_mode', False):
+            rows = islice(rows, self.config.get('test_image_limit', 10))
+        rows = list(rows)
+        plan.rows = len(rows)
+        plan.stage_seconds['excel'] = (time.perf_counter() - started, True)
+
+        # Locate/probe stage
+        emit({'event': 'stage', 'stage': 'images'})
+        started = time.perf_counter()
+        image_handler = ImageHandler.from_config(self.config, info_cache=self.info_cache)
+        image_handler.refresh_index()
+        smart_layout = self.config.get('smart_layout', False)
+
+        records = []
+        sources = {}  # image path -> (file size, pixel count)
+        with ThreadPoolExecutor(max_workers=self.probe_workers, thread_name_prefix='pic2doc-plan') as executor:
+            probes = executor.map(lambda row: self._probe(image_handler, *row), rows)
+            for (filename, caption), (record, size, error) in zip(rows, probes):
+                if error is not None:
+                    if isinstance(error, FileNotFoundError):
+                        plan.missing.append(filename)
+                    else:
+                        plan.invalid.append((filename, str(error)))
+                    emit({'event': 'error', 'filename': filename, 'error': str(error),
+                          'category': categorize_exception(error)})
+                    continue
+                plan.found += 1
+                sources[record.path] = (size, record.width * record.height)
+                if not smart_layout:
+                    # Laid out with the fallback size, like the real run
+                    record = ImageRecord(filename, caption, record.path)
+                records.append(record)
+                emit({'event': 'progress', 'current': plan.found + len(plan.missing) + len(plan.invalid),
+                      'total': plan.rows, 'filename': filename})
+        self.cancel_token.raise_if_cancelled()
+        plan.ambiguous = dict(image_handler.ambiguous_matches)
+        plan.stage_seconds['probe'] = (time.perf_counter() - started, True)
+
+        # Layout: exact placed size of every image
+        emit({'event': 'stage', 'stage': 'layout'})
+        resampled_bytes = 0
+        for page in iter_page_layouts(records, self.config):
+            plan.pages += 1
+            for record, width, height in page:
+                size, pixels = sources[record.path]
+                target_pixels = (width * self.resample_dpi) * (height * self.resample_dpi)
+                # Compressed size scales roughly with the pixel count
+                resampled_bytes += size * min(1.0, target_pixels / pixels) if pixels else size
+                plan.image_bytes += size
+
+        overhead = EMPTY_DOCUMENT_BYTES + PER_IMAGE_OVERHEAD_BYTES * plan.found
+        plan.estimated_bytes = plan.image_bytes + overhead
+        plan.estimated_bytes_resampled = int(resampled_bytes) + overhead
+
+        # Render/save rates can't be measured without creating the document
+        render_rate, render_measured = self.throughput.rate('render_images_per_second')
+        save_rate, save_measured = self.throughput.rate('save_bytes_per_second')
+        plan.stage_seconds['render'] = (plan.found / render_rate, render_measured)
+        plan.stage_seconds['save'] = (plan.estimated_bytes / save_rate, save_measured)
+
+        return plan
+
+    def _probe(self, image_handler: ImageHandler, filename: str, caption: str):
+        """Probe one image; returns (record, file size, error)"""
+        self.cancel_token.raise_if_cancelled()
+        try:
+            record = ImageRecord(filename, caption, image_handler.get_image_path(filename))
+            image_handler.probe_record(record)
+            return record, os.path.getsize(record.path), None
+        except (FileNotFoundError, ValueError, OSError) as e:
+            return None, 0, e
@@ -0,0 +1,171 @@
+"""
+Image Prefetcher for Pic2Doc
+Reads the next images ahead of the document generator, for image folders
+on network shares where every open has noticeable latency
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+
+from .run_report import RunReport
+
+
+class _Prefetch:
+    """One buffered (or in-flight) read"""
+
+    __slots__ = ('position', 'name', 'future', 'size')
+
+    def __init__(self, position: int, name: str):
+        self.position = position
+        self.name = name
+        self.future = None
+        self.size: Optional[int] = None  # Counted in the byte window once read
+
+
+class ImagePrefetcher:
+    """
+    Read-ahead buffer between the probe stage and the document generator
+
+    The pipeline requests each image in row order as soon as it has been
+    probed; a thread pool opens and reads the file into memory. The
+    embedder then takes the bytes from the buffer instead of opening the
+    file itself, so the per-open latency of SMB/NFS shares overlaps with
+    building the document.
+
+    Two windows bound the buffer: at most `window` images ahead of the
+    renderer, and no new read while `max_bytes` are buffered (unless the
+    renderer is already waiting for that image). Each path is read ahead
+    only once - repeated files are reused by the embedder anyway. Time the
+    renderer spends waiting for a read still in flight is recorded as
+    the 'stall' stage, the reads themselves as 'prefetch'.
+    """
+
+    def __init__(self, window: int = 8, max_bytes: int = 64 * 1024 * 1024, workers: int = 4,
+                 report: Optional[RunReport] = None):
+        """
+        Initialize prefetcher
+
+        Args:
+            window: Maximum number of images read ahead of the renderer
+            max_bytes: Byte budget of the buffer
+            workers: Number of reading threads
+            report: Run report receiving the 'prefetch' and 'stall' stages
+        """
+        self.window = max(1, window)
+        self.max_bytes = max(1, max_bytes)
+        self.report = report or RunReport()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='pic2doc-prefetch')
+        self._entries: Dict[str, _Prefetch] = {}
+        self._seen: Set[str] = set()
+        self._condition = threading.Condition()
+        self._buffered = 0
+        self._pulled = 0
+
+        self.hits = 0    # Images taken from the buffer
+        self.misses = 0  # Images the embedder had to read itself
+
+    def request(self, path: str, position: int, stop: threading.Event, name: Optional[str] = None) -> bool:
+        """
+        Start reading an image once the windows allow it (blocks until then)
+
+        Args:
+            path: Image file
+            position: Position of the image in the renderer's order
+            stop: Set when the run ends early
+            name: Image name for the trace (defaults to the file name)
+
+        Returns:
+            False if stop was set while waiting
+        """
+        with self._condition:
+            if path in self._seen:
+                return True
+            while not self._may_read(position):
+                if stop.is_set():
+                    return False
+                self._condition.wait(0.1)
+            self._seen.add(path)
+            entry = self._entries[path] = _Prefetch(position, name or os.path.basename(path))
+            entry.future = self._executor.submit(self._read, path, entry)
+        return True
+
+    def advance(self):
+        """Tell the prefetcher that the renderer received the next image"""
+        with self._condition:
+            self._pulled += 1
+            self._condition.notify_all()
+
+    def take(self, path: str) -> Optional[Tuple[os.stat_result, bytes]]:
+        """
+        Take a prefetched image out of the buffer
+
+        Waits if its read is still in flight. Buffered images before it
+        were skipped by the renderer and are dropped.
+
+        Args:
+            path: Image file
+
+        Returns:
+            (stat result, file content), or None if the image was not read
+            ahead or reading failed (the caller reads it itself)
+        """
+        with self._condition:
+            entry = self._entries.pop(path, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._release(entry)
+            for stale_path in [p for p, e in self._entries.items() if e.position < entry.position]:
+                stale = self._entries.pop(stale_path)
+                stale.future.cancel()
+                self._release(stale)
+            self._condition.notify_all()
+
+        future = entry.future
+        if not future.done():
+            with self.report.stage('stall', image=entry.name):
+                future.exception()
+        if future.exception() is not None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return future.result()
+
+    def close(self):
+        """Stop reading and drop the buffer"""
+        with self._condition:
+            for entry in self._entries.values():
+                entry.future.cancel()
+            self._entries.clear()
+            self._buffered = 0
+            self._condition.notify_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _may_read(self, position: int) -> bool:
+        """Whether the windows allow reading the image at a position (lock held)"""
+        if position - self._pulled >= self.window:
+            return False
+        # The renderer waits for this image: read it even over budget
+        return self._buffered < self.max_bytes or position <= self._pulled
+
+    def _release(self, entry: _Prefetch):
+        """Remove an entry's bytes from the byte window (lock held)"""
+        if entry.size is not None:
+            self._buffered -= entry.size
+            entry.size = None
+
+    def _read(self, path: str, entry: _Prefetch) -> Tuple[os.stat_result, bytes]:
+        """Open, stat and read one file (runs in a worker thread)"""
+        with self.report.stage('prefetch', image=entry.name) as section:
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                blob = f.read()
+            section['bytes_read'] = len(blob)
+        with self._condition:
+            # Only count it if it was not taken or dropped meanwhile
+            if self._entries.get(path) is entry:
+                entry.size = len(blob)
+                self._buffered += entry.size
+        return stat, blob
@@ -0,0 +1,236 @@
+"""
+Pre-Scan for Pic2Doc
+Reads the Excel file, indexes the image folder and probes image headers
+before a run, so the run itself starts with warm caches
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cancellation import CancellationToken, OperationCancelled
+from .excel_reader import ExcelReader
+from .image_handler import ImageHandler, ImageInfoCache
+
+
+class PreScanResult:
+    """Counts and warm data collected by a pre-scan"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.key = rows_key(config)
+        self.handler_key = ImageHandler.config_key(config)
+        self.rows: Optional[List[Tuple[str, str]]] = None  # Set once all rows were read
+        self.image_handler: Optional[ImageHandler] = None
+        self.row_count = 0
+        self.found_count = 0
+        self.missing_count = 0
+        self.invalid_count = 0
+        self.pages = 0
+        self.state = 'running'  # 'running', 'done', 'cancelled' or 'failed'
+        self.error: Optional[str] = None
+
+    def rows_for(self, config: Dict[str, Any]) -> Optional[List[Tuple[str, str]]]:
+        """
+        Get the pre-read rows if they are valid for a job configuration
+
+        Args:
+            config: Job configuration
+
+        Returns:
+            List of (filename, caption) rows, or None if the Excel file, its
+            columns or the separator differ (or the file changed since)
+        """
+        if self.rows is None or self.key is None or self.key != rows_key(config):
+            return None
+        return self.rows
+
+    def image_handler_for(self, config: Dict[str, Any]) -> Optional[ImageHandler]:
+        """
+        Get the indexed image handler if it is for the job's image folder
+        and filename matching options
+
+        Args:
+            config: Job configuration
+
+        Returns:
+            ImageHandler or None
+        """
+        if self.image_handler is None or ImageHandler.config_key(config) != self.handler_key:
+            return None
+        return self.image_handler
+
+    def to_event(self) -> Dict[str, Any]:
+        """Convert to a 'scan' event dictionary"""
+        return {
+            'event': 'scan',
+            'state': self.state,
+            'rows': self.row_count,
+            'found': self.found_count,
+            'missing': self.missing_count,
+            'invalid': self.invalid_count,
+            'pages': self.pages,
+            'error': self.error,
+        }
+
+
+def rows_key(config: Dict[str, Any]) -> Optional[Tuple]:
+    """
+    Identify the Excel rows a configuration reads
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        Tuple of Excel path, modification time, size and column settings,
+        or None if the Excel file doesn't exist
+    """
+    excel_file = config.get('excel_file')
+    try:
+        stat = os.stat(excel_file)
+    except (OSError, TypeError):
+        return None
+    return (
+        os.path.abspath(excel_file),
+        stat.st_mtime_ns,
+        stat.st_size,
+        config.get('filename_column', 'A'),
+        tuple(config.get('caption_columns', ['I'])),
+        config.get('caption_separator', ' - '),
+    )
+
+
+class PreScanner:
+    """
+    Dry pass over the inputs of a job: rows, image lookup, header probing
+
+    Nothing is rendered. Image infos land in the shared ImageInfoCache and
+    the rows in the result, so a following Pic2DocPipeline run with the same
+    inputs does neither read the workbook nor open an image header again.
+    Progress is reported as 'scan' events (see PreScanResult.to_event).
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        info_cache: Optional[ImageInfoCache] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        probe_workers: int = 4,
+        event_interval: float = 0.1,
+        image_handler: Optional[ImageHandler] = None
+    ):
+        """
+        Initialize pre-scanner
+
+        Args:
+            config: Configuration dictionary (see DEFAULT_CONFIG)
+            info_cache: Cache receiving the probed image infos
+            cancel_token: Optional cancellation token (one is created if omitted)
+            probe_workers: Number of threads probing image headers
+            event_interval: Minimum seconds between intermediate 'scan' events
+            image_handler: Optional handler for the config's image folders to
+                           reuse (its index is refreshed); one is created otherwise
+        """
+        self.config = config
+        self.image_handler = image_handler
+        self.info_cache = info_cache if info_cache is not None else ImageInfoCache()
+        self.cancel_token = cancel_token or CancellationToken()
+        self.probe_workers = max(1, probe_workers)
+        self.event_interval = event_interval
+
+    def run(self, on_event: Optional[Callable[[Dict[str, Any]], None]] = None) -> PreScanResult:
+        """
+        Scan the inputs in the calling thread
+
+        Errors (e.g. a missing Excel file) don't raise; they end the scan
+        with state 'failed'.
+
+        Args:
+            on_event: Optional callback receiving 'scan' events
+
+        Returns:
+            PreScanResult
+        """
+        emit = on_event or (lambda event: None)
+        result = PreScanResult(self.config)
+        last_event = time.monotonic()
+
+        def report(force: bool = False):
+            nonlocal last_event
+            now = time.monotonic()
+            if force or now - last_event >= self.event_interval:
+                last_event = now
+                emit(result.to_event())
+
+        try:
+            # Excel stage - keep all rows, count only those a run would process
+            reader = ExcelReader()
+            rows = []
+            for row in reader.iter_data(
+                self.config['excel_file'],
+                self.config.get('filename_column', 'A'),
+                self.config.get('caption_columns', ['I']),
+                self.config.get('caption_separator', ' - '),
+                cancel_token=self.cancel_token
+            ):
+                rows.append(row)
+                report()
+            result.rows = rows
+            if self.config.get('test_mode', False):
+                rows = list(islice(rows, self.config.get('test_image_limit', 10)))
+            result.row_count = len(rows)
+
+            # Folder index and image lookup
+            image_handler = self.image_handler or ImageHandler.from_config(self.config, info_cache=self.info_cache)
+            image_handler.refresh_index()
+            result.image_handler = image_handler
+
+            found = []
+            for filename, _caption in rows:
+                self.cancel_token.raise_if_cancelled()
+                image_path = image_handler.find_image(filename)
+                if image_path is None:
+                    result.missing_count += 1
+                else:
+                    result.found_count += 1
+                    found.append(filename)
+                self._update_pages(result)
+                report()
+
+            # Header probing (only needed for the smart layout)
+            if self.config.get('smart_layout', False) and found:
+                with ThreadPoolExecutor(max_workers=self.probe_workers,
+                                        thread_name_prefix='pic2doc-prescan') as executor:
+                    for ok in executor.map(lambda name: self._probe(image_handler, name), found):
+                        if not ok:
+                            result.invalid_count += 1
+                            result.found_count -= 1
+                            self._update_pages(result)
+                        report()
+                self.cancel_token.raise_if_cancelled()
+
+            result.state = 'done'
+        except OperationCancelled:
+            result.state = 'cancelled'
+        except Exception as e:
+            result.state = 'failed'
+            result.error = str(e)
+
+        report(force=True)
+        return result
+
+    def _probe(self, image_handler: ImageHandler, filename: str) -> bool:
+        """Probe one image into the cache; False if it is unreadable"""
+        if self.cancel_token.is_cancelled:
+            return True  # Not counted - the scan stops after the map
+        try:
+            image_handler.probe_size(image_handler.get_image_path(filename))
+            return True
+        except (FileNotFoundError, ValueError, OSError):
+            return False
+
+    def _update_pages(self, result: PreScanResult):
+        images_per_page = max(1, int(self.config.get('images_per_page', 3)))
+        result.pages = math.ceil(result.found_count / images_per_page)
@@ -0,0 +1,439 @@
+"""
+Probe Workers for Pic2Doc
+Probes images in supervised child processes with time and memory limits,
+so a single pathological file cannot stall or crash a run
+"""
+
+import atexit
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .error_log import ImageRejectedError, ProbeWorkerError
+from .tracing import TraceRecorder
+from ..utils.log import get_logger
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+log = get_logger('images')
+
+# Seconds a new child may take to import the image libraries
+STARTUP_TIMEOUT = 60.0
+# Exit code of a child that ran out of memory outside a probe
+_EXIT_MEMORY = 3
+
+
+class _Worker:
+    """One child process and the parent's end of its pipe"""
+
+    __slots__ = ('process', 'conn')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+
+
+class ProbeWorkerPool:
+    """
+    Runs image probes in a pool of child processes
+
+    Every probe is sent to an idle child over a pipe. If no answer arrives
+    within `timeout` seconds, the child is killed and replaced and the
+    probe fails with ImageRejectedError. On POSIX each child's address
+    space is limited to `max_memory_mb` (RLIMIT_AS); a probe that runs
+    out of memory fails with ImageRejectedError as well. A child that
+    dies for any other reason (e.g. a decoder crash) is replaced and the
+    probe fails with ProbeWorkerError. Either way the caller records the
+    image like any damaged one and the run goes on.
+
+    Children are spawned on demand, up to `workers`, and then kept for
+    all further probes; a probe costs one pipe round trip on top of the
+    header read. Children end with the process that started them, even
+    if it is killed. probe() is thread-safe and meant to be called from
+    the pipeline's probe threads.
+
+    Children are started with the 'spawn' method, which imports the main
+    module again: a script that uses the pool must guard its entry point
+    with `if __name__ == '__main__':`. Otherwise the children fail to
+    start and every probe fails with ProbeWorkerError.
+    """
+
+    def __init__(self, workers: int = 2, timeout: float = 10.0, max_memory_mb: int = 1024,
+                 max_pixels: Optional[int] = None):
+        """
+        Initialize pool (no process is started yet)
+
+        Args:
+            workers: Maximum number of child processes
+            timeout: Seconds a single probe may take
+            max_memory_mb: Address space limit per child (0 = none)
+            max_pixels: Images with more pixels are rejected by their header
+        """
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_memory_mb = max_memory_mb
+        self.max_pixels = max_pixels
+        self._context = multiprocessing.get_context('spawn')
+        self._idle: List[_Worker] = []
+        self._all: Set[_Worker] = set()
+        self._count = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._startup_error: Optional[ProbeWorkerError] = None
+        self._users = 0  # Holders of this pool (see acquire_probe_pool)
+
+        self.killed = 0  # Children killed for exceeding a limit
+
+    def settings(self) -> Tuple:
+        """Comparable form of the limits (for reusing a pool)"""
+        return (self.workers, self.timeout, self.max_memory_mb, self.max_pixels)
+
+    def probe(self, image_path: str, tracer: Optional[TraceRecorder] = None) -> Tuple[int, int]:
+        """
+        Read an image's size in a child process
+
+        Args:
+            image_path: Path to image file
+            tracer: Optional trace recorder; the round trip to the child is
+                    recorded as a 'probe_worker' span tagged with its pid
+
+        Returns:
+            Tuple of (width, height) in pixels
+
+        Raises:
+            ImageRejectedError: If the image exceeds a limit (pixels, time or memory)
+            ProbeWorkerError: If the child could not be started or crashed
+            ValueError: If the image cannot be read or is corrupted
+        """
+        worker = self._acquire()
+        worker_id = worker.process.pid
+        start = time.perf_counter()
+        try:
+            try:
+                worker.conn.send(image_path)
+            except OSError:
+                # The child died while idle; not this image's fault
+                self._stop(worker)
+                worker = self._acquire()
+                worker_id = worker.process.pid
+                start = time.perf_counter()
+                worker.conn.send(image_path)
+            if not worker.conn.poll(self.timeout):
+                self._stop(worker, exceeded=True)
+                worker = None
+                raise ImageRejectedError(
+                    f"Zeitüberschreitung: Prüfen dauerte länger als {self.timeout:g} s, abgebrochen"
+                )
+            try:
+                reply = worker.conn.recv()
+            except (EOFError, OSError):
+                exitcode = self._stop(worker, exited=True)
+                worker = None
+                raise self._crash_error(exitcode)
+        finally:
+            if tracer is not None:
+                tracer.complete('probe_worker', start, time.perf_counter(),
+                                {'image': image_path, 'worker': worker_id})
+            if worker is not None:
+                self._release(worker)
+
+        status, *values = reply
+        if status == 'ok':
+            return values[0], values[1]
+        if status == 'rejected':
+            raise ImageRejectedError(values[0])
+        raise ValueError(values[0])
+
+    def close(self):
+        """Stop all child processes (busy ones are killed)"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            busy = self._all.difference(idle)
+            self._all.clear()
+            self._condition.notify_all()
+        for worker in idle:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in busy:
+            worker.process.kill()
+        for worker in idle + list(busy):
+            worker.process.join(1)
+            if worker.process.is_alive():
+                worker.process.kill()
+                worker.process.join()
+            worker.conn.close()
+
+    def _crash_error(self, exitcode: Optional[int]) -> Exception:
+        """Error for a child that died during a probe, by its exit status"""
+        if self._closed:
+            return ProbeWorkerError("Prüfprozesse wurden beendet")
+        if exitcode == _EXIT_MEMORY:
+            return ImageRejectedError(f"Speichergrenze von {self.max_memory_mb} MB beim Prüfen überschritten")
+        if exitcode == -getattr(signal, 'SIGKILL', 9):
+            # Nobody else kills the child: the system did, for lack of memory
+            return ImageRejectedError("Prüfprozess vom System beendet (SIGKILL), vermutlich Speichermangel")
+        return ProbeWorkerError(f"Prüfprozess beim Prüfen abgestürzt ({_describe_exit(exitcode)})")
+
+    def _acquire(self) -> _Worker:
+        """Take an idle child, spawning one if the pool is not full yet"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise ProbeWorkerError("Prüfprozesse wurden beendet")
+                if self._startup_error is not None:
+                    raise ProbeWorkerError(str(self._startup_error))
+                if self._idle:
+                    return self._idle.pop()
+                if self._count < self.workers:
+                    self._count += 1
+                    break
+                self._condition.wait()
+        try:
+            worker = self._spawn()
+        except BaseException:
+            with self._condition:
+                self._count -= 1
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            if not self._closed:
+                self._all.add(worker)
+                return worker
+        self._stop(worker)
+        raise ProbeWorkerError("Prüfprozesse wurden beendet")
+
+    def _release(self, worker: _Worker):
+        """Return a child to the idle list"""
+        with self._condition:
+            if not self._closed:
+                self._idle.append(worker)
+                self._condition.notify()
+                return
+        self._stop(worker)
+
+    def _spawn(self) -> _Worker:
+        """Start a child process and wait until it is ready"""
+        conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.max_memory_mb, self.max_pixels),
+            name='pic2doc-probe-worker',
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, conn)
+
+        reply = None
+        try:
+            if conn.poll(STARTUP_TIMEOUT):
+                reply = conn.recv()
+        except (EOFError, OSError):
+            pass
+        if reply == ('ready',):
+            return worker
+
+        exitcode = self._stop(worker, exited=True, counted=False)
+        if reply is not None and reply[0] == 'failed':
+            message = reply[1]
+        elif exitcode is None:
+            message = f"antwortet nicht innerhalb von {STARTUP_TIMEOUT:g} s"
+        else:
+            message = (f"{_describe_exit(exitcode)}; Skripte, die Pic2Doc aufrufen, brauchen einen "
+                       f"\"if __name__ == '__main__':\"-Block")
+        error = ProbeWorkerError(f"Prüfprozess konnte nicht gestartet werden: {message}")
+        log.warning("⚠ %s", error)
+        if exitcode is not None:
+            # Starting again would fail the same way (and import the main module again)
+            self._startup_error = error
+        raise error
+
+    def _stop(self, worker: _Worker, exceeded: bool = False, exited: bool = False,
+              counted: bool = True) -> Optional[int]:
+        """
+        Stop a child and free its slot
+
+        Args:
+            worker: Child to stop
+            exceeded: It was killed for exceeding a limit
+            exited: Its pipe was closed, so it is exiting by itself; give it
+                    a moment to report its exit status
+            counted: It holds a slot of the pool
+
+        Returns:
+            Exit status if the child ended by itself, None if it was killed
+        """
+        if exited:
+            worker.process.join(1)
+        exitcode = worker.process.exitcode
+        if exitcode is None:
+            worker.process.kill()
+            worker.process.join()
+        worker.conn.close()
+        if counted:
+            with self._condition:
+                self._all.discard(worker)
+                self._count -= 1
+                if exceeded:
+                    self.killed += 1
+                self._condition.notify()
+        return exitcode
+
+
+def _describe_exit(exitcode: Optional[int]) -> str:
+    """Readable exit status of a child process"""
+    if exitcode is None:
+        return "Ursache unbekannt"
+    if exitcode < 0:
+        try:
+            return f"Signal {signal.Signals(-exitcode).name}"
+        except ValueError:
+            return f"Signal {-exitcode}"
+    return f"Exit-Code {exitcode}"
+
+
+# One pool per limit settings; a pool is closed once it has no users and
+# other settings were requested after it
+_pools: Dict[Tuple, ProbeWorkerPool] = {}
+_latest_settings: Optional[Tuple] = None
+_pools_lock = threading.Lock()
+
+
+def acquire_probe_pool(workers: int = 2, timeout: float = 10.0, max_memory_mb: int = 1024,
+                       max_pixels: Optional[int] = None) -> Optional[ProbeWorkerPool]:
+    """
+    Get a process-wide probe pool for these limits
+
+    Pools are shared by everyone using the same limits, so repeated runs
+    (watch mode, pre-scan and job, job server) reuse their children. Every
+    pool returned must be handed back with release_probe_pool(); a pool is
+    never closed while it has users, so concurrent jobs with different
+    limits do not interfere. The pool of the most recently requested limits
+    stays warm when it is released; idle pools of other limits are closed.
+
+    Args:
+        workers: Maximum number of child processes
+        timeout: Seconds a single probe may take
+        max_memory_mb: Address space limit per child (0 = none)
+        max_pixels: Images with more pixels are rejected by their header
+
+    Returns:
+        ProbeWorkerPool, or None in a daemonic process (which cannot start
+        child processes; probes then run in-process)
+    """
+    global _latest_settings
+    if multiprocessing.current_process().daemon:
+        return None
+    settings = (max(1, workers), timeout, max_memory_mb, max_pixels)
+    with _pools_lock:
+        pool = _pools.get(settings)
+        if pool is None:
+            pool = _pools[settings] = ProbeWorkerPool(*settings)
+        pool._users += 1
+        _latest_settings = settings
+        unused = [key for key, other in _pools.items() if other._users == 0]
+        unused_pools = [_pools.pop(key) for key in unused]
+    for unused_pool in unused_pools:
+        unused_pool.close()
+    return pool
+
+
+def release_probe_pool(pool: ProbeWorkerPool):
+    """
+    Hand back a pool obtained from acquire_probe_pool()
+
+    Args:
+        pool: Pool no longer used by the caller
+    """
+    with _pools_lock:
+        pool._users -= 1
+        settings = pool.settings()
+        unused = pool._users <= 0 and settings != _latest_settings and _pools.get(settings) is pool
+        if unused:
+            del _pools[settings]
+    if unused:
+        pool.close()
+
+
+@atexit.register
+def close_probe_pools():
+    """Stop the children of all pools (at exit, or when a job process ends)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _exit_with_parent():
+    """End this child as soon as the process that started it is gone"""
+    parent = multiprocessing.parent_process()
+    if parent is None:
+        return
+
+    def watch():
+        multiprocessing.connection.wait([parent.sentinel])
+        os._exit(1)
+
+    threading.Thread(target=watch, name='pic2doc-parent-watch', daemon=True).start()
+
+
+def _worker_main(conn, max_memory_mb: int, max_pixels: Optional[int]):
+    """
+    Child process entry point: probe the paths received until None arrives
+
+    Args:
+        conn: Pipe end sending ('ready',) (or ('failed', reason)) once, then
+              receiving paths and sending ('ok', width, height),
+              ('rejected', reason) or ('error', message)
+        max_memory_mb: Address space limit (0 = none)
+        max_pixels: Images with more pixels are rejected
+    """
+    # Started before the memory limit, which also covers thread stacks.
+    # A killed parent cannot stop its daemonic children itself.
+    _exit_with_parent()
+
+    if resource is not None and max_memory_mb:
+        limit = max_memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass  # Limit not supported (or above the hard limit)
+
+    try:
+        from .image_handler import read_image_size
+    except MemoryError:
+        conn.send(('failed', f"Speichergrenze von {max_memory_mb} MB reicht nicht zum Laden der Bildbibliothek"))
+        return
+    conn.send(('ready',))
+
+    try:
+        while True:
+            try:
+                image_path = conn.recv()
+            except (EOFError, OSError):
+                return
+            if image_path is None:
+                return
+            try:
+                width, height = read_image_size(image_path, max_pixels)
+                reply = ('ok', width, height)
+            except MemoryError:
+                reply = ('rejected', f"Speichergrenze von {max_memory_mb} MB beim Prüfen überschritten")
+            except ImageRejectedError as e:
+                reply = ('rejected', str(e))
+            except Exception as e:
+                reply = ('error', str(e))
+            conn.send(reply)
+    except MemoryError:
+        os._exit(_EXIT_MEMORY)
@@ -0,0 +1,393 @@
+"""
+Process Job Runner for Pic2Doc
+Runs a pipeline job in a child process so the caller's interpreter (e.g.
+the Tk mainloop) never competes with the CPU-heavy work for the GIL
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..utils.constants import TERMINAL_EVENTS
+from ..utils.file_utils import partial_output_path
+
+# This module is imported by the GUI before the heavy libraries are loaded;
+# the pipeline itself is only imported inside the child process.
+
+
+class ProcessJobRunner:
+    """
+    Runs Pic2DocPipeline jobs in a child process, one at a time
+
+    The child sends pipeline events back over a queue. Progress events are
+    coalesced and error events batched in the child, so the queue carries
+    at most a few messages per poll interval. Cancellation first asks the
+    child to stop cooperatively and kills it if it does not stop within
+    the grace period; a crash of the child (e.g. a decoder segfault on a
+    corrupt image) is reported as a 'failed' event.
+
+    The child can be spawned ahead of time with spawn(); it then imports
+    the heavy libraries while idle and waits for its job configuration.
+    While it waits, prescan() lets it read the Excel file, index the image
+    folder and probe headers; the job then reuses the warm rows, index and
+    image info cache if its inputs are unchanged. A new pre-scan or the job
+    supersedes a running pre-scan.
+
+    After a job has finished, the child waits for the next job or pre-scan
+    and keeps its caches: the image info cache, the SHA1 digests of
+    embedded files and the indexed image handler (with its probe workers)
+    while the image folders and options stay the same. Watch-mode rebuilds
+    therefore only read what changed, like the CLI's watch mode. A child
+    that was killed or crashed is replaced by a new one on the next start.
+    """
+
+    def __init__(self, flush_interval: float = 0.05, kill_grace_seconds: float = 3.0):
+        """
+        Initialize job runner
+
+        Args:
+            flush_interval: Minimum seconds between progress messages from the child
+            kill_grace_seconds: Time a cancelled child gets before it is killed
+        """
+        self.config: Dict[str, Any] = {}
+        self.flush_interval = flush_interval
+        self.kill_grace_seconds = kill_grace_seconds
+
+        # 'spawn' works the same on macOS, Windows, Linux and in frozen bundles
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._running = False  # A job was started and has not reported its end yet
+        self._cancel_requested_at: Optional[float] = None
+        self._finished = False
+        self.jobs_run = 0  # Jobs started in the current child process
+
+    def spawn(self):
+        """Start the (idle) child process so it can load the libraries in advance"""
+        if self._process is not None and not self._process.is_alive():
+            # Killed or crashed: its queues may be unusable, start over
+            self._process = None
+        if self._process is None:
+            self._jobs = self._context.Queue()
+            self._events = self._context.Queue()
+            self._cancel_event = self._context.Event()
+            # Incremented to supersede the running pre-scan
+            self._scan_generation = self._context.Value('i', 0)
+            self.jobs_run = 0
+            self._process = self._context.Process(
+                target=_child_main,
+                args=(self._jobs, self._events, self._cancel_event, self._scan_generation,
+                      self.flush_interval),
+                name='pic2doc-job',
+                daemon=True
+            )
+            self._process.start()
+
+    def prescan(self, config: Dict[str, Any]) -> int:
+        """
+        Pre-scan the inputs of an upcoming job in the idle child
+
+        Progress arrives as 'scan' events from poll_events(), tagged with
+        the returned 'scan_id'. A pre-scan that is still running is cancelled.
+
+        Args:
+            config: Configuration dictionary the job will probably use
+
+        Returns:
+            Scan id of this pre-scan
+        """
+        if self._running:
+            raise RuntimeError("Vorab-Prüfung nur zwischen Jobs möglich")
+        self.spawn()
+        generation = self._supersede_scan()
+        self._jobs.put(('scan', config, generation))
+        return generation
+
+    def start(self, config: Dict[str, Any], plan_only: bool = False):
+        """
+        Run a job in the child process (spawning it if necessary)
+
+        Jobs run one at a time: the next one can be started once the
+        previous one returned its terminal event from poll_events().
+
+        Args:
+            config: Configuration dictionary for the pipeline
+            plan_only: Only run the DocumentPlanner; the 'done' event then
+                       carries the plan under 'plan'
+        """
+        if self._running:
+            raise RuntimeError("Es läuft bereits ein Job")
+        self.spawn()
+        self._running = True
+        self._finished = False
+        self._cancel_requested_at = None
+        self._cancel_event.clear()
+        self.config = config
+        self.jobs_run += 1
+        self._supersede_scan()
+        self._jobs.put(('plan' if plan_only else 'job', config, None))
+
+    @property
+    def alive(self) -> bool:
+        """True while the child process runs (also while it waits for a job)"""
+        return self._process is not None and self._process.is_alive()
+
+    def shutdown(self):
+        """Stop the child process (idle or running) without waiting for results"""
+        if self._process is not None and self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+            if self._running:
+                self._remove_partial_output()
+
+    def cancel(self):
+        """Ask the child to stop; it is killed if it ignores the request"""
+        if self._cancel_requested_at is None:
+            self._cancel_requested_at = time.monotonic()
+            self._cancel_event.set()
+
+    @property
+    def finished(self) -> bool:
+        """True once the last job's terminal event was returned by poll_events()"""
+        return self._finished
+
+    def poll_events(self) -> List[Dict[str, Any]]:
+        """
+        Drain all pending events without blocking
+
+        While a job runs, this also enforces the cancellation grace period
+        and detects a child that died without reporting a result.
+
+        Returns:
+            List of event dictionaries (may end with a terminal event)
+        """
+        events = []
+        if self._process is None:
+            return events
+
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            events.append(event)
+            if event['event'] in TERMINAL_EVENTS:
+                self._finish()
+                return events
+
+        if not self._running:
+            return events
+
+        process = self._process
+        if process is None:
+            return events
+
+        if (self._cancel_requested_at is not None and process.is_alive()
+                and time.monotonic() - self._cancel_requested_at > self.kill_grace_seconds):
+            process.kill()
+            process.join()
+            self._remove_partial_output()
+            events.append(self._cancelled_event())
+            self._finish()
+        elif not process.is_alive():
+            # Give messages flushed right before exit a last chance to arrive
+            try:
+                event = self._events.get(timeout=0.2)
+            except queue.Empty:
+                event = None
+            if event is not None:
+                events.append(event)
+                if event['event'] in TERMINAL_EVENTS:
+                    self._finish()
+                    return events
+                return events
+
+            self._remove_partial_output()
+            if self._cancel_requested_at is not None:
+                events.append(self._cancelled_event())
+            else:
+                events.append({'event': 'failed',
+                               'error': f"Verarbeitung unerwartet beendet (Exit-Code {process.exitcode})"})
+            self._finish()
+
+        return events
+
+    def _supersede_scan(self) -> int:
+        """Cancel the running pre-scan; returns the generation for the next one"""
+        with self._scan_generation.get_lock():
+            self._scan_generation.value += 1
+            return self._scan_generation.value
+
+    def _cancelled_event(self) -> Dict[str, Any]:
+        """Terminal event for a child that was stopped without reporting"""
+        return {'event': 'cancelled', 'output_file': self.config.get('output_file'),
+                'rows': 0, 'found': 0, 'processed': 0, 'errors': []}
+
+    def _finish(self):
+        self._running = False
+        self._finished = True
+
+    def _remove_partial_output(self):
+        """Delete the temporary output of a killed or crashed child"""
+        output_file = self.config.get('output_file')
+        if not output_file:
+            return
+        try:
+            partial_output_path(output_file).unlink()
+        except OSError:
+            pass
+
+
+class _ScanGeneration:
+    """Event-like view on the shared generation counter: set once superseded"""
+
+    def __init__(self, counter, generation: int):
+        self._counter = counter
+        self._generation = generation
+
+    def set(self):
+        with self._counter.get_lock():
+            self._counter.value += 1
+
+    def is_set(self) -> bool:
+        return self._counter.value != self._generation
+
+
+class _ChildEventForwarder:
+    """Forwards pipeline events from the child, coalescing progress and batching errors"""
+
+    def __init__(self, events, flush_interval: float):
+        self._events = events
+        self._flush_interval = flush_interval
+        self._pending_progress = None
+        self._pending_errors = []
+        self._last_flush = 0.0
+
+    def __call__(self, event: Dict[str, Any]):
+        kind = event['event']
+        if kind == 'progress' or (kind == 'scan' and event['state'] == 'running'):
+            self._pending_progress = event
+        elif kind == 'error':
+            self._pending_errors.append((event['filename'], event['error'], event.get('category')))
+        else:
+            self.flush()
+            self._events.put(event)
+            return
+
+        now = time.monotonic()
+        if now - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if self._pending_errors:
+            self._events.put({'event': 'errors', 'items': self._pending_errors})
+            self._pending_errors = []
+        if self._pending_progress is not None:
+            self._events.put(self._pending_progress)
+            self._pending_progress = None
+
+
+def _close_probes_on_cancel(cancel_event, finished: threading.Event,
+                            close_probe_pools: Callable[[], None]):
+    """Stop the probe workers if the job is cancelled before it finishes (runs in a thread of the child)"""
+    while not finished.is_set():
+        if cancel_event.wait(0.1):
+            close_probe_pools()
+            return
+
+
+def _child_main(jobs, events, cancel_event, scan_generation, flush_interval: float):
+    """
+    Child process entry point: load libraries, then pre-scan or run jobs on request
+
+    Args:
+        jobs: multiprocessing queue delivering ('scan' | 'job' | 'plan', config, generation)
+        events: multiprocessing queue for event dictionaries
+        cancel_event: multiprocessing event set by the parent to cancel the job
+        scan_generation: Shared counter the parent increments to supersede a pre-scan
+        flush_interval: Minimum seconds between progress messages
+    """
+    # Allows the image handler to start its probe worker processes. They
+    # are kept between jobs, stopped when a job is cancelled (see below)
+    # and, should this process be killed, notice it and exit themselves
+    # (see probe_workers).
+    multiprocessing.current_process().daemon = False
+
+    # Imported before the job arrives, so a pre-spawned child is ready to go
+    from .cancellation import CancellationToken, OperationCancelled
+    from .image_handler import ImageHandler, ImageInfoCache
+    from .picture_embedder import DigestCache
+    from .pipeline import Pic2DocPipeline
+    from .planner import DocumentPlanner, ThroughputStats
+    from .prescan import PreScanner
+    from .probe_workers import close_probe_pools
+
+    # Kept for all jobs of this process
+    info_cache = ImageInfoCache()
+    digest_cache = DigestCache()
+    # Indexed image handler (with its probe workers) of the last job or
+    # pre-scan, reused while the image folders and options stay the same
+    handler = None
+    handler_key = None
+    scan = None
+    forward = _ChildEventForwarder(events, flush_interval)
+    cancel_token = CancellationToken(cancel_event)  # The parent clears the event for every job
+
+    def keep_handler(config, image_handler):
+        nonlocal handler, handler_key
+        if handler is not None and handler is not image_handler:
+            handler.close()
+        handler, handler_key = image_handler, ImageHandler.config_key(config)
+
+    def kept_handler(config):
+        return handler if handler is not None and ImageHandler.config_key(config) == handler_key else None
+
+    while True:
+        kind, config, generation = jobs.get()
+        if kind == 'scan':
+            token = CancellationToken(_ScanGeneration(scan_generation, generation))
+            scanner = PreScanner(config, info_cache=info_cache, cancel_token=token,
+                                 image_handler=kept_handler(config))
+            scan = scanner.run(on_event=lambda event, scan_id=generation: forward(dict(event, scan_id=scan_id)))
+            if scan.image_handler is not None:
+                keep_handler(config, scan.image_handler)
+            continue
+
+        finished = threading.Event()
+        # A cancelled job must not wait for probes that hang: kill them right away
+        threading.Thread(target=_close_probes_on_cancel, args=(cancel_event, finished, close_probe_pools),
+                         name='pic2doc-cancel-probes', daemon=True).start()
+        try:
+            if kind == 'plan':
+                planner = DocumentPlanner(config, info_cache=info_cache, cancel_token=cancel_token)
+                plan = planner.plan(on_event=forward)
+                forward({'event': 'done', 'plan': plan.to_dict()})
+            else:
+                image_handler = kept_handler(config) or ImageHandler.from_config(config, info_cache=info_cache)
+                keep_handler(config, image_handler)
+                pipeline = Pic2DocPipeline(
+                    config,
+                    image_handler=image_handler,
+                    info_cache=info_cache,
+                    cancel_token=cancel_token,
+                    rows=scan.rows_for(config) if scan else None,
+                    throughput=ThroughputStats(),
+                    digest_cache=digest_cache
+                )
+                pipeline.run(on_event=forward)
+        except OperationCancelled:
+            forward({'event': 'cancelled'})
+        except Exception as e:
+            forward.flush()
+            events.put({'event': 'failed', 'error': str(e)})
+        finally:
+            finished.set()
+            scan = None  # Its rows were for this job
+            if cancel_event.is_set():
+                # The probe workers were stopped: the next job starts new ones
+                close_probe_pools()
+                if handler is not None:
+                    handler.close()
+                handler = handler_key = None
@@ -0,0 +1,96 @@
+"""
+Progress Channel for Pic2Doc
+Lets a worker publish progress at near-zero cost while a UI polls the
+latest state on its own timer
+"""
+
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+
+class ProgressSnapshot:
+    """Progress state as seen by the poller"""
+
+    def __init__(self, current: int, total: int, filename: str,
+                 rate: Optional[float], eta_seconds: Optional[float]):
+        self.current = current
+        self.total = total
+        self.filename = filename
+        self.rate = rate                  # images per second, None until measurable
+        self.eta_seconds = eta_seconds    # None until measurable
+
+    @property
+    def fraction(self) -> float:
+        """Completed fraction between 0 and 1"""
+        return self.current / self.total if self.total > 0 else 0.0
+
+
+class ProgressChannel:
+    """
+    Latest-value slot between one worker and one poller
+
+    publish() only replaces a tuple reference (atomic, no lock, no UI
+    callback), so the worker's per-image cost is negligible no matter how
+    fast images are processed. The poller calls poll() on a fixed timer
+    and gets at most one snapshot per tick, with throughput measured over
+    a sliding time window.
+    """
+
+    def __init__(self, rate_window_seconds: float = 5.0):
+        """
+        Initialize progress channel
+
+        Args:
+            rate_window_seconds: Time window for the throughput estimate
+        """
+        self.rate_window_seconds = rate_window_seconds
+        self._latest: Optional[Tuple[int, int, str, float]] = None
+        self._last_polled = None
+        self._samples = deque()
+
+    def reset(self):
+        """Forget all progress (call before starting a new run)"""
+        self._latest = None
+        self._last_polled = None
+        self._samples.clear()
+
+    def publish(self, current: int, total: int, filename: str):
+        """
+        Publish progress (worker side, safe to call for every image)
+
+        Args:
+            current: Number of processed items
+            total: Expected total number of items
+            filename: Item currently processed
+        """
+        self._latest = (current, total, filename, time.monotonic())
+
+    def poll(self) -> Optional[ProgressSnapshot]:
+        """
+        Get the latest progress if it changed since the last poll (poller side)
+
+        Returns:
+            ProgressSnapshot, or None if nothing new was published
+        """
+        latest = self._latest
+        if latest is None or latest is self._last_polled:
+            return None
+        self._last_polled = latest
+
+        current, total, filename, timestamp = latest
+
+        # Sliding window of (timestamp, current) samples for the rate
+        self._samples.append((timestamp, current))
+        while len(self._samples) > 2 and timestamp - self._samples[0][0] > self.rate_window_seconds:
+            self._samples.popleft()
+
+        rate = None
+        eta_seconds = None
+        first_time, first_count = self._samples[0]
+        if timestamp > first_time and current > first_count:
+            rate = (current - first_count) / (timestamp - first_time)
+            eta_seconds = max(0, total - current) / rate
+
+        return ProgressSnapshot(current, total, filename, rate, eta_seconds)
+
@@ -0,0 +1,323 @@
+"""
+Run Report for Pic2Doc
+Per-stage wall time, CPU time, I/O bytes, item counts and peak memory
+"""
+
+import json
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .tracing import TraceRecorder
+from ..utils.formatting import format_size
+
+# Stages in pipeline order (the report lists them in this order)
+STAGES = ('excel', 'resolve', 'probe', 'resample', 'prefetch', 'layout', 'xml', 'stall', 'save')
+
+STAGE_LABELS = {
+    'excel': "Excel lesen",
+    'resolve': "Bilder suchen",
+    'probe': "Bilder prüfen",
+    'resample': "Verkleinern",
+    'prefetch': "Vorablesen",
+    'layout': "Layout",
+    'xml': "XML aufbauen",
+    'stall': "Warten (Lesen)",
+    'save': "Speichern",
+}
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident memory of this process so far
+
+    Returns:
+        Bytes, or None where the resource module is unavailable (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class StageStats:
+    """Accumulated measurements of one stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0   # Sum over all threads
+        self.cpu_seconds = 0.0    # Thread CPU time, summed over all threads
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+        self.peak_rss: Optional[int] = None
+
+    @property
+    def wall_seconds(self) -> float:
+        """Time from the first start to the last end of the stage"""
+        if self.first_start is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'wall_seconds': round(self.wall_seconds, 6),
+            'busy_seconds': round(self.busy_seconds, 6),
+            'cpu_seconds': round(self.cpu_seconds, 6),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'peak_rss_bytes': self.peak_rss,
+        }
+
+
+class RunReport:
+    """
+    Collects per-stage measurements of one run (thread-safe)
+
+    Stages overlap in the streaming pipeline and probing runs on several
+    threads, so each stage reports both its wall time (first start to last
+    end) and its busy time (sum of all measured sections). CPU time is the
+    CPU time of the measuring thread, summed.
+
+    With a tracer attached, every measured section is also recorded as a
+    span (see TraceRecorder), which shows the per-image timeline that the
+    aggregated numbers hide.
+    """
+
+    def __init__(self, tracer: Optional[TraceRecorder] = None):
+        """
+        Initialize empty report
+
+        Args:
+            tracer: Optional trace recorder receiving a span per section
+        """
+        self.tracer = tracer
+        self._stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.finished_seconds: Optional[float] = None
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str, items: int = 1, bytes_read: int = 0,
+              image: Optional[str] = None, span: Optional[str] = None):
+        """
+        Measure one section of a stage
+
+        Args:
+            name: Stage name (see STAGES)
+            items: Number of items processed in this section
+            bytes_read: Bytes read in this section, if known up front
+            image: Image the section works on (shown in the trace)
+            span: Trace span name (defaults to the stage name)
+
+        Yields:
+            Dict where the section can put 'bytes_read'/'bytes_written'/'items'
+        """
+        extra = {'items': items, 'bytes_read': bytes_read, 'bytes_written': 0}
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield extra
+        finally:
+            end_wall = time.perf_counter()
+            self.add(name, start_wall, end_wall, time.thread_time() - start_cpu, **extra)
+            if self.tracer is not None:
+                self.tracer.complete(span or name, start_wall, end_wall,
+                                     {'image': image} if image is not None else None)
+
+    @contextmanager
+    def span(self, name: str, image: Optional[str] = None):
+        """
+        Record a trace span that is not part of any stage (e.g. waiting)
+
+        Does nothing without a tracer.
+
+        Args:
+            name: Span name
+            image: Image the span belongs to
+        """
+        if self.tracer is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tracer.complete(name, start, time.perf_counter(),
+                                 {'image': image} if image is not None else None)
+
+    def add(self, name: str, start: float, end: float, cpu_seconds: float = 0.0,
+            items: int = 1, bytes_read: int = 0, bytes_written: int = 0):
+        """
+        Add a measured section
+
+        Args:
+            name: Stage name
+            start: perf_counter() at the start of the section
+            end: perf_counter() at the end of the section
+            cpu_seconds: CPU time used by the section
+            items: Number of items processed
+            bytes_read: Bytes read
+            bytes_written: Bytes written
+        """
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = StageStats(name)
+            stats.items += items
+            stats.busy_seconds += end - start
+            stats.cpu_seconds += cpu_seconds
+            stats.bytes_read += bytes_read
+            stats.bytes_written += bytes_written
+            if stats.first_start is None or start < stats.first_start:
+                stats.first_start = start
+            if stats.last_end is None or end > stats.last_end:
+                stats.last_end = end
+
+    def iter_stage(self, name: str, iterable: Iterable) -> Iterator:
+        """
+        Measure the time spent producing each item of an iterable
+
+        The trace gets a single span for the whole iteration rather than
+        one per item.
+
+        Args:
+            name: Stage name
+            iterable: Source iterable (e.g. the Excel row stream)
+
+        Yields:
+            The items of iterable
+        """
+        iterator = iter(iterable)
+        first_start = time.perf_counter()
+        try:
+            while True:
+                start_wall = time.perf_counter()
+                start_cpu = time.thread_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    self.add(name, start_wall, time.perf_counter(), time.thread_time() - start_cpu, items=0)
+                    return
+                self.add(name, start_wall, time.perf_counter(), time.thread_time() - start_cpu)
+                yield item
+        finally:
+            if self.tracer is not None:
+                self.tracer.complete(name, first_start, time.perf_counter())
+
+    def mark_peak_rss(self, name: str):
+        """Record the process's peak memory at the end of a stage"""
+        peak = peak_rss_bytes()
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is not None:
+                stats.peak_rss = peak
+
+    def set_count(self, name: str, value: int):
+        """
+        Store a result count (e.g. 'deduplicated')
+
+        Args:
+            name: Count name
+            value: Count
+        """
+        with self._lock:
+            self.counts[name] = value
+
+    def finish(self, **counts: int):
+        """
+        Stop the clock and store result counts
+
+        Args:
+            **counts: Item counts of the run (rows, found, processed, ...)
+        """
+        self.finished_seconds = time.perf_counter() - self._started
+        self.counts.update(counts)
+
+    def stages(self) -> List[StageStats]:
+        """Measured stages in pipeline order"""
+        with self._lock:
+            known = [self._stages[name] for name in STAGES if name in self._stages]
+            other = [stats for name, stats in self._stages.items() if name not in STAGES]
+        return known + other
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary"""
+        return {
+            'created': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'total_seconds': round(self.finished_seconds or 0.0, 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'counts': dict(self.counts),
+            'stages': {stats.name: stats.to_dict() for stats in self.stages()},
+        }
+
+    def write_json(self, path: str):
+        """
+        Write the report as JSON
+
+        Args:
+            path: Target file
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+
+def report_path(output_path: str) -> str:
+    """
+    Path of the JSON report written next to a document
+
+    Args:
+        output_path: Document path
+
+    Returns:
+        Path with ".report.json" appended to the document name
+    """
+    return f"{output_path}.report.json"
+
+
+def summary_lines(report: Dict[str, Any]) -> List[str]:
+    """
+    Format a report (RunReport.to_dict()) as a table
+
+    Args:
+        report: Report dictionary
+
+    Returns:
+        List of display lines
+    """
+    lines = [f"{'Phase':<16}{'Anzahl':>8}{'Wand s':>9}{'Aktiv s':>9}{'CPU s':>9}"
+             f"{'gelesen':>11}{'geschrieben':>13}{'Peak RSS':>11}"]
+    for name, stats in report['stages'].items():
+        peak = stats['peak_rss_bytes']
+        lines.append(
+            f"{STAGE_LABELS.get(name, name):<16}{stats['items']:>8}"
+            f"{stats['wall_seconds']:>9.2f}{stats['busy_seconds']:>9.2f}{stats['cpu_seconds']:>9.2f}"
+            f"{format_size(stats['bytes_read']):>11}{format_size(stats['bytes_written']):>13}"
+            f"{format_size(peak) if peak is not None else '-':>11}"
+        )
+    deduplicated = report['counts'].get('deduplicated')
+    if deduplicated:
+        lines.append(f"Mehrfach verwendete Bilder ohne erneutes Lesen eingebettet: {deduplicated}")
+    hits = report['counts'].get('prefetch_hits')
+    if hits is not None:
+        stall = report['stages'].get('stall', {}).get('busy_seconds', 0.0)
+        lines.append(f"Vorablesen: {hits} aus dem Puffer, {report['counts'].get('prefetch_misses', 0)} direkt "
+                     f"gelesen, Wartezeit {stall:.2f} s")
+    peak = report['peak_rss_bytes']
+    lines.append(f"Gesamt: {report['total_seconds']:.2f} s"
+                 + (f", Peak RSS {format_size(peak)}" if peak is not None else ""))
+    return lines
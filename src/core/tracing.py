@@ -0,0 +1,126 @@
+"""
+Tracing for Pic2Doc
+Records spans in Chrome trace-event format (Perfetto, chrome://tracing)
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class TraceRecorder:
+    """
+    Collects complete ('X') trace events from any thread (thread-safe)
+
+    Spans are stored as compact tuples and only turned into trace-event
+    dictionaries when written, so tracing a large run stays affordable.
+    Timestamps come from time.perf_counter(), which is a system-wide
+    monotonic clock on Linux and macOS, so traces of several processes
+    line up when merged.
+    """
+
+    def __init__(self, process_name: str = "pic2doc"):
+        """
+        Initialize trace recorder
+
+        Args:
+            process_name: Name shown for this process in the trace viewer
+        """
+        self.process_name = process_name
+        self.pid = os.getpid()
+        self._spans: List[Tuple[str, float, float, int, Optional[Dict[str, Any]]]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def complete(self, name: str, start: float, end: float, args: Optional[Dict[str, Any]] = None):
+        """
+        Record a finished span of the calling thread
+
+        Args:
+            name: Span name (e.g. 'probe')
+            start: perf_counter() at the start
+            end: perf_counter() at the end
+            args: Optional details shown for the span (e.g. the image)
+        """
+        thread = threading.current_thread()
+        tid = thread.native_id  # Matches the thread ids shown by top, py-spy, ...
+        with self._lock:
+            if tid not in self._thread_names:
+                self._thread_names[tid] = thread.name
+            self._spans.append((name, start, end, tid, args))
+
+    @contextmanager
+    def span(self, name: str, **args: Any):
+        """
+        Record the enclosed code as a span
+
+        Args:
+            name: Span name
+            **args: Details shown for the span
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.complete(name, start, time.perf_counter(), args or None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._spans)
+
+    def events(self) -> List[Dict[str, Any]]:
+        """
+        Get all recorded spans as Chrome trace events
+
+        Returns:
+            List of event dictionaries (metadata events first)
+        """
+        with self._lock:
+            spans = list(self._spans)
+            thread_names = dict(self._thread_names)
+
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0,
+                   'args': {'name': self.process_name}}]
+        for tid, name in thread_names.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                           'args': {'name': name}})
+        for name, start, end, tid, args in spans:
+            event = {
+                'name': name,
+                'cat': 'pic2doc',
+                'ph': 'X',
+                'ts': start * 1e6,          # Microseconds
+                'dur': (end - start) * 1e6,
+                'pid': self.pid,
+                'tid': tid,
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+        return events
+
+    def write(self, path: str):
+        """
+        Write the trace as JSON
+
+        Args:
+            path: Target file
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events(), 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+
+def trace_path(output_path: str) -> str:
+    """
+    Path of the trace written next to a document
+
+    Args:
+        output_path: Document path
+
+    Returns:
+        Path with ".trace.json" appended to the document name
+    """
+    return f"{output_path}.trace.json"
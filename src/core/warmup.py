@@ -0,0 +1,46 @@
+"""
+Import Warm-up for Pic2Doc
+Loads the heavy processing modules (openpyxl, python-docx/lxml, Pillow)
+in a background thread so entry points can show their UI first
+"""
+
+import importlib
+import threading
+from typing import Optional
+
+# Core modules that pull in the heavy third-party libraries
+HEAVY_MODULES = (
+    '.excel_reader',
+    '.image_handler',
+    '.document_generator',
+)
+
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def _import_heavy_modules():
+    """Import all heavy core modules (runs in background thread)"""
+    for module_name in HEAVY_MODULES:
+        try:
+            importlib.import_module(module_name, __package__)
+        except Exception:
+            # Import errors surface again, with a proper message, on first real use
+            pass
+
+
+def start_background_warmup() -> threading.Thread:
+    """
+    Start importing the heavy core modules in a daemon thread
+
+    Safe to call repeatedly; only the first call starts a thread.
+    A later regular import of one of the modules simply waits for the
+    warm-up to finish that module.
+
+    Returns:
+        The warm-up thread
+    """
+    global _warmup_thread
+    if _warmup_thread is None:
+        _warmup_thread = threading.Thread(target=_import_heavy_modules, name='pic2doc-warmup', daemon=True)
+        _warmup_thread.start()
+    return _warmup_thread
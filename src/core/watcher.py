@@ -0,0 +1,123 @@
+"""
+Input Watcher for Pic2Doc
+Detects changes to the Excel file and the image folders so a document
+can be rebuilt while editors work on its inputs
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .folder_index import RootListing, scan_root
+
+# Only the standard library is used here: the GUI polls in its own
+# process, without loading the processing libraries.
+
+
+class InputWatcher:
+    """
+    Polls a job's inputs and reports settled changes
+
+    The Excel file is compared by modification time and size, the image
+    folders by their listings (see scan_root: one stat per directory,
+    only directories whose mtime changed are listed again). A directory
+    that was listed again but still holds the same image files - e.g.
+    because the output document or an Excel lock file was written next
+    to the images - is not a change. Images replaced in place under the
+    same name do not change any listing; they are picked up by the next
+    rebuild, whose caches compare file mtimes.
+
+    wait() returns once a change was seen and then nothing changed for
+    `quiet_seconds`, so a burst of saves or copied photos triggers one
+    rebuild. The state it returns at becomes the new baseline, so changes
+    made during the rebuild trigger the next one.
+    """
+
+    def __init__(self, config: Dict[str, Any], interval: float = 1.0, quiet_seconds: float = 1.0):
+        """
+        Initialize watcher and record the current state as baseline
+
+        Args:
+            config: Job configuration (excel_file, image folders, image_recursive)
+            interval: Seconds between polls
+            quiet_seconds: Time without further changes before a change counts
+        """
+        self.excel_file = config['excel_file']
+        self.folders = [config['image_folder']] + list(config.get('extra_image_folders') or ())
+        self.recursive = config.get('image_recursive', False)
+        self.interval = max(0.05, interval)
+        self.quiet_seconds = max(0.0, quiet_seconds)
+        # What changed between the previous baseline and the one wait() returned at
+        self.changes: List[str] = []
+        self._excel, self._listings = self._scan(None)[:2]
+
+    def wait(self, stop: threading.Event) -> bool:
+        """
+        Block until the inputs changed and then stayed unchanged for quiet_seconds
+
+        Args:
+            stop: Set to end waiting
+
+        Returns:
+            True after a settled change, False if stop was set
+        """
+        excel, listings = self._excel, self._listings
+        changes: List[str] = []
+        changed_at: Optional[float] = None
+        while not stop.wait(self.interval):
+            excel, listings, changed = self._scan(listings, excel)
+            now = time.monotonic()
+            if changed:
+                changed_at = now
+                changes.extend(name for name in changed if name not in changes)
+            elif changed_at is not None and now - changed_at >= self.quiet_seconds:
+                self._excel, self._listings = excel, listings
+                self.changes = changes
+                return True
+        return False
+
+    def _scan(self, previous: Optional[List[Optional[RootListing]]],
+              previous_excel: Optional[Tuple[int, int]] = None
+              ) -> Tuple[Optional[Tuple[int, int]], List[Optional[RootListing]], List[str]]:
+        """
+        Poll the inputs once
+
+        Args:
+            previous: Listings of the previous poll (None for the first)
+            previous_excel: Excel (mtime_ns, size) of the previous poll
+
+        Returns:
+            Tuple of (Excel signature, listings, names of the changed inputs)
+        """
+        changed = []
+        try:
+            stat = os.stat(self.excel_file)
+            excel = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            excel = None  # Missing while being saved: a change once it is back
+        if previous is not None and excel != previous_excel:
+            changed.append("Excel-Datei")
+
+        listings: List[Optional[RootListing]] = []
+        for index, folder in enumerate(self.folders):
+            before = previous[index] if previous is not None else None
+            try:
+                listing, _relisted = scan_root(folder, self.recursive, before)
+            except OSError:
+                listing = None
+            if previous is not None and _listing_changed(before, listing) and "Bilder-Ordner" not in changed:
+                changed.append("Bilder-Ordner")
+            listings.append(listing)
+        return excel, listings, changed
+
+
+def _listing_changed(before: Optional[RootListing], after: Optional[RootListing]) -> bool:
+    """Whether two listings of a root differ in their image files or subfolders"""
+    if before is None or after is None:
+        return before is not after
+    if before.keys() != after.keys():
+        return True
+    # Directories whose mtime did not change keep their listing object
+    return any(entry is not before[relative] and entry[1:] != before[relative][1:]
+               for relative, entry in after.items())
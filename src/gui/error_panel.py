@@ -0,0 +1,188 @@
+"""
+Pic2Doc GUI - Error Panel
+Virtualized error list: only the visible rows exist as widgets
+"""
+
+import customtkinter as ctk
+from tkinter import filedialog, messagebox
+
+from src.core.error_log import CATEGORY_LABELS, ErrorCategory, ErrorLog
+
+# Filter button labels -> category (None = all)
+FILTERS = {
+    "Alle": None,
+    "Fehlt": ErrorCategory.MISSING,
+    "Beschädigt": ErrorCategory.CORRUPT,
+    "Grenze": ErrorCategory.REJECTED,
+    "Sonstige": ErrorCategory.OTHER,
+}
+
+
+class ErrorPanel(ctk.CTkFrame):
+    """
+    Error panel with category counts, filter, scrolling window and CSV export
+
+    Errors are appended to an ErrorLog; the panel only re-renders its fixed
+    set of row labels (at most once per idle cycle), so appending thousands
+    of errors costs about as much as appending one.
+    """
+
+    def __init__(self, master, visible_rows: int = 6, **kwargs):
+        """
+        Initialize error panel
+
+        Args:
+            master: Parent widget
+            visible_rows: Number of error rows shown at once
+        """
+        super().__init__(master, **kwargs)
+        self.error_log = ErrorLog()
+        self.visible_rows = visible_rows
+        self.first_row = 0
+        self.follow_tail = True  # Keep showing the newest errors until the user scrolls
+        self.category = None
+        self._refresh_pending = False
+
+        # Header: title, counts, export
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", padx=15, pady=(10, 5))
+        ctk.CTkLabel(header, text="⚠️ Fehler", font=("Arial", 13, "bold"), text_color="#e68a00").pack(side="left")
+        self.count_label = ctk.CTkLabel(header, text="", font=("Arial", 11), text_color="gray")
+        self.count_label.pack(side="left", padx=(10, 0))
+        ctk.CTkButton(header, text="Als CSV exportieren...", width=150, height=24,
+                      command=self.export_csv).pack(side="right")
+
+        # Category filter
+        self.filter_selector = ctk.CTkSegmentedButton(
+            self,
+            values=list(FILTERS),
+            command=self.set_filter,
+            height=24
+        )
+        self.filter_selector.set("Alle")
+        self.filter_selector.pack(anchor="w", padx=15, pady=(0, 5))
+
+        # Visible window of rows + scrollbar
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=15, pady=(0, 10))
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        rows_frame = ctk.CTkFrame(body, fg_color="transparent")
+        rows_frame.pack(side="left", fill="both", expand=True)
+
+        self.row_labels = []
+        for _ in range(visible_rows):
+            label = ctk.CTkLabel(rows_frame, text="", font=("Arial", 10), anchor="w", justify="left")
+            label.pack(fill="x")
+            label.bind("<MouseWheel>", self._on_mousewheel)
+            label.bind("<Button-4>", lambda e: self.scroll_by(-1))
+            label.bind("<Button-5>", lambda e: self.scroll_by(1))
+            self.row_labels.append(label)
+
+    # ----- Data -----
+
+    def clear(self):
+        """Remove all errors"""
+        self.error_log.clear()
+        self.first_row = 0
+        self.follow_tail = True
+        self._schedule_refresh()
+
+    def add(self, filename: str, error: str, category: str = None):
+        """Append one error"""
+        self.error_log.add(filename, error, category)
+        self._schedule_refresh()
+
+    def extend(self, items):
+        """Append (filename, error[, category]) tuples"""
+        self.error_log.extend(items)
+        self._schedule_refresh()
+
+    def count(self) -> int:
+        """Number of collected errors"""
+        return len(self.error_log)
+
+    # ----- View -----
+
+    def set_filter(self, value: str):
+        """Show only one category (filter button callback)"""
+        self.category = FILTERS.get(value)
+        self.first_row = 0
+        self.follow_tail = False
+        self.refresh()
+
+    def scroll_by(self, rows: int):
+        """Scroll the visible window by a number of rows"""
+        self._scroll_to(self.first_row + rows)
+
+    def _scroll_to(self, first_row: int):
+        last_start = max(0, self.error_log.count(self.category) - self.visible_rows)
+        self.first_row = max(0, min(first_row, last_start))
+        self.follow_tail = self.first_row == last_start and self.category is None
+        self.refresh()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        """Scrollbar callback ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if action == 'moveto':
+            self._scroll_to(int(float(value) * self.error_log.count(self.category)))
+        elif unit == 'pages':
+            self.scroll_by(int(value) * self.visible_rows)
+        else:
+            self.scroll_by(int(value))
+
+    def _on_mousewheel(self, event):
+        self.scroll_by(-1 if event.delta > 0 else 1)
+
+    def _schedule_refresh(self):
+        # Coalesce bursts of appends into one redraw
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self.refresh)
+
+    def refresh(self):
+        """Redraw counts, visible rows and scrollbar"""
+        self._refresh_pending = False
+        counts = self.error_log.counts()
+        total = len(self.error_log)
+        details = " · ".join(f"{counts[category]} {CATEGORY_LABELS[category]}"
+                             for category in ErrorCategory.ALL if counts[category])
+        self.count_label.configure(text=f"({total} Fehler: {details})" if total else "")
+
+        count = self.error_log.count(self.category)
+        if self.follow_tail:
+            self.first_row = max(0, count - self.visible_rows)
+        self.first_row = min(self.first_row, max(0, count - self.visible_rows))
+
+        entries = self.error_log.window(self.first_row, self.first_row + self.visible_rows, self.category)
+        for i, label in enumerate(self.row_labels):
+            if i < len(entries):
+                filename, error, _category = entries[i]
+                label.configure(text=f"❌ {filename}: {error}")
+            else:
+                label.configure(text="")
+
+        if count > 0:
+            self.scrollbar.set(self.first_row / count,
+                               min(1.0, (self.first_row + self.visible_rows) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # ----- Export -----
+
+    def export_csv(self):
+        """Ask for a file name and export all errors as CSV"""
+        if not len(self.error_log):
+            return
+        filename = filedialog.asksaveasfilename(
+            title="Fehler exportieren",
+            defaultextension=".csv",
+            filetypes=[("CSV Dateien", "*.csv"), ("Alle Dateien", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            count = self.error_log.export_csv(filename)
+        except OSError as e:
+            messagebox.showerror("Export fehlgeschlagen", str(e))
+            return
+        messagebox.showinfo("Export abgeschlossen", f"{count} Fehler exportiert nach:\n{filename}")
@@ -5,18 +5,30 @@ Modern GUI for image-to-document conversion
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-import threading
 from pathlib import Path
 import sys
 import os
+import threading
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.core.config_manager import ConfigManager
-from src.core.excel_reader import ExcelReader
-from src.core.image_handler import ImageHandler
-from src.core.document_generator import DocumentGenerator
+from src.core.process_runner import ProcessJobRunner
+from src.core.progress import ProgressChannel
+from src.core.watcher import InputWatcher
+from src.utils.formatting import format_duration, plan_summary_lines
+from src.gui.error_panel import ErrorPanel
+from src.utils.constants import TERMINAL_EVENTS
+from src.utils.log import get_logger
+
+# The heavy libraries (openpyxl, python-docx, Pillow) are only loaded in the
+# job process, so the window appears quickly and never competes for the GIL
+
+# Progress display refresh interval (~15 Hz)
+PROGRESS_POLL_MS = 66
+
+log = get_logger('gui')
 
 
 class Pic2DocGUI(ctk.CTk):
@@ -41,8 +53,13 @@ class Pic2DocGUI(ctk.CTk):
         # Processing state
         self.is_processing = False
         self.cancel_processing = False
-        self.processing_thread = None
-        self.error_list = []  # Store errors during processing
+        self.job_runner = None
+        self.spare_runner = None  # Pre-spawned job process with libraries loaded
+        self.scan_id = None  # Pre-scan running in the spare job process
+        self.progress_channel = ProgressChannel()  # Written by worker, polled by GUI timer
+        # Watch mode: background thread waiting for input changes
+        self.watch_stop = None
+        self.watch_pending = False  # Inputs changed while a job was running
 
         # Loading state - prevent auto-save during initial load
         self.is_loading = True
@@ -60,6 +77,10 @@ class Pic2DocGUI(ctk.CTk):
         # Bring to foreground on macOS
         self.bring_to_foreground()
 
+        # Load processing libraries in a job process once the window is visible
+        # and pre-scan the saved inputs there
+        self.after(200, self.prepare_job_process)
+
     def create_widgets(self):
         """Create all GUI widgets"""
 
@@ -113,6 +134,16 @@ class Pic2DocGUI(ctk.CTk):
         self.folder_entry.bind("<FocusOut>", lambda e: self.save_current_settings())
         ctk.CTkButton(folder_row, text="...", width=40, command=self.browse_folder).pack(side="right")
 
+        recursive_row = ctk.CTkFrame(files_frame, fg_color="transparent")
+        recursive_row.pack(fill="x", padx=15, pady=(0, 3))
+        self.image_recursive = ctk.CTkCheckBox(recursive_row, text="Unterordner durchsuchen",
+                                               command=self.toggle_recursive)
+        self.image_recursive.pack(side="left", padx=(110, 0))
+
+        # Pre-scan summary of the selected inputs
+        self.scan_label = ctk.CTkLabel(files_frame, text="", font=("Arial", 11), text_color="gray")
+        self.scan_label.pack(anchor="w", padx=125)
+
         # Output file
         output_row = ctk.CTkFrame(files_frame, fg_color="transparent")
         output_row.pack(fill="x", padx=15, pady=(3, 10))
@@ -189,6 +220,18 @@ class Pic2DocGUI(ctk.CTk):
         self.test_limit = ctk.CTkComboBox(test_row, values=[str(i) for i in [10, 20, 30, 50, 100]], width=80, state="disabled", command=lambda _: self.save_current_settings())
         self.test_limit.pack(side="left")
 
+        link_row = ctk.CTkFrame(test_frame, fg_color="transparent")
+        link_row.pack(fill="x", padx=15, pady=(0, 10))
+        self.link_images = ctk.CTkCheckBox(link_row, text="Bilder nur verknüpfen (Durchsichtskopie, Bildordner muss erreichbar bleiben)",
+                                           command=self.save_current_settings)
+        self.link_images.pack(side="left")
+
+        watch_row = ctk.CTkFrame(test_frame, fg_color="transparent")
+        watch_row.pack(fill="x", padx=15, pady=(0, 10))
+        self.watch_inputs = ctk.CTkCheckBox(watch_row, text="Beobachten: bei Änderungen an Excel-Datei oder Bildern neu erstellen",
+                                            command=self.toggle_watch)
+        self.watch_inputs.pack(side="left")
+
         # ===== PROGRESS SECTION =====
         self.progress_frame = ctk.CTkFrame(main_container)
         self.progress_frame.pack(fill="x", pady=(0, 10))
@@ -204,19 +247,9 @@ class Pic2DocGUI(ctk.CTk):
         self.progress_text.pack(anchor="w", padx=15, pady=(0, 10))
 
         # ===== ERROR PANEL (hidden by default) =====
-        self.error_frame = ctk.CTkFrame(main_container)
+        self.error_panel = ErrorPanel(main_container)
         # Don't pack yet - will be shown when errors occur
 
-        error_header = ctk.CTkFrame(self.error_frame, fg_color="transparent")
-        error_header.pack(fill="x", padx=15, pady=(10, 5))
-        ctk.CTkLabel(error_header, text="⚠️ Fehler", font=("Arial", 13, "bold"), text_color="#e68a00").pack(side="left")
-        self.error_count_label = ctk.CTkLabel(error_header, text="", font=("Arial", 11), text_color="gray")
-        self.error_count_label.pack(side="left", padx=(10, 0))
-
-        # Scrollable error text
-        self.error_text = ctk.CTkTextbox(self.error_frame, height=100, font=("Arial", 10))
-        self.error_text.pack(fill="both", expand=True, padx=15, pady=(0, 10))
-
         # ===== ACTION BUTTON =====
         self.action_button = ctk.CTkButton(
             main_container,
@@ -227,7 +260,19 @@ class Pic2DocGUI(ctk.CTk):
             fg_color="#2fa572",
             hover_color="#258759"
         )
-        self.action_button.pack(pady=(0, 10))
+        self.action_button.pack(pady=(0, 5))
+
+        # Dry run: estimates without creating the document
+        self.plan_button = ctk.CTkButton(
+            main_container,
+            text="Probelauf (nur planen)",
+            command=lambda: self.start_processing(plan_only=True),
+            height=28,
+            fg_color="transparent",
+            border_width=1,
+            text_color=("gray10", "gray90")
+        )
+        self.plan_button.pack(pady=(0, 10))
 
     def change_theme(self, value):
         """Change application theme"""
@@ -259,6 +304,7 @@ class Pic2DocGUI(ctk.CTk):
             self.excel_entry.delete(0, "end")
             self.excel_entry.insert(0, filename)
             self.save_current_settings()
+            self.start_prescan()
 
     def browse_folder(self):
         """Open folder dialog for image folder"""
@@ -267,6 +313,12 @@ class Pic2DocGUI(ctk.CTk):
             self.folder_entry.delete(0, "end")
             self.folder_entry.insert(0, folder)
             self.save_current_settings()
+            self.start_prescan()
+
+    def toggle_recursive(self):
+        """Save the subfolder setting and scan the folders again"""
+        self.save_current_settings()
+        self.start_prescan()
 
     def browse_output(self):
         """Open save dialog for output file"""
@@ -282,8 +334,6 @@ class Pic2DocGUI(ctk.CTk):
 
     def load_saved_config(self):
         """Load saved configuration into GUI"""
-        print(f"DEBUG: Loading config with excel_file='{self.config.get('excel_file')}'")
-
         # Clear and insert saved values
         self.excel_entry.delete(0, "end")
         self.excel_entry.insert(0, self.config.get('excel_file', ''))
@@ -324,6 +374,10 @@ class Pic2DocGUI(ctk.CTk):
             self.test_mode.select()
             self.test_limit.configure(state="normal")
         self.test_limit.set(str(self.config.get('test_image_limit', 10)))
+        if self.config.get('link_images', False):
+            self.link_images.select()
+        if self.config.get('image_recursive', False):
+            self.image_recursive.select()
 
         # Theme (load saved theme) - don't trigger save
         saved_theme = self.config.get('theme', 'System')
@@ -354,6 +408,9 @@ class Pic2DocGUI(ctk.CTk):
         config = {
             'excel_file': self.excel_entry.get(),
             'image_folder': self.folder_entry.get(),
+            'extra_image_folders': self.config.get('extra_image_folders', []),
+            'image_recursive': self.image_recursive.get() == 1,
+            'image_duplicates': self.config.get('image_duplicates', 'first'),
             'output_file': self.output_entry.get(),
             'filename_column': 'A',
             'caption_columns': caption_cols,
@@ -366,6 +423,8 @@ class Pic2DocGUI(ctk.CTk):
             'font_underline': self.font_underline.get() == 1,
             'test_mode': self.test_mode.get() == 1,
             'test_image_limit': test_limit_value,
+            'link_images': self.link_images.get() == 1,
+            'link_paths': self.config.get('link_paths', 'relative'),
             'theme': self.theme_selector.get(),  # Save current theme
             'smart_layout': True,  # Always enabled
             'margin_top_cm': 1.27,    # Standard margins
@@ -378,16 +437,27 @@ class Pic2DocGUI(ctk.CTk):
     def action_button_clicked(self):
         """Handle action button click (Start/Cancel)"""
         if self.is_processing:
-            # Cancel processing
+            # Cancel processing (the job process is killed if it doesn't stop in time)
             self.cancel_processing = True
+            if self.job_runner is not None:
+                self.job_runner.cancel()
             self.update_status("⏹ Abbrechen...")
             self.action_button.configure(state="disabled")
         else:
             # Start processing
             self.start_processing()
 
-    def start_processing(self):
-        """Start document generation in background thread"""
+    def start_processing(self, plan_only=False, automatic=False):
+        """
+        Start document generation (or a dry run) in a separate process
+
+        Args:
+            plan_only: Only plan the document and show page, size and time estimates
+            automatic: Rebuild triggered by watch mode (no overwrite question)
+        """
+        if self.is_processing:
+            return
+
         # Get configuration
         config = self.get_current_config()
 
@@ -398,7 +468,7 @@ class Pic2DocGUI(ctk.CTk):
 
         # Check if output file exists and warn
         output_path = Path(config['output_file'])
-        if output_path.exists():
+        if not plan_only and not automatic and output_path.exists():
             result = messagebox.askyesno(
                 "Datei überschreiben?",
                 f"Die Datei '{output_path.name}' existiert bereits.\n\nMöchten Sie sie überschreiben?",
@@ -411,8 +481,8 @@ class Pic2DocGUI(ctk.CTk):
         self.config_manager.save_config(config)
 
         # Clear previous errors
-        self.error_list = []
-        self.error_frame.pack_forget()  # Hide error panel
+        self.error_panel.clear()
+        self.error_panel.pack_forget()  # Hide error panel
 
         # Reset cancel flag
         self.cancel_processing = False
@@ -424,110 +494,245 @@ class Pic2DocGUI(ctk.CTk):
             fg_color="#e63946",
             hover_color="#d62828"
         )
-        self.status_label.configure(text="⏳ Verarbeitung läuft...")
+        self.plan_button.configure(state="disabled")
+        self.status_label.configure(text="⏳ Probelauf läuft..." if plan_only else "⏳ Verarbeitung läuft...")
         self.progress_bar.set(0)
+        self.progress_channel.reset()
+
+        # Watch the inputs of the document being built
+        self.watch_pending = False
+        if not plan_only and self.watch_inputs.get():
+            self.start_watch(config)
+
+        # Start job in the pre-spawned process (reusing its pre-scan caches);
+        # its events are picked up by the GUI timer
+        self.job_runner = self.spare_runner or ProcessJobRunner()
+        self.spare_runner = None
+        self.scan_id = None
+        self.job_runner.start(config, plan_only=plan_only)
+        self.after(PROGRESS_POLL_MS, self.poll_job)
+
+    def prepare_job_process(self):
+        """Spawn an idle job process that loads the heavy libraries in advance"""
+        if self.spare_runner is None:
+            self.spare_runner = ProcessJobRunner()
+            self.spare_runner.spawn()
+        self.start_prescan()
+
+    def start_prescan(self):
+        """Pre-scan the selected inputs in the idle job process (warms its caches)"""
+        if self.is_processing or self.spare_runner is None:
+            # The next spare job process scans once it is spawned
+            return
 
-        # Start processing thread
-        self.processing_thread = threading.Thread(target=self.process_document, args=(config,))
-        self.processing_thread.daemon = True
-        self.processing_thread.start()
+        config = self.get_current_config()
+        if not Path(config['excel_file']).is_file() or not Path(config['image_folder']).is_dir():
+            self.scan_id = None
+            self.scan_label.configure(text="")
+            return
 
-    def process_document(self, config):
-        """Process document in background (runs in thread)"""
-        try:
-            # Read Excel
-            if self.cancel_processing:
-                return
-            self.update_status("Lese Excel-Datei...")
-            excel_reader = ExcelReader()
-            excel_data = excel_reader.read_data(
-                config['excel_file'],
-                config['filename_column'],
-                config['caption_columns'],
-                config['caption_separator']
-            )
+        polling = self.scan_id is not None
+        self.scan_id = self.spare_runner.prescan(config)
+        self.scan_label.configure(text="🔍 Prüfe Eingaben...")
+        if not polling:
+            self.after(PROGRESS_POLL_MS, self.poll_prescan)
 
-            # Apply test limit
-            if config['test_mode']:
-                excel_data = excel_data[:config['test_image_limit']]
+    def poll_prescan(self):
+        """Show pre-scan results (runs on the Tk timer while a pre-scan is running)"""
+        if self.is_processing or self.spare_runner is None or self.scan_id is None:
+            self.scan_id = None
+            return
 
-            # Process images
-            if self.cancel_processing:
-                return
-            self.update_status("Suche Bilder...")
-            image_handler = ImageHandler(config['image_folder'])
-            complete_data = []
-
-            for filename, caption in excel_data:
-                if self.cancel_processing:
-                    return
-                try:
-                    image_info = image_handler.get_image_info(filename)
-                    complete_data.append((filename, caption, image_info['path'], image_info))
-                except Exception as e:
-                    self.error_list.append((filename, str(e)))
-                    continue
-
-            if not complete_data:
-                self.update_status("❌ Keine Bilder gefunden!")
-                self.processing_complete()
-                return
+        for event in self.spare_runner.poll_events():
+            if event['event'] == 'scan' and event['scan_id'] == self.scan_id:
+                self.show_scan(event)
 
-            # Generate document
-            if self.cancel_processing:
-                return
-            doc_generator = DocumentGenerator(config)
-            processed, errors = doc_generator.create_document(
-                complete_data,
-                config['output_file'],
-                progress_callback=self.update_progress_with_cancel_check
-            )
+        if self.scan_id is not None:
+            self.after(PROGRESS_POLL_MS, self.poll_prescan)
 
-            # Check if cancelled
-            if self.cancel_processing:
-                self.update_status("⏹ Abgebrochen")
-                return
+    def show_scan(self, event):
+        """Display a pre-scan event"""
+        state = event['state']
+        if state == 'failed':
+            self.scan_label.configure(text=f"⚠ {event['error']}")
+        else:
+            text = (f"{event['rows']} Zeilen / {event['found']} Bilder gefunden / "
+                    f"{event['missing']} fehlen / ca. {event['pages']} Seiten")
+            if event['invalid']:
+                text += f" / {event['invalid']} fehlerhaft"
+            prefix = "🔍" if state == 'running' else "✓"
+            self.scan_label.configure(text=f"{prefix} {text}")
+
+        if state != 'running':
+            self.scan_id = None
+
+    def poll_job(self):
+        """Process events from the job process (runs on the Tk timer while processing)"""
+        if self.job_runner is None:
+            return
+
+        for event in self.job_runner.poll_events():
+            if event['event'] in TERMINAL_EVENTS:
+                self.finish_processing(event)
+            else:
+                self.handle_pipeline_event(event)
 
+        self.poll_progress()
+        if self.is_processing:
+            self.after(PROGRESS_POLL_MS, self.poll_job)
+
+    def finish_processing(self, event):
+        """Show the result of a finished job"""
+        self.poll_progress()
+        kind = event['event']
+
+        if kind == 'cancelled' or self.cancel_processing:
+            self.update_status("⏹ Abgebrochen")
+        elif kind == 'failed':
+            self.update_status(f"❌ Fehler: {event['error']}")
+            # Show exception in error panel
+            self.error_panel.add("SYSTEMFEHLER", event['error'])
+        elif 'plan' in event:
+            self.show_plan(event['plan'])
+        elif event['found'] == 0:
+            self.update_status("❌ Keine Bilder gefunden!")
+        else:
             # Done
-            self.update_status(f"✓ Fertig! {processed}/{len(complete_data)} Bilder verarbeitet")
+            status = f"✓ Fertig! {event['processed']}/{event['found']} Bilder verarbeitet"
+            if event.get('ambiguous'):
+                status += f" ({len(event['ambiguous'])} mehrdeutige Namen, siehe Protokoll)"
+            self.update_status(status)
             self.progress_bar.set(1.0)
 
-            # Show errors if any
-            if self.error_list:
-                self.show_errors()
-
-        except Exception as e:
-            if not self.cancel_processing:
-                self.update_status(f"❌ Fehler: {str(e)}")
-                # Show exception in error panel
-                self.error_list.append(("SYSTEMFEHLER", str(e)))
-                self.show_errors()
-        finally:
-            self.processing_complete()
-
-    def update_progress_with_cancel_check(self, current, total, filename):
-        """Update progress and check for cancellation"""
-        if self.cancel_processing:
-            # Signal to document generator to stop (would need implementation)
+        # Show errors if any
+        if self.error_panel.count():
+            self.show_errors()
+
+        runner, self.job_runner = self.job_runner, None
+        if self.watch_stop is not None and runner.alive:
+            # Watching: keep the job process, so the next rebuild reuses its
+            # image info, digest and folder index caches
+            if self.spare_runner is not None:
+                self.spare_runner.shutdown()
+            self.spare_runner = runner
+        else:
+            runner.shutdown()
+        self.processing_complete()
+        if self.watch_pending and self.watch_stop is not None:
+            # Inputs changed while building: rebuild once the spare process is ready
+            self.after(600, lambda: self.start_processing(automatic=True))
+        self.after(500, self.prepare_job_process)
+
+    def show_plan(self, plan):
+        """Show the result of a dry run"""
+        self.update_status(f"✓ Probelauf: {plan['pages']} Seiten, {plan['found']} Bilder, "
+                           f"{len(plan['missing'])} fehlen")
+        self.progress_bar.set(1.0)
+        summary = "\n".join(plan_summary_lines(plan))
+        self.after(0, lambda: messagebox.showinfo("Probelauf", summary))
+
+    def handle_pipeline_event(self, event):
+        """Translate pipeline events into GUI updates"""
+        kind = event['event']
+        if kind == 'stage':
+            stage_texts = {
+                'excel': "Lese Excel-Datei...",
+                'images': "Suche Bilder...",
+                'document': "⏳ Erstelle Dokument...",
+                'layout': "Berechne Seitenlayout...",
+            }
+            self.update_status(stage_texts.get(event['stage'], event['stage']))
+        elif kind == 'progress':
+            self.update_progress(event['current'], event['total'], event['filename'])
+        elif kind == 'error':
+            self.error_panel.add(event['filename'], event['error'], event.get('category'))
+            self.show_errors()
+        elif kind == 'errors':
+            self.error_panel.extend(event['items'])
+            self.show_errors()
+
+    def toggle_watch(self):
+        """Start or stop watching the inputs"""
+        if not self.watch_inputs.get():
+            self.stop_watch()
+            return
+        config = self.get_current_config()
+        if not Path(config['excel_file']).is_file() or not Path(config['image_folder']).is_dir():
+            self.watch_inputs.deselect()
+            self.status_label.configure(text="❌ Fehler: Excel-Datei und Bilder-Ordner angeben, um sie zu beobachten!")
             return
-        self.update_progress(current, total, filename)
+        self.start_watch(config)
+        self.status_label.configure(text="👀 Beobachte Excel-Datei und Bilder-Ordner...")
+
+    def start_watch(self, config):
+        """
+        (Re)start the watch thread for a configuration
+
+        Args:
+            config: Configuration whose inputs are watched
+        """
+        self.stop_watch()
+        self.watch_stop = threading.Event()
+        threading.Thread(target=self._watch_inputs, args=(config, self.watch_stop),
+                         name='pic2doc-watch', daemon=True).start()
+
+    def stop_watch(self):
+        """Stop the watch thread"""
+        if self.watch_stop is not None:
+            self.watch_stop.set()
+            self.watch_stop = None
+        self.watch_pending = False
+
+    def _watch_inputs(self, config, stop):
+        """Wait for settled input changes and request rebuilds (runs in thread)"""
+        try:
+            watcher = InputWatcher(config, self.config.get('watch_interval_seconds', 1.0),
+                                   self.config.get('watch_quiet_seconds', 1.0))
+        except OSError as e:
+            log.warning("⚠ Beobachten nicht möglich: %s", e)
+            return
+        while watcher.wait(stop):
+            self.after(0, lambda changes=watcher.changes: self.on_inputs_changed(changes, stop))
+
+    def on_inputs_changed(self, changes, stop):
+        """
+        Rebuild after a watched input changed
+
+        Args:
+            changes: Names of the changed inputs
+            stop: Stop event of the watch thread that reported the change
+        """
+        if stop is not self.watch_stop:
+            return  # Reported by a watch thread that was replaced meanwhile
+        if self.is_processing:
+            self.watch_pending = True
+            return
+        log.info("↻ Geändert: %s - erstelle Dokument neu", ", ".join(changes))
+        self.start_processing(automatic=True)
 
     def update_status(self, text):
         """Update status label (thread-safe)"""
         self.after(0, lambda: self.status_label.configure(text=text))
 
     def update_progress(self, current, total, filename):
-        """Update progress bar and text (thread-safe)"""
-        progress = current / total if total > 0 else 0
-        self.after(0, lambda: self.progress_bar.set(progress))
-        self.after(0, lambda: self.progress_text.configure(
-            text=f"Verarbeite: {filename} ({current}/{total})"
-        ))
+        """Publish progress (thread-safe, the GUI timer picks it up)"""
+        self.progress_channel.publish(current, total, filename)
+
+    def poll_progress(self):
+        """Show latest published progress"""
+        snapshot = self.progress_channel.poll()
+        if snapshot is not None:
+            self.progress_bar.set(snapshot.fraction)
+            text = f"Verarbeite: {snapshot.filename} ({snapshot.current}/{snapshot.total})"
+            if snapshot.rate is not None:
+                text += f" · {snapshot.rate:.1f} Bilder/s · noch ca. {format_duration(snapshot.eta_seconds)}"
+            self.progress_text.configure(text=text)
 
     def processing_complete(self):
         """Reset UI after processing completes"""
         self.is_processing = False
         self.cancel_processing = False
+        self.after(0, lambda: self.plan_button.configure(state="normal"))
         self.after(0, lambda: self.action_button.configure(
             text="Dokument erstellen",
             fg_color="#2fa572",
@@ -536,21 +741,9 @@ class Pic2DocGUI(ctk.CTk):
         ))
 
     def show_errors(self):
-        """Display error panel with all collected errors"""
-        # Update count label
-        count_text = f"({len(self.error_list)} Fehler)"
-        self.after(0, lambda: self.error_count_label.configure(text=count_text))
-
-        # Format error text
-        error_text = "\n".join([f"❌ {filename}: {error}" for filename, error in self.error_list])
-
-        # Update textbox and show panel
-        def update_errors():
-            self.error_text.delete("1.0", "end")
-            self.error_text.insert("1.0", error_text)
-            self.error_frame.pack(fill="x", pady=(0, 10), before=self.action_button)
-
-        self.after(0, update_errors)
+        """Show the error panel (it renders new errors by itself)"""
+        if not self.error_panel.winfo_manager():
+            self.error_panel.pack(fill="x", pady=(0, 10), before=self.action_button)
 
     def bring_to_foreground(self):
         """Bring application window to foreground (macOS specific)"""
@@ -563,24 +756,15 @@ class Pic2DocGUI(ctk.CTk):
             self.after(100, lambda: self.attributes('-topmost', False))
 
     def save_current_settings(self):
-        """Save current GUI settings to configuration file"""
+        """Save current GUI settings (debounced, written in the background)"""
         # Don't save during initial load
         if self.is_loading:
-            print("DEBUG: Skipping save during initial load")
             return
 
         try:
-            config = self.get_current_config()
-            print(f"DEBUG: Saving config with excel_file='{config.get('excel_file')}'")
-            result = self.config_manager.save_config(config)
-            if result:
-                print("DEBUG: Save successful")
-            else:
-                print("DEBUG: Save failed")
+            self.config_manager.schedule_save(self.get_current_config())
         except Exception as e:
-            print(f"Warning: Could not save configuration: {e}")
-            import traceback
-            traceback.print_exc()
+            log.warning("⚠ Konfiguration konnte nicht gespeichert werden: %s", e)
 
     def get_version(self):
         """Read version from VERSION file"""
@@ -603,6 +787,11 @@ class Pic2DocGUI(ctk.CTk):
     def on_closing(self):
         """Handle window close event - save settings before closing"""
         self.save_current_settings()
+        self.config_manager.flush()
+        self.stop_watch()
+        for runner in (self.job_runner, self.spare_runner):
+            if runner is not None:
+                runner.shutdown()
         self.destroy()
 
 
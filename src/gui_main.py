@@ -4,6 +4,7 @@ Pic2Doc GUI Entry Point
 Launches the graphical user interface
 """
 
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -12,5 +13,8 @@ src_dir = Path(__file__).parent
 sys.path.insert(0, str(src_dir))
 
 if __name__ == "__main__":
+    # Required for the job process in PyInstaller bundles
+    multiprocessing.freeze_support()
+
     from gui.main_window import main
     main()
@@ -8,18 +8,20 @@ Author: René
 Version: 0.1.0
 """
 
+import argparse
 import sys
 import os
+import threading
+import time
 from pathlib import Path
 
 # Add parent directory to path to allow imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core.config_manager import ConfigManager
-from src.core.excel_reader import ExcelReader
-from src.core.image_handler import ImageHandler
-from src.core.document_generator import DocumentGenerator
-from src.utils.constants import DEFAULT_CONFIG
+from src.core.warmup import start_background_warmup
+from src.utils.constants import DEFAULT_CONFIG, DUPLICATE_POLICIES, LINK_PATHS
+from src.utils.log import ProgressLogger, get_logger, setup_logging
 
 
 def input_with_default(prompt: str, default):
@@ -258,6 +260,10 @@ def display_configuration(config: dict):
     print("=" * 70)
     print(f"Excel-Datei:          {config['excel_file']}")
     print(f"Bilder-Ordner:        {config['image_folder']}")
+    for folder in config.get('extra_image_folders') or []:
+        print(f"  weiterer Ordner:    {folder}")
+    if config.get('image_recursive'):
+        print(f"  (mit Unterordnern)")
     print(f"Ausgabedatei:         {config['output_file']}")
     print()
     print(f"Dateinamen-Spalte:    {config['filename_column']}")
@@ -281,8 +287,272 @@ def display_configuration(config: dict):
     print()
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command line options
+
+    Args:
+        argv: Argument list (defaults to sys.argv[1:])
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Erstellt formatierte Word-Dokumente aus Bildern und Excel-Beschreibungen"
+    )
+    parser.add_argument('--plan', action='store_true',
+                        help="Nur planen: Seiten, fehlende Bilder, Dateigröße und Laufzeit "
+                             "schätzen, ohne das Dokument zu erstellen")
+    parser.add_argument('--dpi', type=int, default=150,
+                        help="Zielauflösung für die Größenschätzung mit Verkleinerung (Standard: 150)")
+    parser.add_argument('--report', action=argparse.BooleanOptionalAction, default=None,
+                        help="Laufzeitbericht als JSON neben der Ausgabedatei speichern "
+                             "(<Ausgabe>.report.json); gilt nur für diesen Lauf, ohne Angabe gilt "
+                             "die gespeicherte Einstellung")
+    parser.add_argument('--trace', action='store_true',
+                        help="Trace mit Zeitspannen pro Bild speichern (<Ausgabe>.trace.json, "
+                             "in Perfetto oder chrome://tracing öffnen); gilt nur für diesen Lauf")
+    parser.add_argument('--extra-folder', action='append', metavar='ORDNER',
+                        help="Weiterer Bilder-Ordner, wird nach dem Bilder-Ordner durchsucht "
+                             "(mehrfach angebbar; ersetzt die gespeicherten weiteren Ordner "
+                             "für diesen Lauf)")
+    parser.add_argument('--no-extra-folders', action='store_true',
+                        help="Die gespeicherten weiteren Bilder-Ordner in diesem Lauf nicht durchsuchen")
+    parser.add_argument('--recursive', action=argparse.BooleanOptionalAction, default=None,
+                        help="Auch die Unterordner der Bilder-Ordner durchsuchen (gilt nur für "
+                             "diesen Lauf, ohne Angabe gilt die gespeicherte Einstellung)")
+    parser.add_argument('--duplicates', choices=DUPLICATE_POLICIES, default=None,
+                        help="Bei mehrfach vorhandenen Dateinamen die Datei im ersten Ordner "
+                             "(first, Standard) oder die neueste (newest) verwenden "
+                             "(gilt nur für diesen Lauf)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Nach dem Erstellen Excel-Datei und Bilder-Ordner beobachten und "
+                             "das Dokument bei Änderungen neu erstellen (Strg+C beendet)")
+    parser.add_argument('--link-images', action=argparse.BooleanOptionalAction, default=None,
+                        help="Bilder nur verknüpfen statt einbetten (kleines Dokument für interne "
+                             "Durchsicht; die Bilddateien müssen erreichbar bleiben); gilt nur für "
+                             "diesen Lauf, ohne Angabe gilt die gespeicherte Einstellung")
+    parser.add_argument('--link-paths', choices=LINK_PATHS, default=None,
+                        help="Verknüpfungen relativ zum Ausgabeordner (Standard) oder absolut "
+                             "(gilt nur für diesen Lauf)")
+    parser.add_argument('--embed-linked', nargs='+', metavar='DOCX',
+                        help="Verknüpfte Bilder eines Dokuments einbetten und beenden: "
+                             "DOCX [ZIEL] (ohne ZIEL wird das Dokument ersetzt)")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="Nur Warnungen und Fehler ausgeben (keine Fortschrittszeilen)")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Ausführliche Ausgabe (eine Zeile pro Bild)")
+    parser.add_argument('--log-file',
+                        help="Protokoll zusätzlich als JSON-Lines in diese Datei schreiben")
+    args = parser.parse_args(argv)
+    if args.embed_linked and len(args.embed_linked) > 2:
+        parser.error("--embed-linked erwartet DOCX [ZIEL]")
+    return args
+
+
+def apply_run_option(config: dict, saved_config: dict, run_only: set, key: str, value):
+    """
+    Set an option that was given on the command line for this run only
+
+    An option that was not given (None) keeps its saved value, e.g. the
+    one set in the GUI. A given one is added to run_only, so the value
+    saved after the run is the saved one (see config_to_save).
+
+    Args:
+        config: Configuration of this run (updated)
+        saved_config: Saved or default configuration
+        run_only: Keys set for this run only (updated)
+        key: Configuration key
+        value: Value from the command line, None if not given
+    """
+    if value is None:
+        config[key] = saved_config.get(key, DEFAULT_CONFIG[key])
+    else:
+        config[key] = value
+        run_only.add(key)
+
+
+def config_to_save(config: dict, saved_config: dict, run_only: set) -> dict:
+    """
+    Configuration to save after a run
+
+    Args:
+        config: Configuration of this run
+        saved_config: Saved or default configuration
+        run_only: Keys set for this run only (see apply_run_option)
+
+    Returns:
+        config with the saved values of the run-only keys
+    """
+    return dict(config, **{key: saved_config.get(key, DEFAULT_CONFIG[key]) for key in run_only})
+
+
+def print_ambiguous(ambiguous: dict):
+    """
+    List Excel filenames that matched several image files
+
+    Args:
+        ambiguous: Excel filename -> candidate files (the first one was used)
+    """
+    if not ambiguous:
+        return
+    print(f"\n⚠ {len(ambiguous)} Name(n) mehrdeutig, jeweils erste Datei verwendet:")
+    for filename, candidates in list(ambiguous.items())[:10]:
+        print(f"  - {filename}: {', '.join(candidates)}")
+    if len(ambiguous) > 10:
+        print(f"  ... und {len(ambiguous) - 10} weitere")
+
+
+def run_plan(config: dict, resample_dpi: int):
+    """
+    Dry run: plan the document and print the estimates
+
+    Args:
+        config: Configuration dictionary
+        resample_dpi: Target resolution for the resampled size estimate
+    """
+    from src.core.planner import DocumentPlanner
+    from src.utils.formatting import plan_summary_lines
+
+    try:
+        plan = DocumentPlanner(config, resample_dpi=resample_dpi).plan()
+    except (FileNotFoundError, ValueError) as e:
+        print(f"✗ Fehler beim Lesen der Eingaben: {e}")
+        return
+
+    plan = plan.to_dict()
+    print("=" * 70)
+    print("PROBELAUF")
+    print("=" * 70)
+    for line in plan_summary_lines(plan):
+        print(line)
+
+    print_ambiguous(plan['ambiguous'])
+    if plan['missing']:
+        print(f"\n⚠ {len(plan['missing'])} Bild(er) nicht gefunden:")
+        for filename in plan['missing'][:10]:
+            print(f"  - {filename}")
+        if len(plan['missing']) > 10:
+            print(f"  ... und {len(plan['missing']) - 10} weitere")
+    print("=" * 70)
+
+
+def run_embed_linked(paths: list):
+    """
+    Embed the linked pictures of a document
+
+    Args:
+        paths: [document] or [document, output path]
+    """
+    from src.core.linked_images import embed_linked_images
+
+    if not os.path.exists(paths[0]):
+        print(f"✗ Fehler: Dokument nicht gefunden: {paths[0]}")
+        return
+    try:
+        _embedded, failed = embed_linked_images(paths[0], paths[1] if len(paths) > 1 else None)
+    except Exception as e:
+        print(f"✗ Fehler beim Einbetten: {e}")
+        return
+    if failed:
+        print(f"⚠ {len(failed)} Bilddatei(en) nicht gefunden oder unlesbar, bleiben verknüpft")
+    print(f"  Gespeichert unter: {paths[-1]}")
+
+
+def run_build(pipeline, config: dict) -> bool:
+    """
+    Create the document and print the result
+
+    Args:
+        pipeline: Pic2DocPipeline for the configuration
+        config: Configuration dictionary
+
+    Returns:
+        True if a document was written
+    """
+    from src.core.run_report import summary_lines
+
+    progress = ProgressLogger(get_logger('cli'))
+
+    def on_event(event: dict):
+        if event['event'] == 'progress':
+            progress.update(event['current'], event['total'], event['filename'])
+
+    try:
+        result = pipeline.run(on_event=on_event)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"✗ Fehler beim Lesen der Excel-Datei: {e}")
+        return False
+    except Exception as e:
+        print(f"\n✗ Fehler beim Erstellen des Dokuments: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    if result.rows_read == 0:
+        print("✗ Keine Daten in Excel-Datei gefunden!")
+        print("\nStelle sicher, dass:")
+        print("  - Die Datei nicht leer ist")
+        print(f"  - Dateinamen in Spalte {config['filename_column']} stehen")
+        caption_cols_str = ', '.join(config.get('caption_columns', ['I']))
+        print(f"  - Beschreibungen in Spalte(n) {caption_cols_str} stehen")
+        return False
+
+    if result.found_count == 0:
+        print("✗ Keine Bilder gefunden!")
+        return False
+
+    print(f"✓ {result.found_count} von {result.rows_read} Bildern gefunden und validiert")
+    print_ambiguous(result.ambiguous)
+
+    # Show orientation stats if smart layout is enabled
+    if result.orientation_counts:
+        print(f"  Orientierungen: ", end="")
+        print(", ".join([f"{count} {ori}" for ori, count in result.orientation_counts.items()]))
+
+    # Where the time went
+    print()
+    for line in summary_lines(result.report.to_dict()):
+        print(line)
+    return True
+
+
+def run_watch(watcher, pipeline, config: dict):
+    """
+    Rebuild the document whenever the Excel file or the image folders change
+
+    Runs until interrupted with Ctrl+C.
+
+    Args:
+        watcher: InputWatcher whose baseline is the state of the last build
+        pipeline: Pipeline reused for every rebuild (keeps its caches)
+        config: Configuration dictionary
+    """
+    stop = threading.Event()
+    print()
+    print("👀 Beobachte Excel-Datei und Bilder-Ordner (Strg+C beendet)")
+    try:
+        while watcher.wait(stop):
+            print()
+            print(f"↻ Geändert: {', '.join(watcher.changes)} - erstelle Dokument neu")
+            started = time.perf_counter()
+            if run_build(pipeline, config):
+                print(f"✓ Neu erstellt in {time.perf_counter() - started:.1f} s: {config['output_file']}")
+            print("👀 Warte auf Änderungen...")
+    except KeyboardInterrupt:
+        stop.set()
+        print("\nBeobachtung beendet.")
+
+
 def main():
     """Main entry point"""
+    args = parse_args()
+    setup_logging(verbose=args.verbose, quiet=args.quiet, log_file=args.log_file)
+
+    if args.embed_linked:
+        run_embed_linked(args.embed_linked)
+        return
+
     print()
     print("=" * 70)
     print(" " * 20 + "PIC2DOC")
@@ -291,6 +561,9 @@ def main():
     print("Erstellt formatierte Word-Dokumente aus Bildern und Excel-Beschreibungen")
     print()
 
+    # Load processing libraries while the user answers the prompts
+    start_background_warmup()
+
     # Load saved configuration
     config_manager = ConfigManager()
     saved_config = config_manager.load_config()
@@ -298,6 +571,12 @@ def main():
 
     # Get configuration from user
     config = get_user_configuration(saved_config)
+    # Switches given on the command line apply to this run, not to later ones
+    run_only = set()
+    extra_folders = args.extra_folder or ([] if args.no_extra_folders else None)
+    apply_run_option(config, saved_config, run_only, 'extra_image_folders', extra_folders)
+    apply_run_option(config, saved_config, run_only, 'image_recursive', args.recursive)
+    apply_run_option(config, saved_config, run_only, 'image_duplicates', args.duplicates)
 
     # Display configuration
     display_configuration(config)
@@ -313,6 +592,9 @@ def main():
     print("=" * 70)
     print()
 
+    from src.core.pipeline import Pic2DocPipeline
+    from src.core.planner import ThroughputStats
+
     # Validate files exist
     if not os.path.exists(config['excel_file']):
         print(f"✗ Fehler: Excel-Datei nicht gefunden: {config['excel_file']}")
@@ -321,105 +603,54 @@ def main():
         print(f"  Spalte I: Beschreibung")
         return
 
-    if not os.path.exists(config['image_folder']):
-        print(f"✗ Fehler: Bilder-Ordner nicht gefunden: {config['image_folder']}")
-        return
+    for folder in [config['image_folder']] + config['extra_image_folders']:
+        if not os.path.exists(folder):
+            print(f"✗ Fehler: Bilder-Ordner nicht gefunden: {folder}")
+            return
 
-    # Read Excel data
-    try:
-        excel_reader = ExcelReader()
-        excel_data = excel_reader.read_data(
-            config['excel_file'],
-            config['filename_column'],
-            config.get('caption_columns', ['I']),
-            config.get('caption_separator', ' - ')
-        )
-    except Exception as e:
-        print(f"✗ Fehler beim Lesen der Excel-Datei: {e}")
+    if args.plan:
+        run_plan(config, args.dpi)
         return
 
-    if not excel_data:
-        print("✗ Keine Daten in Excel-Datei gefunden!")
-        print("\nStelle sicher, dass:")
-        print("  - Die Datei nicht leer ist")
-        print(f"  - Dateinamen in Spalte {config['filename_column']} stehen")
-        caption_cols_str = ', '.join(config.get('caption_columns', ['I']))
-        print(f"  - Beschreibungen in Spalte(n) {caption_cols_str} stehen")
-        return
+    apply_run_option(config, saved_config, run_only, 'write_report', args.report)
+    # Tracing costs time on every image: only when asked for in this run
+    config['write_trace'] = args.trace
+    run_only.add('write_trace')
+    apply_run_option(config, saved_config, run_only, 'link_images', args.link_images)
+    apply_run_option(config, saved_config, run_only, 'link_paths', args.link_paths)
+    if config['link_images']:
+        print("⚠ Bilder werden nur verknüpft, nicht eingebettet (Bildordner muss erreichbar bleiben)")
+        print()
 
     # Apply test mode limit if enabled
     if config.get('test_mode', False):
-        test_limit = config.get('test_image_limit', 10)
-        excel_data = excel_data[:test_limit]
-        print(f"⚡ Test-Modus aktiv: Verarbeite nur die ersten {len(excel_data)} Bilder")
+        print(f"⚡ Test-Modus aktiv: Verarbeite nur die ersten {config.get('test_image_limit', 10)} Bilder")
         print()
 
-    # Validate and locate images
-    try:
-        image_handler = ImageHandler(config['image_folder'])
-
-        # Build complete image data with paths and orientation info
-        complete_data = []
-        smart_layout = config.get('smart_layout', False)
-
-        for filename, caption in excel_data:
-            try:
-                if smart_layout:
-                    # Get detailed image info including orientation
-                    image_info = image_handler.get_image_info(filename)
-                    complete_data.append((filename, caption, image_info['path'], image_info))
-                else:
-                    # Just get path (old behavior)
-                    image_path = image_handler.get_image_path(filename)
-                    complete_data.append((filename, caption, image_path, None))
-            except (FileNotFoundError, ValueError) as e:
-                print(f"⚠ {e}")
-                continue
-
-        if not complete_data:
-            print("✗ Keine Bilder gefunden!")
-            return
-
-        print(f"✓ {len(complete_data)} Bilder gefunden und validiert")
-
-        # Show orientation stats if smart layout is enabled
-        if smart_layout:
-            orientations = {}
-            for _, _, _, info in complete_data:
-                if info:
-                    ori = info['orientation']
-                    orientations[ori] = orientations.get(ori, 0) + 1
-
-            if orientations:
-                print(f"  Orientierungen: ", end="")
-                print(", ".join([f"{count} {ori}" for ori, count in orientations.items()]))
-
+    # Stream Excel rows through image lookup into the document. In watch
+    # mode the pipeline is kept, so rebuilds reuse its folder index and
+    # image info cache.
+    info_cache = None
+    watcher = None
+    if args.watch:
+        from src.core.image_handler import ImageInfoCache
+        from src.core.watcher import InputWatcher
+        info_cache = ImageInfoCache()
+        watcher = InputWatcher(config, saved_config.get('watch_interval_seconds', 1.0),
+                               saved_config.get('watch_quiet_seconds', 1.0))
+    pipeline = Pic2DocPipeline(config, info_cache=info_cache, throughput=ThroughputStats())
+
+    if run_build(pipeline, config):
+        # Save configuration
         print()
+        config_manager.save_config(config_to_save(config, saved_config, run_only))
 
-    except Exception as e:
-        print(f"✗ Fehler bei der Bildverarbeitung: {e}")
-        return
-
-    # Generate document
-    try:
-        doc_generator = DocumentGenerator(config)
-        processed, errors = doc_generator.create_document(
-            complete_data,
-            config['output_file']
-        )
-    except Exception as e:
-        print(f"\n✗ Fehler beim Erstellen des Dokuments: {e}")
-        import traceback
-        traceback.print_exc()
-        return
-
-    # Save configuration
-    print()
-    config_manager.save_config(config)
+        print("\n✓ Fertig!")
+        print("\nDeine Einstellungen wurden gespeichert und werden beim")
+        print("nächsten Start als Standardwerte verwendet.")
 
-    print("\n✓ Fertig!")
-    print("\nDeine Einstellungen wurden gespeichert und werden beim")
-    print("nächsten Start als Standardwerte verwendet.")
+    if watcher is not None:
+        run_watch(watcher, pipeline, config)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pic2Doc Server Entry Point
+Runs a long-lived local job server with warm libraries and caches
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.job_server import JobServer
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Pic2Doc Job-Server")
+    parser.add_argument('--host', default='127.0.0.1', help="Adresse (Standard: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="TCP-Port (Standard: 8765)")
+    parser.add_argument('--socket', help="Unix-Socket statt TCP verwenden")
+    parser.add_argument('--workers', type=int, default=2, help="Parallele Jobs (Standard: 2)")
+    args = parser.parse_args()
+
+    server = JobServer(workers=args.workers)
+
+    if args.socket:
+        print(f"✓ Pic2Doc-Server läuft auf {args.socket} ({server.workers} Worker)")
+        serve = lambda: server.serve_unix(args.socket)
+    else:
+        print(f"✓ Pic2Doc-Server läuft auf {args.host}:{args.port} ({server.workers} Worker)")
+        serve = lambda: server.serve_tcp(args.host, args.port)
+
+    try:
+        serve()
+    except KeyboardInterrupt:
+        print("\nServer wird beendet...")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,20 @@ Application constants for Pic2Doc
 # Configuration file name
 CONFIG_FILE = "pic2doc_config.json"
 
+# Measured stage throughput of previous runs (used by the planner)
+THROUGHPUT_FILE = "pic2doc_throughput.json"
+
+# Image folder listings of previous runs (see FolderIndexFile)
+INDEX_FILE = "pic2doc_index.json"
+
 # Default configuration values
 DEFAULT_CONFIG = {
     'excel_file': 'beschreibungen.xlsx',
     'image_folder': 'pics',
+    'extra_image_folders': [],     # Further image folders, searched after image_folder
+    'image_recursive': False,      # Also search the subfolders of the image folders
+    'image_duplicates': 'first',   # Same file name found twice: 'first' (folder order) or 'newest'
+    'image_index_file': True,      # Keep the folder listing between runs (INDEX_FILE)
     'output_file': 'output_document.docx',
     'filename_column': 'A',
     'caption_columns': ['I'],  # List of columns for captions
@@ -27,8 +37,36 @@ DEFAULT_CONFIG = {
     'margin_left_cm': 1.27,
     'margin_right_cm': 1.27,
     'smart_layout': True,      # Always enabled: intelligent side-by-side layout
+    'write_report': False,     # Write <output>.report.json with per-stage timings
+    'write_trace': False,      # Write <output>.trace.json with per-image spans (Chrome trace format)
+    'docx_compress_level': 6,  # zlib level for XML parts (JPEG/PNG media is stored uncompressed)
+    'docx_compress_workers': 4,  # Threads compressing document parts while saving
+    # Filename matching (exact matches always win; extensions match in any case)
+    'match_ignore_case': True,            # "img 1" finds "IMG 1.jpg"
+    'match_collapse_whitespace': True,    # Trailing/double spaces are ignored
+    'match_ignore_leading_zeros': True,   # "FIAS 21B 1" finds "FIAS 21B 000001.jpg"
+    'match_prefix': False,                # "IMG 1" finds "IMG 1 Nordwand.jpg"
+    'prefetch_images': 8,      # Read this many images ahead of the document generator (0 = off)
+    'prefetch_mb': 64,         # Memory budget of the read-ahead buffer
+    'prefetch_workers': 4,     # Threads reading ahead (more help on high-latency network shares)
+    'link_images': False,      # Link pictures to the image files instead of embedding them
+    'link_paths': 'relative',  # Linked pictures: 'relative' (to the output folder) or 'absolute'
+    'watch_interval_seconds': 1.0,  # Watch mode: how often the inputs are checked
+    'watch_quiet_seconds': 1.0,     # Watch mode: rebuild once nothing changed for this long
+    # Limits per image; images over a limit are skipped and listed as errors
+    'max_image_megapixels': 150,    # Reject larger images by their header (0 = no limit)
+    'isolate_probes': True,         # Probe images in supervised child processes
+    'probe_processes': 2,           # Number of probe processes
+    'probe_timeout_seconds': 10.0,  # Probe process is killed after this long
+    'probe_memory_mb': 1024,        # Address space limit of a probe process (POSIX)
 }
 
+# Rules for file names found in several image folders (config 'image_duplicates')
+DUPLICATE_POLICIES = ('first', 'newest')
+
+# Path styles of linked pictures (config 'link_paths')
+LINK_PATHS = ('relative', 'absolute')
+
 # Supported image extensions
 SUPPORTED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
 
@@ -36,3 +74,6 @@ SUPPORTED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
 LANDSCAPE_RATIO = 1.2  # width/height > 1.2 = landscape
 PORTRAIT_RATIO = 0.8   # width/height < 0.8 = portrait
 # Between 0.8 and 1.2 = square/neutral
+
+# Pipeline event types that end an event stream
+TERMINAL_EVENTS = ('done', 'failed', 'cancelled')
@@ -0,0 +1,58 @@
+"""
+File helpers for Pic2Doc
+"""
+
+import os
+import stat
+import uuid
+from pathlib import Path
+
+
+def partial_output_path(output_path) -> Path:
+    """
+    Get the temporary path a document is written to before it is complete
+
+    Args:
+        output_path: Final output path
+
+    Returns:
+        Path of the temporary file (same directory, ".part" suffix)
+    """
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + '.part')
+
+
+def write_text_atomic(path, content: str, prefix: str = '.pic2doc.'):
+    """
+    Replace a text file atomically (temp file in the same directory + rename)
+
+    A crash leaves either the old or the new content, never a truncated
+    file. The new file keeps the permissions of the file it replaces; a
+    new file gets the usual permissions (0666 minus the umask).
+
+    Args:
+        path: File to write
+        content: New content (written as UTF-8)
+        prefix: Prefix of the temporary file name
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = os.path.join(directory, f"{prefix}{uuid.uuid4().hex[:12]}.tmp")
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
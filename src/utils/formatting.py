@@ -0,0 +1,81 @@
+"""
+Display formatting helpers for Pic2Doc
+"""
+
+from typing import Any, Dict, List
+
+# Display names of the pipeline stages
+STAGE_NAMES = {
+    'excel': "Excel lesen",
+    'probe': "Bilder prüfen",
+    'render': "Dokument aufbauen",
+    'save': "Speichern",
+}
+
+
+def format_size(num_bytes: float) -> str:
+    """
+    Format a byte count for display
+
+    Args:
+        num_bytes: Size in bytes
+
+    Returns:
+        String like "512 B", "3.4 MB" or "1.2 GB"
+    """
+    size = float(num_bytes)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Format a duration for display
+
+    Args:
+        seconds: Duration in seconds
+
+    Returns:
+        String like "0:42", "12:05" or "1:02:05"
+    """
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+def plan_summary_lines(plan: Dict[str, Any]) -> List[str]:
+    """
+    Describe a document plan (DocumentPlan.to_dict()) in a few lines
+
+    Args:
+        plan: Plan dictionary
+
+    Returns:
+        List of display lines
+    """
+    lines = [
+        f"Zeilen:               {plan['rows']}",
+        f"Bilder gefunden:      {plan['found']}",
+        f"Fehlende Bilder:      {len(plan['missing'])}",
+    ]
+    if plan['invalid']:
+        lines.append(f"Fehlerhafte Bilder:   {len(plan['invalid'])}")
+    if plan.get('ambiguous'):
+        lines.append(f"Mehrdeutige Namen:    {len(plan['ambiguous'])}")
+    lines += [
+        f"Seiten:               {plan['pages']}",
+        f"Dokumentgröße:        ca. {format_size(plan['estimated_bytes'])}",
+        f"  mit Verkleinerung auf {plan['resample_dpi']} DPI: "
+        f"ca. {format_size(plan['estimated_bytes_resampled'])}",
+        f"Laufzeit:             ca. {format_duration(plan['estimated_seconds'])}",
+    ]
+    for stage, timing in plan['stage_seconds'].items():
+        source = "gemessen" if timing['measured'] else "Standardwert"
+        lines.append(f"  {STAGE_NAMES.get(stage, stage):<20}{format_duration(timing['seconds'])} ({source})")
+    return lines
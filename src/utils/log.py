@@ -0,0 +1,138 @@
+"""
+Logging for Pic2Doc
+Console output with levels and a quiet mode, rate-limited progress lines
+and an optional JSON-lines log file
+"""
+
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Optional
+
+LOGGER_NAME = 'pic2doc'
+
+# Attributes every LogRecord has; anything else was passed via `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Writes messages as-is to the current sys.stdout (follows redirects)"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    def emit(self, record: logging.LogRecord):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats a record as one JSON object (time, level, logger, message, extra fields)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage().strip(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_root = logging.getLogger(LOGGER_NAME)
+_root.propagate = False
+_console = _ConsoleHandler()
+_root.addHandler(_console)
+_root.setLevel(logging.INFO)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a Pic2Doc logger
+
+    Messages go to the console at INFO level until setup_logging() changes it.
+
+    Args:
+        name: Component name (e.g. 'document')
+
+    Returns:
+        Logger "pic2doc.<name>"
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def setup_logging(verbose: bool = False, quiet: bool = False, log_file: Optional[str] = None):
+    """
+    Configure console level and the optional JSON-lines log file
+
+    Args:
+        verbose: Also show debug messages (e.g. one line per image)
+        quiet: Only show warnings and errors
+        log_file: Append records as JSON lines to this file; it receives
+                  at least INFO messages, also in quiet mode
+    """
+    console_level = logging.DEBUG if verbose else logging.WARNING if quiet else logging.INFO
+    _console.setLevel(console_level)
+    level = console_level
+
+    for handler in list(_root.handlers):
+        if handler is not _console:
+            _root.removeHandler(handler)
+            handler.close()
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(JsonLinesFormatter())
+        file_handler.setLevel(min(console_level, logging.INFO))
+        _root.addHandler(file_handler)
+        level = min(level, logging.INFO)
+    _root.setLevel(level)
+
+
+class ProgressLogger:
+    """
+    Logs progress lines at most once per interval
+
+    The first and the last item are always logged. When the level is
+    disabled, update() returns before formatting anything.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = 2.0, level: int = logging.INFO):
+        """
+        Initialize progress logger
+
+        Args:
+            logger: Target logger
+            interval: Minimum seconds between two lines
+            level: Log level of the lines
+        """
+        self.logger = logger
+        self.interval = interval
+        self.level = level
+        self._last: Optional[float] = None
+
+    def update(self, current: int, total: int, filename: str = ''):
+        """
+        Report progress
+
+        Args:
+            current: Items done
+            total: Expected number of items
+            filename: Current item
+        """
+        now = time.monotonic()
+        if self._last is not None and current < total and now - self._last < self.interval:
+            return
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self._last = now
+        percent = current * 100 // total if total else 100
+        self.logger.log(self.level, "  %d/%d Bilder (%d%%) %s", current, total, percent, filename,
+                        extra={'current': current, 'total': total, 'image': filename})
@@ -0,0 +1,88 @@
+"""
+Shared fixtures for the Pic2Doc tests
+
+Tests run from source: the repository root is put on sys.path, as the
+benchmarks do.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def make_dataset(directory: Path, count: int = 12) -> dict:
+    """
+    Write a small Excel file and matching images
+
+    Args:
+        directory: Directory receiving data.xlsx, pics/ and output paths
+        count: Number of rows (one image each, alternating orientation)
+
+    Returns:
+        Dictionary with excel_file, image_folder and output_file
+    """
+    from openpyxl import Workbook
+    from PIL import Image
+
+    image_folder = directory / 'pics'
+    image_folder.mkdir()
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['Dateiname'] + [None] * 7 + ['Beschreibung'])
+    for index in range(1, count + 1):
+        name = f"IMG {index:06d}"
+        size = (120, 80) if index % 2 else (80, 120)
+        Image.new('RGB', size, (index * 20 % 256, 90, 160)).save(image_folder / f"{name}.jpg", quality=80)
+        sheet.append([name] + [None] * 7 + [f"Bild {index}"])
+    excel_file = directory / 'data.xlsx'
+    workbook.save(excel_file)
+    return {
+        'excel_file': str(excel_file),
+        'image_folder': str(image_folder),
+        'output_file': str(directory / 'output.docx'),
+    }
+
+
+def cli_config(dataset: dict) -> dict:
+    """
+    Configuration as the interactive CLI builds it (only the keys it asks for)
+
+    Args:
+        dataset: Result of make_dataset()
+
+    Returns:
+        Configuration dictionary without the DEFAULT_CONFIG-only keys
+    """
+    return {
+        'excel_file': dataset['excel_file'],
+        'image_folder': dataset['image_folder'],
+        'output_file': dataset['output_file'],
+        'images_per_page': 2,
+        'font_name': 'Calibri',
+        'font_size': 11,
+        'font_bold': False,
+        'font_italic': False,
+        'font_underline': False,
+        'test_mode': False,
+        'test_image_limit': 10,
+        'smart_layout': True,
+        'caption_columns': ['I'],
+        'caption_separator': ' - ',
+        'margin_top_cm': 1.27,
+        'margin_bottom_cm': 1.27,
+        'margin_left_cm': 1.27,
+        'margin_right_cm': 1.27,
+        'filename_column': 'A',
+    }
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch) -> dict:
+    """Small dataset in a temporary directory, which is also the working directory"""
+    # Files persisted next to the working directory stay in the temp directory
+    monkeypatch.chdir(tmp_path)
+    return make_dataset(tmp_path)
@@ -0,0 +1,98 @@
+"""
+Tests for the command line options of src/main.py
+"""
+
+import json
+import os
+import sys
+
+from conftest import cli_config
+from src import main as cli
+from src.main import apply_run_option, config_to_save, parse_args
+
+
+def _run_main(monkeypatch, dataset, *argv):
+    """Run the interactive CLI with its answers taken from the saved config; returns it"""
+    monkeypatch.setattr(sys, 'argv', ['main.py', *argv])
+    monkeypatch.setattr(cli, 'start_background_warmup', lambda: None)
+    monkeypatch.setattr(cli, 'input_yes_no', lambda prompt, default=False: True)
+    monkeypatch.setattr(cli, 'get_user_configuration',
+                        lambda saved: dict(saved, **cli_config(dataset)))
+    cli.main()
+    with open('pic2doc_config.json', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_link_images_applies_to_one_run_only():
+    saved = {'link_images': False}
+    config, run_only = {}, set()
+
+    apply_run_option(config, saved, run_only, 'link_images', parse_args(['--link-images']).link_images)
+
+    assert config['link_images'] is True
+    assert config_to_save(config, saved, run_only)['link_images'] is False
+
+
+def test_link_images_not_given_keeps_saved_value():
+    saved = {'link_images': True}  # e.g. the GUI checkbox
+    config, run_only = {}, set()
+
+    apply_run_option(config, saved, run_only, 'link_images', parse_args([]).link_images)
+
+    assert config['link_images'] is True
+    assert not run_only
+
+
+def test_no_link_images_turns_saved_value_off():
+    saved = {'link_images': True}
+    config, run_only = {}, set()
+
+    apply_run_option(config, saved, run_only, 'link_images', parse_args(['--no-link-images']).link_images)
+
+    assert config['link_images'] is False
+    assert config_to_save(config, saved, run_only)['link_images'] is True
+
+
+def test_report_is_not_saved():
+    saved = {}
+    config, run_only = {}, set()
+
+    apply_run_option(config, saved, run_only, 'write_report', parse_args(['--report']).report)
+
+    assert config['write_report'] is True
+    assert config_to_save(config, saved, run_only)['write_report'] is False
+    assert parse_args(['--no-report']).report is False
+
+
+def test_trace_applies_to_one_run_only(dataset, monkeypatch):
+    trace = dataset['output_file'] + '.trace.json'
+
+    saved = _run_main(monkeypatch, dataset, '--trace')
+    assert os.path.exists(trace)
+    assert saved['write_trace'] is False
+
+    os.remove(trace)
+    _run_main(monkeypatch, dataset)
+    assert not os.path.exists(trace)
+
+
+def test_folder_options_are_not_saved(dataset, monkeypatch, tmp_path):
+    extra = tmp_path / 'extra'
+    extra.mkdir()
+
+    saved = _run_main(monkeypatch, dataset, '--recursive', '--extra-folder', str(extra))
+    assert saved['image_recursive'] is False
+    assert saved['extra_image_folders'] == []
+
+
+
+def test_saved_folders_can_be_turned_off_for_one_run(dataset, monkeypatch, tmp_path):
+    gone = str(tmp_path / 'unmounted')  # A saved extra folder that is not reachable
+    with open('pic2doc_config.json', 'w', encoding='utf-8') as f:
+        json.dump({'extra_image_folders': [gone], 'image_recursive': True}, f)
+
+    saved = _run_main(monkeypatch, dataset, '--no-extra-folders', '--no-recursive')
+
+    assert os.path.exists(dataset['output_file'])
+    assert saved['extra_image_folders'] == [gone]
+    assert saved['image_recursive'] is True
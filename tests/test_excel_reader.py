@@ -0,0 +1,46 @@
+"""
+Tests for reading rows from Excel files
+"""
+
+import re
+import zipfile
+
+import pytest
+
+from src.core.excel_reader import ExcelReader
+
+
+def _set_dimension(excel_file: str, dimension):
+    """Rewrite the sheet's <dimension> (None removes it), as other tools write it"""
+    with zipfile.ZipFile(excel_file) as source:
+        members = {info: source.read(info) for info in source.infolist()}
+    with zipfile.ZipFile(excel_file, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info, data in members.items():
+            if info.filename == 'xl/worksheets/sheet1.xml':
+                replacement = f'<dimension ref="{dimension}"/>'.encode() if dimension else b''
+                data = re.sub(rb'<dimension ref="[^"]*"/>', replacement, data)
+            target.writestr(info, data)
+
+
+@pytest.mark.parametrize('dimension', ['A1', 'A1:B3', None])
+def test_stale_dimension_reads_all_rows(dataset, dimension):
+    _set_dimension(dataset['excel_file'], dimension)
+    reader = ExcelReader()
+
+    rows = list(reader.iter_data(dataset['excel_file']))
+
+    assert len(rows) == 12
+    assert rows[0] == ('IMG 000001', 'Bild 1')
+    assert reader.row_count_hint is None
+
+
+def test_row_count_hint_from_dimension(dataset):
+    reader = ExcelReader()
+    rows = list(reader.iter_data(dataset['excel_file']))
+
+    assert reader.row_count_hint == len(rows) == 12
+
+
+def test_missing_column(dataset):
+    with pytest.raises(ValueError, match="Spalte K"):
+        list(ExcelReader().iter_data(dataset['excel_file'], caption_columns=['K']))
@@ -0,0 +1,32 @@
+"""
+Tests for image lookup through the folder index
+"""
+
+from pathlib import Path
+
+from src.core.image_handler import ImageHandler
+
+
+def test_lookup_uses_the_index_only(dataset, monkeypatch):
+    handler = ImageHandler(dataset['image_folder'])
+    handler.refresh_index()
+
+    def no_disk_access(*args, **kwargs):
+        raise AssertionError("lookup touched the file system")
+
+    monkeypatch.setattr(Path, 'exists', no_disk_access)
+    monkeypatch.setattr(Path, 'stat', no_disk_access)
+    assert handler.find_image('IMG 000003').name == 'IMG 000003.jpg'
+    assert handler.find_image('img 000003').name == 'IMG 000003.jpg'
+    assert handler.find_image('IMG 999999') is None
+
+
+def test_new_file_is_found_after_refresh(dataset):
+    handler = ImageHandler(dataset['image_folder'])
+    assert handler.find_image('NEW 000001') is None
+
+    source = Path(dataset['image_folder']) / 'IMG 000001.jpg'
+    (Path(dataset['image_folder']) / 'NEW 000001.JPG').write_bytes(source.read_bytes())
+    handler.refresh_index()
+
+    assert handler.find_image('NEW 000001').name == 'NEW 000001.JPG'
@@ -0,0 +1,223 @@
+"""
+Tests for the job server and its client
+"""
+
+import os
+import queue
+import socket
+import threading
+import time
+
+import pytest
+
+from conftest import make_dataset
+from src.core.job_client import JobClient
+from src.core.job_server import JobServer
+from src.utils.constants import TERMINAL_EVENTS
+
+TIMEOUT = 60
+
+
+class _Events:
+    """Collects one job's events; optionally holds the job at its first `hold_at` event"""
+
+    def __init__(self, hold: bool = False, hold_at: str = 'started'):
+        self.hold_at = hold_at
+        self.events = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.finished = threading.Event()
+        if not hold:
+            self.release.set()
+
+    def __call__(self, event):
+        self.events.append(event)
+        if event['event'] == self.hold_at and not self.started.is_set():
+            self.started.set()
+            # Called on the job's worker thread: the job waits here
+            self.release.wait(TIMEOUT)
+        if event['event'] in TERMINAL_EVENTS:
+            self.finished.set()
+
+    def names(self):
+        return [event['event'] for event in self.events]
+
+    def wait(self):
+        assert self.finished.wait(TIMEOUT), self.names()
+        return self.events[-1]
+
+
+@pytest.fixture
+def server():
+    job_server = JobServer(workers=1)
+    yield job_server
+    job_server.shutdown()
+
+
+@pytest.fixture
+def client(tmp_path):
+    if not hasattr(socket, 'AF_UNIX'):
+        pytest.skip("Unix-Sockets nicht verfügbar")
+    job_server = JobServer(workers=2)
+    socket_path = str(tmp_path / 'jobs.sock')
+    thread = threading.Thread(target=job_server.serve_unix, args=(socket_path,), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + TIMEOUT
+    while not os.path.exists(socket_path):
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.01)
+    job_client = JobClient(socket_path=socket_path, timeout=TIMEOUT)
+    job_client.job_server = job_server  # For holding jobs in place
+    yield job_client
+    job_server.shutdown()
+    thread.join(TIMEOUT)
+
+
+def test_submit_streams_progress_until_done(client, dataset):
+    events = list(client.submit(dataset))
+    names = [event['event'] for event in events]
+
+    assert names[:2] == ['queued', 'started']
+    assert 'progress' in names
+    assert names[-1] == 'done'
+    assert names.count('done') == 1
+    assert len({event['job_id'] for event in events}) == 1
+    done = events[-1]
+    assert done['processed'] == 12
+    assert done['errors'] == []
+    assert os.path.getsize(dataset['output_file']) > 0
+
+
+def test_submit_without_excel_file_fails(client, dataset):
+    events = list(client.submit(dict(dataset, excel_file='')))
+
+    assert events[-1]['event'] == 'failed'
+    assert 'excel_file' in events[-1]['error']
+    assert client.status()['failed'] == 1
+
+
+def test_status_over_socket(client):
+    status = client.status()
+
+    assert status['event'] == 'status'
+    assert status['queue_depth'] == 0
+    assert status['running'] == 0
+    assert status['workers'] == 2
+
+
+def test_cancel_unknown_job(client):
+    assert client.cancel('unknown') is False
+
+
+def test_cancel_over_socket(client, dataset):
+    events = _Events(hold=True)
+    job = client.job_server.submit(dataset, events)
+    assert events.started.wait(TIMEOUT)
+
+    assert client.cancel(job.job_id) is True
+    events.release.set()
+
+    assert events.wait()['event'] == 'cancelled'
+    assert not os.path.exists(dataset['output_file'])
+
+
+def test_cancel_held_job(server, dataset):
+    events = _Events(hold=True)
+    job = server.submit(dataset, events)
+    assert events.started.wait(TIMEOUT)
+
+    assert server.cancel(job.job_id) is True
+    events.release.set()
+
+    assert events.wait()['event'] == 'cancelled'
+    assert job.state == 'cancelled'
+    assert not os.path.exists(dataset['output_file'])
+    assert server.status()['completed'] == 1
+
+
+def test_queue_depth_and_order_with_one_worker(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first_dir, second_dir = tmp_path / 'first', tmp_path / 'second'
+    first_dir.mkdir()
+    second_dir.mkdir()
+    first_events, second_events = _Events(hold=True), _Events()
+
+    server.submit(make_dataset(first_dir, 4), first_events)
+    assert first_events.started.wait(TIMEOUT)
+    second = server.submit(make_dataset(second_dir, 4), second_events)
+
+    assert second_events.events[0] == {'event': 'queued', 'job_id': second.job_id, 'queue_depth': 1}
+    status = server.status()
+    assert (status['queue_depth'], status['running']) == (1, 1)
+    assert second.state == 'queued'
+
+    first_events.release.set()
+    assert first_events.wait()['event'] == 'done'
+    assert second_events.wait()['event'] == 'done'
+    # The second job only started after the first one finished
+    assert second_events.names()[1] == 'started'
+    status = server.status()
+    assert (status['queue_depth'], status['running'], status['completed']) == (0, 0, 2)
+
+
+def test_two_concurrent_jobs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job_server = JobServer(workers=2)
+    try:
+        jobs = []
+        for name in ('first', 'second'):
+            directory = tmp_path / name
+            directory.mkdir()
+            events = _Events(hold=True)
+            jobs.append((job_server.submit(make_dataset(directory, 6), events), events))
+        # Both jobs run at the same time
+        for _job, events in jobs:
+            assert events.started.wait(TIMEOUT)
+        assert job_server.status()['running'] == 2
+
+        for _job, events in jobs:
+            events.release.set()
+        for job, events in jobs:
+            done = events.wait()
+            assert done['event'] == 'done', done
+            assert done['processed'] == 6
+            assert done['job_id'] == job.job_id
+        assert job_server.status()['completed'] == 2
+    finally:
+        job_server.shutdown()
+
+
+def test_events_are_delivered_in_order(server, dataset):
+    received = queue.Queue()
+    server.submit(dataset, received.put)
+    names = []
+    while not names or names[-1] not in TERMINAL_EVENTS:
+        names.append(received.get(timeout=TIMEOUT)['event'])
+
+    assert names[0] == 'queued'
+    assert names[1] == 'started'
+    assert names[-1] == 'done'
+
+
+def test_concurrent_jobs_with_different_probe_limits(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job_server = JobServer(workers=2)
+    try:
+        first_dir, second_dir = tmp_path / 'first', tmp_path / 'second'
+        first_dir.mkdir()
+        second_dir.mkdir()
+        # Hold the first job while it is probing with its probe workers
+        first_events, second_events = _Events(hold=True, hold_at='progress'), _Events()
+        job_server.submit(dict(make_dataset(first_dir, 8), probe_timeout_seconds=20.0), first_events)
+        assert first_events.started.wait(TIMEOUT)
+
+        job_server.submit(dict(make_dataset(second_dir, 8), probe_timeout_seconds=30.0), second_events)
+        assert second_events.wait()['event'] == 'done'
+
+        first_events.release.set()
+        done = first_events.wait()
+        assert done['event'] == 'done', done
+        assert done['processed'] == 8
+        assert done['errors'] == []
+    finally:
+        job_server.shutdown()
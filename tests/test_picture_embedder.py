@@ -0,0 +1,47 @@
+"""
+Tests for embedding pictures
+"""
+
+import builtins
+import os
+
+from docx import Document
+from docx.shared import Cm
+
+from src.core.picture_embedder import PictureEmbedder
+
+
+def test_repeated_reference_is_not_opened_again(dataset, monkeypatch):
+    image = os.path.join(dataset['image_folder'], 'IMG 000001.jpg')
+    document = Document()
+    embedder = PictureEmbedder(document)
+    assert embedder.add_picture(document.add_paragraph().add_run(), image, Cm(4)) == os.path.getsize(image)
+
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', counting_open)
+    assert embedder.add_picture(document.add_paragraph().add_run(), image, Cm(4)) == 0
+
+    assert opened == []
+    assert embedder.deduplicated == 1
+    assert len(document.part.package.image_parts) == 1
+
+
+def test_changed_file_is_read_again(dataset):
+    image = os.path.join(dataset['image_folder'], 'IMG 000001.jpg')
+    document = Document()
+    embedder = PictureEmbedder(document)
+    embedder.add_picture(document.add_paragraph().add_run(), image, Cm(4))
+
+    with open(os.path.join(dataset['image_folder'], 'IMG 000002.jpg'), 'rb') as f:
+        replacement = f.read()
+    with open(image, 'wb') as f:
+        f.write(replacement)
+
+    assert embedder.add_picture(document.add_paragraph().add_run(), image, Cm(4)) == len(replacement)
+    assert embedder.files_read == 2
@@ -0,0 +1,52 @@
+"""
+Tests for the streaming pipeline
+"""
+
+import json
+
+from conftest import cli_config
+from src.core.pipeline import Pic2DocPipeline
+from src.core.prefetch import ImagePrefetcher
+from src.core.tracing import trace_path
+
+
+def test_cli_config_reads_ahead(dataset):
+    config = cli_config(dataset)
+    assert 'prefetch_images' not in config
+    pipeline = Pic2DocPipeline(config)
+
+    assert isinstance(pipeline._create_prefetcher(), ImagePrefetcher)
+
+    result = pipeline.run()
+    assert result.processed == 12
+    stages = result.report.to_dict()['stages']
+    assert stages['prefetch']['items'] == 12
+
+
+def test_prefetch_can_be_turned_off(dataset):
+    config = dict(cli_config(dataset), prefetch_images=0)
+    pipeline = Pic2DocPipeline(config)
+
+    assert pipeline._create_prefetcher() is None
+    result = pipeline.run()
+    assert result.processed == 12
+    assert 'prefetch' not in result.report.to_dict()['stages']
+
+
+def test_trace_covers_probe_workers_and_compression(dataset):
+    config = dict(cli_config(dataset), write_trace=True)
+    pipeline = Pic2DocPipeline(config)
+    try:
+        result = pipeline.run()
+    finally:
+        pipeline.close()
+    assert result.processed == 12
+
+    with open(trace_path(result.output_path), encoding='utf-8') as f:
+        spans = [event for event in json.load(f)['traceEvents'] if event['ph'] == 'X']
+    probes = [span for span in spans if span['name'] == 'probe_worker']
+    assert len(probes) == 12
+    assert all(isinstance(span['args']['worker'], int) for span in probes)
+    chunks = [span for span in spans if span['name'] == 'deflate']
+    assert any(span['args']['part'] == 'word/document.xml' for span in chunks)
+    assert all(span['args']['worker'].startswith('pic2doc-zip') for span in chunks)
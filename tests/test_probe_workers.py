@@ -0,0 +1,138 @@
+"""
+Tests for the supervised probe worker processes
+"""
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from conftest import cli_config
+from src.core.error_log import ErrorCategory, ImageRejectedError, ProbeWorkerError, categorize_exception
+from src.core.image_handler import ImageHandler
+from src.core.probe_workers import (ProbeWorkerPool, acquire_probe_pool, close_probe_pools,
+                                    release_probe_pool)
+
+posix_only = pytest.mark.skipif(os.name != 'posix', reason="POSIX only")
+
+
+@pytest.fixture
+def pool():
+    probe_pool = ProbeWorkerPool(workers=1, timeout=2.0, max_memory_mb=0, max_pixels=10_000)
+    yield probe_pool
+    probe_pool.close()
+
+
+@pytest.fixture(autouse=True)
+def no_shared_pools():
+    yield
+    close_probe_pools()
+
+
+def _wait_for_child(probe_pool: ProbeWorkerPool):
+    deadline = time.monotonic() + 10
+    while not probe_pool._all:
+        assert time.monotonic() < deadline, "no child started"
+        time.sleep(0.01)
+    return next(iter(probe_pool._all))
+
+
+def test_cli_config_enables_isolation_and_pixel_limit(dataset):
+    config = cli_config(dataset)
+    assert 'isolate_probes' not in config and 'max_image_megapixels' not in config
+
+    handler = ImageHandler.from_config(config)
+
+    assert isinstance(handler.prober, ProbeWorkerPool)
+    assert handler.max_pixels == 150_000_000
+    record_path = handler.get_image_path('IMG 000001')
+    assert handler.get_image_dimensions(record_path) == (120, 80)
+    handler.close()
+    assert handler.prober is None
+
+
+def test_probe_results(pool, dataset, tmp_path):
+    image = os.path.join(dataset['image_folder'], 'IMG 000002.jpg')
+    large = tmp_path / 'large.png'
+    Image.new('L', (200, 100)).save(large)
+    damaged = tmp_path / 'damaged.jpg'
+    damaged.write_bytes(b'\xff\xd8\xff\xe0' + b'\0' * 16)
+
+    assert pool.probe(image) == (80, 120)
+    with pytest.raises(ImageRejectedError):
+        pool.probe(str(large))
+    with pytest.raises(ValueError) as damaged_error:
+        pool.probe(str(damaged))
+    assert categorize_exception(damaged_error.value) == ErrorCategory.CORRUPT
+    assert pool.probe(image) == (80, 120)
+
+
+@posix_only
+def test_hanging_probe_is_killed_and_replaced(pool, dataset, tmp_path):
+    fifo = tmp_path / 'hang.png'
+    os.mkfifo(fifo)  # Opening it for reading blocks until a writer appears
+
+    started = time.monotonic()
+    with pytest.raises(ImageRejectedError) as error:
+        pool.probe(str(fifo))
+
+    assert time.monotonic() - started < 10
+    assert 'Zeitüberschreitung' in str(error.value)
+    assert pool.killed == 1
+    assert pool.probe(os.path.join(dataset['image_folder'], 'IMG 000001.jpg')) == (120, 80)
+
+
+@posix_only
+def test_crashed_child_is_not_blamed_on_memory(pool, dataset, tmp_path):
+    fifo = tmp_path / 'hang.png'
+    os.mkfifo(fifo)
+    pool.probe(os.path.join(dataset['image_folder'], 'IMG 000001.jpg'))
+    child = _wait_for_child(pool)
+    threading.Timer(0.5, os.kill, (child.process.pid, signal.SIGSEGV)).start()
+
+    with pytest.raises(ProbeWorkerError) as error:
+        pool.probe(str(fifo))
+
+    assert 'SIGSEGV' in str(error.value)
+    assert 'Speicher' not in str(error.value)
+    assert categorize_exception(error.value) == ErrorCategory.OTHER
+    assert pool.probe(os.path.join(dataset['image_folder'], 'IMG 000001.jpg')) == (120, 80)
+
+
+@posix_only
+def test_child_that_cannot_start_fails_as_other(dataset):
+    # Far too little address space to even start the interpreter
+    starved = ProbeWorkerPool(workers=1, timeout=2.0, max_memory_mb=8)
+    try:
+        image = os.path.join(dataset['image_folder'], 'IMG 000001.jpg')
+        with pytest.raises(ProbeWorkerError) as error:
+            starved.probe(image)
+        assert 'nicht gestartet' in str(error.value)
+        assert categorize_exception(error.value) == ErrorCategory.OTHER
+        # Not started again for every image
+        with pytest.raises(ProbeWorkerError):
+            starved.probe(image)
+        assert starved._count == 0
+    finally:
+        starved.close()
+
+
+def test_pool_with_users_survives_other_limits(dataset):
+    image = os.path.join(dataset['image_folder'], 'IMG 000001.jpg')
+    first = acquire_probe_pool(1, 5.0, 0, None)
+    assert first.probe(image) == (120, 80)
+
+    second = acquire_probe_pool(1, 5.0, 0, 1_000)
+    assert second is not first
+    # Still in use: other limits must not close it
+    assert first.probe(image) == (120, 80)
+
+    release_probe_pool(first)
+    assert first._closed  # Unused and not the latest limits
+    release_probe_pool(second)
+    assert not second._closed  # Kept warm for the next job with these limits
+    assert acquire_probe_pool(1, 5.0, 0, 1_000) is second
+    release_probe_pool(second)
@@ -0,0 +1,101 @@
+"""
+Tests for running jobs in a child process
+"""
+
+import time
+
+import pytest
+from openpyxl import load_workbook
+
+from conftest import cli_config
+from src.core.process_runner import ProcessJobRunner
+from src.utils.constants import TERMINAL_EVENTS
+
+TIMEOUT = 60
+
+
+@pytest.fixture
+def runner():
+    job_runner = ProcessJobRunner()
+    yield job_runner
+    job_runner.shutdown()
+
+
+def _wait(job_runner: ProcessJobRunner) -> dict:
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        for event in job_runner.poll_events():
+            if event['event'] in TERMINAL_EVENTS:
+                return event
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_jobs_reuse_the_child_process(runner, dataset):
+    config = cli_config(dataset)
+    runner.start(config)
+    first = _wait(runner)
+    pid = runner._process.pid
+    assert first['event'] == 'done' and first['processed'] == 12
+
+    # Watch-mode rebuild after the workbook changed
+    workbook = load_workbook(dataset['excel_file'])
+    workbook.active.delete_rows(2)
+    workbook.save(dataset['excel_file'])
+    runner.start(config)
+    second = _wait(runner)
+
+    assert second['event'] == 'done' and second['processed'] == 11
+    assert runner._process.pid == pid
+    assert runner.jobs_run == 2
+    assert runner.alive
+
+
+def test_prescan_between_jobs(runner, dataset):
+    config = cli_config(dataset)
+    runner.start(config)
+    assert _wait(runner)['event'] == 'done'
+
+    scan_id = runner.prescan(config)
+    deadline = time.monotonic() + TIMEOUT
+    state = None
+    while state != 'done':
+        assert time.monotonic() < deadline, "pre-scan did not finish"
+        for event in runner.poll_events():
+            if event['event'] == 'scan' and event['scan_id'] == scan_id:
+                state = event['state']
+        time.sleep(0.02)
+
+    runner.start(config)
+    assert _wait(runner)['processed'] == 12
+
+
+def test_job_after_cancelled_job(runner, dataset):
+    config = cli_config(dataset)
+    runner.start(config)
+    runner.cancel()
+    assert _wait(runner)['event'] in ('cancelled', 'done')
+
+    runner.start(config)
+    done = _wait(runner)
+    assert done['event'] == 'done', done
+    assert done['processed'] == 12
+
+
+def test_start_while_running_is_refused(runner, dataset):
+    runner.start(cli_config(dataset))
+    with pytest.raises(RuntimeError):
+        runner.start(cli_config(dataset))
+    _wait(runner)
+
+
+def test_killed_child_is_replaced(runner, dataset):
+    config = cli_config(dataset)
+    runner.start(config)
+    assert _wait(runner)['event'] == 'done'
+    runner._process.kill()
+    runner._process.join()
+
+    runner.start(config)
+    assert _wait(runner)['event'] == 'done'
+    assert runner.jobs_run == 1